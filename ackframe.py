@@ -1,24 +1,107 @@
 import struct
+from seqnum import seq_wrap
+
+ACK_TYPE = 0
+NACK_TYPE = 1
+SACK_TYPE = 2
+
+FRAME_VERSION = 2
+HEADER_V1 = struct.Struct('!6s6sb')
+HEADER_V2 = struct.Struct('!B6s6sBI')
+HEADER = HEADER_V2
+SACK_BITMAP_LENGTH = struct.Struct('!H')  # bytes of bitmap following a SACK header
 
 class ACK:
-    def __init__(self, source_address, destination_address, frame_seq_no):
+    def __init__(self, source_address, destination_address, frame_seq_no, nack=False):
         self.source_address = source_address
         self.destination_address = destination_address
         self.frame_seq_no = frame_seq_no
+        self.nack = nack
+
+    @property
+    def kind(self):
+        return NACK_TYPE if self.nack else ACK_TYPE
+
+    def to_bytes(self, version=FRAME_VERSION):
+        if version == 1:
+            signed_seq_no = -self.frame_seq_no - 1 if self.nack else self.frame_seq_no
+            # Ensure that frame_seq_no is a signed 8-bit integer (-128 to 127). negative frame sequence number means NAK
+            if not isinstance(signed_seq_no, int) or not (-128 <= signed_seq_no <= 127):
+                raise ValueError("Frame sequence number must be an integer between -128 and 127.")
+            return HEADER_V1.pack(self.source_address, self.destination_address, signed_seq_no)
+
+        # Version 2: explicit ACK/NAK type and a 32-bit sequence number that wraps around
+        return HEADER_V2.pack(FRAME_VERSION, self.source_address, self.destination_address, self.kind, seq_wrap(self.frame_seq_no))
 
-    def to_bytes(self):
-        # Ensure that frame_seq_no is a signed 8-bit integer (-128 to 127). negative frame sequence number means NAK
-        if not isinstance(self.frame_seq_no, int) or not (-128 <= self.frame_seq_no <= 127):
-            raise ValueError("Frame sequence number must be an integer between -128 and 127.")
-        
-        # Pack the addresses as 6-byte strings and frame_seq_no as a signed byte
-        header = struct.pack('!6s6sb', self.source_address, self.destination_address, self.frame_seq_no)
-        return header
-    
     @staticmethod
-    def from_bytes(data):
-        # Unpack source_address (first 6 bytes), destination_address (next 6 bytes), and signed frame_seq_no (last byte)
-        source_address = data[:6]
-        destination_address = data[6:12]
-        frame_seq_no = struct.unpack('b', data[12:13])[0]  # Unpack as signed byte
-        return ACK(source_address, destination_address, frame_seq_no)
\ No newline at end of file
+    def from_bytes(data, version=FRAME_VERSION):
+        if version == 1:
+            source_address, destination_address, frame_seq_no = HEADER_V1.unpack_from(data)
+            # A negative sequence number is how version 1 frames mark a NAK
+            if frame_seq_no < 0:
+                return ACK(source_address, destination_address, -frame_seq_no - 1, nack=True)
+            return ACK(source_address, destination_address, frame_seq_no)
+
+        frame_version, source_address, destination_address, kind, frame_seq_no = HEADER_V2.unpack_from(data)
+        if frame_version != FRAME_VERSION:
+            raise ValueError(f"Unsupported ACK frame version {frame_version}.")
+        if kind == SACK_TYPE:
+            offset = HEADER_V2.size
+            (bitmap_length,) = SACK_BITMAP_LENGTH.unpack_from(data, offset)
+            offset += SACK_BITMAP_LENGTH.size
+            bitmap = int.from_bytes(data[offset:offset + bitmap_length], 'big')
+            return SACK(source_address, destination_address, frame_seq_no, bitmap, bitmap_length * 8)
+        if kind not in (ACK_TYPE, NACK_TYPE):
+            raise ValueError(f"Unknown ACK frame type {kind}.")
+        return ACK(source_address, destination_address, frame_seq_no, nack=kind == NACK_TYPE)
+
+
+class SACK(ACK):
+    """
+    Selective ACK: frame_seq_no is the cumulative ACK (every frame up to it arrived), and bit i
+    of bitmap reports whether frame frame_seq_no + 1 + i is held by the receiver.
+    """
+
+    def __init__(self, source_address, destination_address, frame_seq_no, bitmap=0, window_size=0):
+        # -1 is a valid cumulative ACK before the first frame arrives
+        self.source_address = source_address
+        self.destination_address = destination_address
+        self.frame_seq_no = frame_seq_no
+        self.nack = False
+        self.bitmap = bitmap
+        self.window_size = max(window_size, bitmap.bit_length())
+
+    @property
+    def kind(self):
+        return SACK_TYPE
+
+    @staticmethod
+    def from_received(source_address, destination_address, frame_seq_no, received, window_size):
+        """Builds the bitmap from the sequence numbers in received that lie after frame_seq_no."""
+        bitmap = 0
+        for seq_no in received:
+            offset = seq_no - frame_seq_no - 1
+            if 0 <= offset < window_size:
+                bitmap |= 1 << offset
+        return SACK(source_address, destination_address, frame_seq_no, bitmap, window_size)
+
+    def selected(self):
+        """Offsets past frame_seq_no of the frames held by the receiver, in ascending order."""
+        bitmap = self.bitmap
+        offset = 0
+        while bitmap:
+            if bitmap & 1:
+                yield offset + 1
+            bitmap >>= 1
+            offset += 1
+
+    def to_bytes(self, version=FRAME_VERSION):
+        if version == 1:
+            raise ValueError("SACK frames need frame version 2.")
+        bitmap_length = (self.window_size + 7) // 8
+        return b''.join((
+            HEADER_V2.pack(FRAME_VERSION, self.source_address, self.destination_address, SACK_TYPE,
+                           seq_wrap(self.frame_seq_no)),
+            SACK_BITMAP_LENGTH.pack(bitmap_length),
+            self.bitmap.to_bytes(bitmap_length, 'big')
+        ))
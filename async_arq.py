@@ -0,0 +1,454 @@
+import abc
+import asyncio
+import itertools
+import time
+import stop_and_wait
+import go_back_n
+import selective_repeat
+from channel import Channel
+from dataframe import DataFrame
+from ackframe import ACK, SACK
+from framing import LENGTH_PREFIX, MAX_FRAME_SIZE, encode_frame, frame_stream
+from transport import Transport
+from clock import AsyncioClock
+from frame_source import FrameSource
+import eventlog
+import metrics
+from eventlog import EventLog, event_log_path, write_legacy_log
+from delayed_ack import DelayedAck, ACK_DELAY
+from output_sink import open_sink
+from validator import validate
+from rtt import RTTEstimator
+from server import session_output_file
+from seqnum import seq_unwrap
+
+
+async def read_frame(reader, max_frame_size=MAX_FRAME_SIZE):
+    """Reads one length-prefixed frame, or returns None once the peer has closed the stream."""
+    try:
+        (length,) = LENGTH_PREFIX.unpack(await reader.readexactly(LENGTH_PREFIX.size))
+        if length > max_frame_size:
+            raise ValueError(f"Frame of {length} bytes exceeds the {max_frame_size} byte limit.")
+        return await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        return None
+
+
+class AsyncFrameConnection(Transport):
+    """Lets the Receiver classes and the event-driven senders send frames through an asyncio StreamWriter."""
+
+    def __init__(self, writer):
+        self.writer = writer
+
+    def send_frame(self, data):
+        self.writer.write(encode_frame(data))
+
+    def recv_frame(self):
+        raise RuntimeError("Frames are read by the event loop, see receive_data().")
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncSender(abc.ABC):
+    """
+    Event-driven sender: it acts only when an ACK is passed to ack_received() or a retransmission
+    timer set on its Clock fires, and never blocks, so one event loop runs any number of transfers
+    without threads. send_data() runs it over an asyncio connection; simulation.py runs the same
+    senders on a virtual clock. As in the threaded senders, the timers run for the RTT estimator's
+    current RTO, starting from timeout, and a window_controller, when given, grows and shrinks the
+    window.
+    """
+
+    protocol = None  # Name of the protocol whose log.txt format the sender writes
+
+    def __init__(self, connection, input_file, source, destination, checker, bytes, log_file="log.txt",
+                 window_size=1, timeout=stop_and_wait.TIMEOUT, rtt_estimator=None, window_controller=None,
+                 frame_source=None, event_log=None, channel=None):
+        self.connection = connection
+        self.stream = frame_stream(connection)
+        self.input_file = input_file
+        self.frame_source = frame_source if frame_source is not None else FrameSource(input_file, bytes)
+        self.source_address = source
+        self.destination_address = destination
+        self.error_checker = checker
+        self.payload_size = bytes
+        self.log_file = log_file
+        self.window_size = window_size
+        self.timeout = timeout
+        self.clock = None  # Set by start()
+        self.rtt = rtt_estimator if rtt_estimator is not None else RTTEstimator(initial_rto=timeout, clock=self.time)
+        self.window_controller = window_controller
+        if window_controller is not None:
+            self.window_size = window_controller.window_size
+        self.event_log = event_log
+        self.channel = channel if channel is not None else Channel()
+        self.sent_frames = {}  # Frames awaiting acknowledgement, keyed by sequence number
+        self.next_seq_no = 0
+        self.eof_reached = False
+        self.finished = False
+        self.on_finished = None
+
+    def makeDataFrame(self, index):
+        data = self.frame_source.read(index)
+        if data is None:
+            return None
+
+        dataframe = DataFrame(self.source_address, self.destination_address, self.payload_size, index, data, self.error_checker)
+        return dataframe
+
+    def time(self):
+        return self.clock.time()
+
+    def start(self, clock, on_finished=None):
+        """
+        Sends the first window. From then on the sender runs on clock's timers and on the ACKs
+        passed to ack_received(); on_finished() is called once every frame has been acknowledged.
+        """
+        self.clock = clock
+        self.on_finished = on_finished
+        if self.event_log is None:
+            self.event_log = EventLog(event_log_path(self.log_file))
+        metrics.WINDOW_SIZE.set(self.window_size)
+        self.fill_window()
+
+    def ack_received(self, data):
+        self.handle_ack(ACK.from_bytes(data))
+
+    def close(self):
+        self.frame_source.close()
+        self.event_log.close()
+
+    async def send_data(self, reader):
+        """Runs the whole transfer on the running asyncio loop, reading the receiver's ACKs from reader."""
+        start_time = time.time()
+        loop = asyncio.get_running_loop()
+        finished = loop.create_future()
+        listener = asyncio.create_task(self.listen_for_acks(reader, finished))
+        try:
+            self.start(AsyncioClock(loop), lambda: finished.done() or finished.set_result(None))
+            await finished
+        finally:
+            listener.cancel()
+            self.close()
+            write_legacy_log(self.event_log.path, self.protocol, self.log_file)
+
+        total_time = time.time() - start_time
+        print(f"Total transmission time: {total_time:.2f} seconds")
+        print(f"Final RTO: {self.rtt.rto:.4f} seconds from {len(self.rtt.samples)} RTT samples")
+        if self.window_controller is not None:
+            print(f"Final window size: {self.window_size} after {self.window_controller.changes} changes")
+
+    async def listen_for_acks(self, reader, finished):
+        while True:
+            data = await read_frame(reader)
+            if data is None:
+                if not finished.done():
+                    finished.set_exception(ConnectionError("Receiver closed the connection before all frames were acknowledged."))
+                return
+            self.ack_received(data)
+
+    def send_frames(self, dataframes):
+        for dataframe, transmitted_frame in zip(dataframes, self.channel.transmit_batch(dataframes)):
+            self.rtt.frame_sent(dataframe.frame_seq_no, retransmission=not dataframe.first_time)
+            self.event_log.record_transmission(dataframe.frame_seq_no, retransmission=not dataframe.first_time,
+                                               lost=transmitted_frame is None)
+            data = transmitted_frame.to_bytes() if transmitted_frame is not None else None
+            metrics.frame_transmitted(dataframe, data)
+            dataframe.first_time = False
+            if transmitted_frame is not None:
+                self.stream.send_frame(data)
+                print(f"Sent frame: {dataframe.frame_seq_no}")
+
+    def set_window_size(self, window_size):
+        if window_size != self.window_size:
+            print(f"Window size: {self.window_size} -> {window_size}")
+            self.window_size = window_size
+            metrics.WINDOW_SIZE.set(window_size)
+
+    def next_frames(self, count):
+        """Builds up to count new frames past the last one sent, noting when the input runs out."""
+        dataframes = []
+        while len(dataframes) < count:
+            dataframe = self.makeDataFrame(self.next_seq_no)
+            if dataframe is None:
+                self.eof_reached = True
+                break
+            self.sent_frames[self.next_seq_no] = dataframe
+            dataframes.append(dataframe)
+            self.next_seq_no += 1
+        metrics.WINDOW_OCCUPANCY.set(len(self.sent_frames))
+        return dataframes
+
+    def finish_if_done(self):
+        if self.eof_reached and not self.sent_frames and not self.finished:
+            print("All frames sent and acknowledged. Transmission complete.")
+            self.finished = True
+            if self.on_finished is not None:
+                self.on_finished()
+
+    @abc.abstractmethod
+    def fill_window(self):
+        """Sends as many new frames as the window allows, and finishes once all are acknowledged."""
+
+    @abc.abstractmethod
+    def handle_ack(self, ack_frame):
+        """Processes one ACK, NAK or SACK from the receiver."""
+
+
+class AsyncStopAndWaitSender(AsyncSender):
+    protocol = 'StopAndWait'
+
+    def __init__(self, *args, timeout=stop_and_wait.TIMEOUT, **kwargs):
+        super().__init__(*args, window_size=1, timeout=timeout, **kwargs)
+        self.timer = None
+
+    def fill_window(self):
+        if not self.sent_frames:
+            self.send_current(self.next_frames(1))
+        self.finish_if_done()
+
+    def send_current(self, dataframes):
+        if dataframes:
+            self.send_frames(dataframes)
+            self.timer = self.clock.call_later(self.rtt.rto, self.timeout_handler)
+
+    def timeout_handler(self):
+        print("Timeout waiting for ACK. Re-sending...")
+        metrics.TIMEOUTS.inc()
+        self.rtt.backoff()
+        for seq_no in self.sent_frames:
+            self.event_log.record(eventlog.TIMEOUT, seq_no)
+        self.send_current(list(self.sent_frames.values()))
+
+    def handle_ack(self, ack_frame):
+        # The Stop-and-Wait receiver does not number its ACKs; any ACK releases the current frame
+        if self.timer:
+            self.timer.cancel()
+        metrics.ACKS_RECEIVED.inc()
+        for seq_no, dataframe in self.sent_frames.items():
+            self.event_log.record(eventlog.ACK, seq_no)
+            self.rtt.frame_acked(seq_no)
+            metrics.frame_delivered(dataframe)
+        self.sent_frames.clear()
+        self.fill_window()
+
+
+class AsyncGoBackNSender(AsyncSender):
+    protocol = 'GoBackN'
+
+    def __init__(self, *args, window_size=go_back_n.WINDOW_SIZE, timeout=go_back_n.TIMEOUT, **kwargs):
+        super().__init__(*args, window_size=window_size, timeout=timeout, **kwargs)
+        self.base = 0
+        self.timer = None
+
+    def fill_window(self):
+        window_start = self.next_seq_no
+        new_frames = self.next_frames(self.base + self.window_size - self.next_seq_no)
+        if new_frames:
+            self.send_frames(new_frames)
+            if self.base == window_start:
+                self.start_timer()
+        self.finish_if_done()
+
+    def start_timer(self):
+        self.stop_timer()
+        self.timer = self.clock.call_later(self.rtt.rto, self.timeout_handler)
+
+    def stop_timer(self):
+        if self.timer:
+            self.timer.cancel()
+
+    def timeout_handler(self):
+        print(f"Timeout occurred. Resending frames from {self.base}.")
+        self.event_log.record(eventlog.TIMEOUT, self.base)
+        metrics.TIMEOUTS.inc()
+        self.rtt.backoff()
+        if self.window_controller is not None:
+            self.set_window_size(self.window_controller.timeout(self.next_seq_no))
+        self.send_frames([self.sent_frames[seq_no] for seq_no in range(self.base, self.next_seq_no)])
+        self.start_timer()
+
+    def handle_ack(self, ack_frame):
+        ack_seq_no = seq_unwrap(ack_frame.frame_seq_no, self.base)
+        metrics.ACKS_RECEIVED.inc()
+        if ack_seq_no < self.base:
+            return
+        print(f"ACK {ack_seq_no} received.")
+        self.event_log.record(eventlog.ACK, ack_seq_no)
+        self.rtt.frame_acked(ack_seq_no, cumulative=True)
+        if self.window_controller is not None:
+            self.set_window_size(self.window_controller.frames_acked(ack_seq_no + 1 - self.base))
+        for seq_no in range(self.base, ack_seq_no + 1):
+            dataframe = self.sent_frames.pop(seq_no, None)
+            if dataframe is not None:
+                metrics.frame_delivered(dataframe)
+        self.base = ack_seq_no + 1
+        if self.base == self.next_seq_no:
+            self.stop_timer()
+        else:
+            self.start_timer()
+        self.fill_window()
+
+
+class AsyncSelectiveRepeatSender(AsyncSender):
+    protocol = 'SelectiveRepeat'
+
+    def __init__(self, *args, window_size=selective_repeat.WINDOW_SIZE, timeout=selective_repeat.TIMEOUT, **kwargs):
+        super().__init__(*args, window_size=window_size, timeout=timeout, **kwargs)
+        self.timers = {}
+        self.send_counter = itertools.count()
+        self.sent_order = {}  # Order of each unacknowledged frame's latest transmission
+        self.delivered_order = -1
+
+    def fill_window(self):
+        for dataframe in self.next_frames(self.window_size - len(self.sent_frames)):
+            self.send_frame(dataframe)
+        self.finish_if_done()
+
+    def send_frame(self, dataframe):
+        seq_no = dataframe.frame_seq_no
+        self.send_frames([dataframe])
+        self.sent_order[seq_no] = next(self.send_counter)
+        if seq_no in self.timers:
+            self.timers[seq_no].cancel()
+        self.timers[seq_no] = self.clock.call_later(self.rtt.rto, self.timeout_handler, seq_no)
+
+    def timeout_handler(self, seq_no):
+        if seq_no in self.sent_frames:
+            print(f"Timeout, retransmitting frame: {seq_no}")
+            self.event_log.record(eventlog.TIMEOUT, seq_no)
+            metrics.TIMEOUTS.inc()
+            # Back off once per stalled window, i.e. only when the oldest outstanding frame times out
+            if seq_no == next(iter(self.sent_frames)):
+                self.rtt.backoff()
+                if self.window_controller is not None:
+                    self.set_window_size(self.window_controller.timeout(self.next_seq_no))
+            self.send_frame(self.sent_frames[seq_no])
+
+    def handle_ack(self, ack_frame):
+        ack_seq_no = seq_unwrap(ack_frame.frame_seq_no, next(iter(self.sent_frames), self.next_seq_no))
+        (metrics.NACKS_RECEIVED if ack_frame.nack else metrics.ACKS_RECEIVED).inc()
+        if ack_frame.nack:
+            nack_seq_no = ack_seq_no
+            if nack_seq_no in self.sent_frames:
+                print(f"NACK received for frame: {nack_seq_no}, resending.")
+                self.event_log.record(eventlog.NACK, nack_seq_no)
+                self.frame_lost(nack_seq_no)
+                self.send_frame(self.sent_frames[nack_seq_no])
+            return
+
+        selected = set()
+        if isinstance(ack_frame, SACK):
+            selected = {ack_seq_no + offset for offset in ack_frame.selected()}
+        self.rtt.frame_acked(ack_seq_no, cumulative=True)
+        highest_selected = max(selected, default=ack_seq_no)
+        acked = 0
+        gaps = []
+        for seq_no in list(self.sent_frames):
+            if seq_no <= ack_seq_no or seq_no in selected:
+                if seq_no in selected:
+                    self.rtt.frame_acked(seq_no)
+                print(f"ACK received for frame: {seq_no}, removing from buffer.")
+                self.event_log.record(eventlog.ACK, seq_no)
+                metrics.frame_delivered(self.sent_frames.pop(seq_no))
+                self.timers.pop(seq_no).cancel()
+                self.delivered_order = max(self.delivered_order, self.sent_order.pop(seq_no))
+                acked += 1
+            elif seq_no < highest_selected:
+                gaps.append(seq_no)
+        if acked and self.window_controller is not None:
+            self.set_window_size(self.window_controller.frames_acked(acked))
+
+        # Same rule as the threaded sender: a gap is lost once a later transmission got through
+        for seq_no in gaps:
+            if self.sent_order[seq_no] < self.delivered_order:
+                print(f"SACK shows frame {seq_no} missing, resending.")
+                self.event_log.record(eventlog.NACK, seq_no)
+                self.frame_lost(seq_no)
+                self.send_frame(self.sent_frames[seq_no])
+        self.fill_window()
+
+    def frame_lost(self, seq_no):
+        if self.window_controller is not None:
+            self.set_window_size(self.window_controller.frame_lost(seq_no, self.next_seq_no))
+
+
+SENDERS = {
+    'StopAndWait': AsyncStopAndWaitSender,
+    'GoBackN': AsyncGoBackNSender,
+    'SelectiveRepeat': AsyncSelectiveRepeatSender
+}
+
+RECEIVERS = {
+    'StopAndWait': stop_and_wait.Receiver,
+    'GoBackN': go_back_n.Receiver,
+    'SelectiveRepeat': selective_repeat.Receiver
+}
+
+
+async def receive_data(receiver, reader):
+    """Feeds frames from reader into a threaded Receiver's handle_frame on the event loop."""
+    with open_sink(receiver.output_file, receiver.output_format) as output:
+        while True:
+            data = await read_frame(reader)
+            if data is None:
+                print("Connection closed by sender.")
+                break
+            if not receiver.handle_frame(DataFrame.from_bytes(data), output):
+                break
+            await receiver.connection.writer.drain()
+    receiver.connection.close()
+    delayed_ack = getattr(receiver, 'delayed_ack', None)
+    if delayed_ack is not None:
+        delayed_ack.close()
+        print(delayed_ack.summary())
+    validate(receiver.input_file, receiver.output_file, output.frame_size, receiver.first_frame, receiver.output_format)
+
+
+async def send(protocol, input_file, packet_size, technique, source, destination, server_address, **sender_options):
+    """Sends input_file to server_address; sender_options (window_size, window_controller, ...) go to the sender."""
+    reader, writer = await asyncio.open_connection(*server_address)
+    print(f"Connected to receiver at {server_address}")
+    sender = SENDERS[protocol](AsyncFrameConnection(writer), input_file, source, destination, technique, packet_size,
+                               **sender_options)
+    await sender.send_data(reader)
+    print("Closing connection after all frames are sent.")
+    writer.close()
+    await writer.wait_closed()
+
+
+async def serve(protocol, technique, address, server_address, ack_every=1, ack_delay=ACK_DELAY, max_connections=1,
+                output_file="output.bin", session_done=None, **receiver_options):
+    """
+    Serves up to max_connections senders at a time on one event loop. With more than one, every
+    session writes to its own output file; further senders wait until a session ends.
+    session_done(), if given, is called after every session.
+    """
+    ReceiverClass = RECEIVERS[protocol]
+    slots = asyncio.Semaphore(max_connections)
+    session_ids = itertools.count(1)
+
+    async def handle_connection(reader, writer):
+        client_address = writer.get_extra_info('peername')
+        async with slots:
+            session_id = next(session_ids)
+            session_options = dict(receiver_options)
+            session_options['output_file'] = output_file
+            if max_connections > 1:
+                session_options['output_file'] = session_output_file(output_file, session_id)
+            print(f"Session {session_id}: connection established with {client_address}")
+            if ack_every > 1:
+                # Deadlines run on the event loop, which also owns the writer
+                session_options['delayed_ack'] = DelayedAck(ack_every, ack_delay, asyncio.get_running_loop().call_later)
+            receiver = ReceiverClass(connection=AsyncFrameConnection(writer), checker=technique, address=address,
+                                     **session_options)
+            await receive_data(receiver, reader)
+            print(f"Session {session_id}: connection closed with {client_address}")
+            if session_done is not None:
+                session_done()
+
+    server = await asyncio.start_server(handle_connection, *server_address)
+    print(f"Receiver listening on {server_address} using protocol '{protocol}' with technique '{technique}' (asyncio).")
+    async with server:
+        await server.serve_forever()
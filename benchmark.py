@@ -0,0 +1,251 @@
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import stop_and_wait
+import go_back_n
+import selective_repeat
+import metrics
+from channel import Channel
+from validator import validate
+from transport import loopback_pair
+from options import PROTOCOL_NAMES, TECHNIQUE_NAMES, parse_options
+
+PROTOCOLS = {
+    'StopAndWait': stop_and_wait,
+    'GoBackN': go_back_n,
+    'SelectiveRepeat': selective_repeat
+}
+TECHNIQUES = ('CRC', 'Checksum')
+PACKET_SIZES = (46, 512)
+WINDOW_SIZES = (4, 16)
+LOSS_PROBABILITIES = (0.0, 0.1, 0.3)
+ERROR_PROBABILITIES = (0.0, 0.1)
+NUM_FRAMES = 100
+SEED = 1
+TIMEOUT = 0.05  # Initial RTO; the protocols' default of seconds would make every early loss dominate the run
+TOLERANCE = 0.25
+MIN_COMPARABLE_TIME = 0.05  # Runs shorter than this on both sides are too noisy to compare timings
+DEADLINE = 60  # Seconds a case may run before it is stopped and reported as not finished
+RESULTS_FILE = 'benchmark_results.json'
+
+SOURCE_ADDRESS = b'\x01\x02\x03\x04\x05\x06'
+DESTINATION_ADDRESS = b'\x06\x05\x04\x03\x02\x01'
+
+
+def benchmark_cases(protocols=tuple(PROTOCOLS), techniques=TECHNIQUES, packet_sizes=PACKET_SIZES,
+                    window_sizes=WINDOW_SIZES, loss_probabilities=LOSS_PROBABILITIES,
+                    error_probabilities=ERROR_PROBABILITIES):
+    """The grid of runs; Stop-and-Wait has no window, so it runs once per remaining combination."""
+    for protocol, technique, packet_size, loss, error in itertools.product(
+            protocols, techniques, packet_sizes, loss_probabilities, error_probabilities):
+        for window_size in ((1,) if protocol == 'StopAndWait' else window_sizes):
+            yield {
+                'protocol': protocol,
+                'technique': technique,
+                'packet_size': packet_size,
+                'window_size': window_size,
+                'loss': loss,
+                'error': error
+            }
+
+
+def case_key(case):
+    return (f"{case['protocol']}/{case['technique']}/{case['packet_size']}B/w{case['window_size']}"
+            f"/loss{case['loss']}/error{case['error']}")
+
+
+def write_input(input_file, num_frames, packet_size, seed):
+    rng = random.Random(seed)
+    with open(input_file, 'w') as bitstream:
+        bitstream.write(''.join(rng.choice('01') for _ in range(num_frames * packet_size * 8)))
+
+
+def run_case(case, num_frames=NUM_FRAMES, seed=SEED, workdir='.'):
+    """
+    Runs one transfer between a Sender and a Receiver of the same process over a loopback
+    transport, with the channel's loss and errors drawn from a generator seeded with seed.
+    """
+    module = PROTOCOLS[case['protocol']]
+    input_file = os.path.join(workdir, 'input.txt')
+    output_file = os.path.join(workdir, 'output.bin')
+    write_input(input_file, num_frames, case['packet_size'], seed)
+
+    sender_options = {}
+    receiver_options = {}
+    if case['protocol'] != 'StopAndWait':
+        sender_options['window_size'] = case['window_size']
+    if case['protocol'] == 'SelectiveRepeat':
+        receiver_options['window_size'] = case['window_size']
+
+    sender_end, receiver_end = loopback_pair()
+    receiver = module.Receiver(receiver_end, case['technique'], DESTINATION_ADDRESS, input_file=input_file,
+                               output_file=output_file, **receiver_options)
+    sender = module.Sender(
+        connection=sender_end,
+        input_file=input_file,
+        source=SOURCE_ADDRESS,
+        destination=DESTINATION_ADDRESS,
+        checker=case['technique'],
+        bytes=case['packet_size'],
+        log_file=os.path.join(workdir, 'log.txt'),
+        timeout=TIMEOUT,
+        channel=Channel(case['loss'], case['error'], rng=random.Random(seed), verbose=False),
+        **sender_options
+    )
+
+    metrics.REGISTRY.reset()
+    with contextlib.redirect_stdout(io.StringIO()):
+        receiver_thread = threading.Thread(target=receiver.receive_data)
+        receiver_thread.start()
+        start_time = time.perf_counter()
+        sender.send_data()
+        wall_time = time.perf_counter() - start_time
+        sender_end.close()
+        receiver_thread.join()
+        report = validate(input_file, output_file, case['packet_size'])
+    output_size = os.path.getsize(output_file)
+
+    counts = metrics.REGISTRY.snapshot()
+    sent = counts['arq_frames_sent_total']
+    return dict(
+        case,
+        finished=True,
+        wall_time=wall_time,
+        throughput=counts['arq_wire_bytes_total'] / wall_time,  # Bytes of data frames per second, resends included
+        goodput=counts['arq_delivered_bytes_total'] / wall_time,  # Payload bytes delivered in order per second
+        retransmission_ratio=counts['arq_frames_resent_total'] / sent if sent else 0.0,
+        frames_delivered=(output_size + case['packet_size'] - 1) // case['packet_size'],
+        frames_incorrect=report.frames_incorrect
+    )
+
+
+def case_worker(connection, case, num_frames, seed, workdir):
+    connection.send(run_case(case, num_frames, seed, workdir))
+    connection.close()
+
+
+def run_case_with_deadline(case, num_frames=NUM_FRAMES, seed=SEED, workdir='.', deadline=DEADLINE):
+    """
+    Runs run_case in a child process, since a stalled Sender cannot be stopped from another thread.
+    A case still running after deadline seconds is killed and reported with finished=False.
+    """
+    receiving, sending = multiprocessing.Pipe(duplex=False)
+    worker = multiprocessing.Process(target=case_worker, args=(sending, case, num_frames, seed, workdir), daemon=True)
+    worker.start()
+    sending.close()
+    try:
+        if receiving.poll(deadline):
+            try:
+                return receiving.recv()
+            except EOFError:
+                raise RuntimeError(f"{case_key(case)} failed; see the traceback above.") from None
+        worker.terminate()
+        return dict(case, finished=False, wall_time=deadline, throughput=0.0, goodput=0.0, retransmission_ratio=0.0,
+                    frames_delivered=0, frames_incorrect=0)
+    finally:
+        worker.join()
+        receiving.close()
+
+
+def run_benchmarks(cases, num_frames=NUM_FRAMES, seed=SEED, deadline=DEADLINE):
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for case in cases:
+            result = run_case_with_deadline(case, num_frames, seed, workdir, deadline)
+            results.append(result)
+            if not result['finished']:
+                print(f"{case_key(case):<48} did not finish within {deadline} s")
+                continue
+            print(f"{case_key(case):<48} {result['wall_time']:8.3f} s {result['goodput']:12.0f} B/s goodput "
+                  f"{result['retransmission_ratio']:6.2f} resent/sent")
+    return {'num_frames': num_frames, 'seed': seed, 'timeout': TIMEOUT, 'deadline': deadline, 'results': results}
+
+
+def compare(report, baseline, tolerance=TOLERANCE):
+    """
+    Regressions of report against baseline: a case whose goodput fell or whose wall time grew by more
+    than tolerance (a fraction), that no longer delivers the whole file intact, or that no longer
+    finishes within the deadline. Timings of runs that took under MIN_COMPARABLE_TIME in both
+    reports, or that did not finish in either, are not compared.
+    """
+    baseline_results = {case_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        key = case_key(result)
+        previous = baseline_results.get(key)
+        if previous is None:
+            continue
+        if not result.get('finished', True):
+            if previous.get('finished', True):
+                regressions.append(f"{key}: did not finish within {report['deadline']} s")
+            continue
+        if not previous.get('finished', True):
+            continue
+        if max(result['wall_time'], previous['wall_time']) >= MIN_COMPARABLE_TIME:
+            if result['goodput'] < previous['goodput'] * (1 - tolerance):
+                regressions.append(f"{key}: goodput {previous['goodput']:.0f} -> {result['goodput']:.0f} B/s")
+            if result['wall_time'] > previous['wall_time'] * (1 + tolerance):
+                regressions.append(f"{key}: wall time {previous['wall_time']:.3f} -> {result['wall_time']:.3f} s")
+        if result['frames_incorrect'] or result['frames_delivered'] < report['num_frames']:
+            regressions.append(f"{key}: {result['frames_delivered']} frames delivered, "
+                               f"{result['frames_incorrect']} incorrect")
+    return regressions
+
+
+def parse_list(value, convert):
+    return tuple(convert(item) for item in value.split(','))
+
+
+def main():
+    args, options = parse_options(sys.argv[1:])
+    if args:
+        print("Usage: python benchmark.py [--protocols=P,...] [--techniques=T,...] [--packet-sizes=N,...] "
+              "[--windows=N,...] [--loss=P,...] [--error=P,...] [--frames=N] [--seed=N] [--output=FILE] "
+              "[--baseline=FILE] [--tolerance=F] [--deadline=S]")
+        print("Protocol: 'StopAndWait' or '1', 'GoBackN' or '2', or 'SelectiveRepeat' or '3'")
+        print("Technique: 'CRC' or '1', 'Checksum' or '2'")
+        sys.exit(1)
+
+    protocols = parse_list(options['protocols'], PROTOCOL_NAMES.get) if 'protocols' in options else tuple(PROTOCOLS)
+    techniques = parse_list(options['techniques'], TECHNIQUE_NAMES.get) if 'techniques' in options else TECHNIQUES
+    if None in protocols or None in techniques:
+        print("Error: Invalid protocol or technique.")
+        sys.exit(1)
+
+    cases = list(benchmark_cases(
+        protocols,
+        techniques,
+        parse_list(options['packet_sizes'], int) if 'packet_sizes' in options else PACKET_SIZES,
+        parse_list(options['windows'], int) if 'windows' in options else WINDOW_SIZES,
+        parse_list(options['loss'], float) if 'loss' in options else LOSS_PROBABILITIES,
+        parse_list(options['error'], float) if 'error' in options else ERROR_PROBABILITIES
+    ))
+    report = run_benchmarks(cases, int(options.get('frames', NUM_FRAMES)), int(options.get('seed', SEED)),
+                            float(options.get('deadline', DEADLINE)))
+
+    output_file = options.get('output', RESULTS_FILE)
+    with open(output_file, 'w') as output:
+        json.dump(report, output, indent=2)
+    print(f"{len(cases)} runs written to {output_file}")
+
+    if 'baseline' in options:
+        with open(options['baseline']) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(report, baseline, float(options.get('tolerance', TOLERANCE)))
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {options['baseline']}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,95 @@
 import random
-from error_injector import inject_error_random
-from dataframe import DataFrame
+from error_injector import ERROR_TYPES, random_error_mask, apply_error_mask
+from dataframe import DataFrame, FCS_SIZE
+from metrics import FRAMES_LOST, FRAMES_CORRUPTED
 
 FRAME_LOSS_PROBABILITY = 0.3
 ERROR_PROBABILITY = 0.3
 
 class Channel:
-    def __init__(self, frame_loss_prob=FRAME_LOSS_PROBABILITY, error_prob=ERROR_PROBABILITY):
+    def __init__(self, frame_loss_prob=FRAME_LOSS_PROBABILITY, error_prob=ERROR_PROBABILITY, rng=None, verbose=True):
         self.frame_loss_prob = frame_loss_prob
         self.error_prob = error_prob
-        print(f"frame_loss_prob={frame_loss_prob}")
-        print(f"error_prob={error_prob}")
+        self.rng = rng if rng is not None else random
+        self.verbose = verbose
+        if verbose:
+            print(f"frame_loss_prob={frame_loss_prob}")
+            print(f"error_prob={error_prob}")
 
     def transmit(self, dataframe):
         if not isinstance(dataframe, DataFrame):
             raise TypeError("Expected a DataFrame object")
 
-        if random.random() < self.frame_loss_prob:
-            print(f"Frame {dataframe.frame_seq_no} lost during transmission.")
+        if self.rng.random() < self.frame_loss_prob:
+            FRAMES_LOST.inc()
+            if self.verbose:
+                print(f"Frame {dataframe.frame_seq_no} lost during transmission.")
             return None
 
         data_with_errors = self.introduce_errors(dataframe)
         return data_with_errors
 
-    def introduce_errors(self, dataframe):
-        if random.random() < self.error_prob:
-            combined_data = dataframe.payload + dataframe.fcs
-            error_type = random.choice(["SINGLE", "DOUBLE", "ODD", "BURST"])
-
-            if error_type == "BURST":
-                max_burst_length = len(combined_data)
-                burst_length = 1 if max_burst_length < 2 else random.randint(2, max_burst_length)
-                errored_data = inject_error_random(combined_data, error_type, burst_length=burst_length)
+    def transmit_batch(self, dataframes):
+        """
+        Transmits a window of frames. Every random decision for the batch is drawn before any frame
+        is built: the loss and error flags and error types of all frames, then the error pattern of
+        each frame that is corrupted. Without NumPy each decision is still one call to the generator;
+        what the batch saves is building frames between draws.
+        """
+        for dataframe in dataframes:
+            if not isinstance(dataframe, DataFrame):
+                raise TypeError("Expected a DataFrame object")
+
+        rng = self.rng
+        count = len(dataframes)
+        lost = [rng.random() < self.frame_loss_prob for _ in range(count)]
+        errored = [rng.random() < self.error_prob for _ in range(count)]
+        error_types = rng.choices(ERROR_TYPES, k=count)
+        masks = [self.error_mask(dataframe, error_type) if has_error and not is_lost else None
+                 for dataframe, is_lost, has_error, error_type in zip(dataframes, lost, errored, error_types)]
+
+        transmitted = []
+        for dataframe, is_lost, mask in zip(dataframes, lost, masks):
+            if is_lost:
+                FRAMES_LOST.inc()
+                if self.verbose:
+                    print(f"Frame {dataframe.frame_seq_no} lost during transmission.")
+                transmitted.append(None)
+            elif mask is not None:
+                transmitted.append(self.apply_errors(dataframe, mask))
             else:
-                errored_data = inject_error_random(combined_data, error_type)
-
-            new_payload = errored_data[:-32]
-            new_fcs = errored_data[-32:]
-
-            new_dataframe = DataFrame(
-                source_address=dataframe.source_address,
-                destination_address=dataframe.destination_address,
-                length=dataframe.length,
-                frame_seq_no=dataframe.frame_seq_no,
-                payload=new_payload,
-                error_checking_scheme=dataframe.error_checking_scheme
-            )
-            new_dataframe.fcs = new_fcs
-
-            return new_dataframe
-        return dataframe
\ No newline at end of file
+                transmitted.append(dataframe)
+        return transmitted
+
+    def corrupt(self, dataframe, error_type):
+        return self.apply_errors(dataframe, self.error_mask(dataframe, error_type))
+
+    def error_mask(self, dataframe, error_type):
+        """Draws an error pattern of error_type over the frame's payload and FCS."""
+        codeword_length = (len(dataframe.payload) + len(dataframe.fcs)) * 8
+        burst_length = None
+        if error_type == "BURST":
+            burst_length = 1 if codeword_length < 2 else self.rng.randint(2, codeword_length)
+        return random_error_mask(codeword_length, error_type, burst_length, self.rng)
+
+    def apply_errors(self, dataframe, mask):
+        """A copy of dataframe with the bits set in mask flipped in its payload and FCS."""
+        FRAMES_CORRUPTED.inc()
+        errored = apply_error_mask(bytes(dataframe.payload) + bytes(dataframe.fcs), mask)
+
+        new_dataframe = DataFrame(
+            source_address=dataframe.source_address,
+            destination_address=dataframe.destination_address,
+            length=dataframe.length,
+            frame_seq_no=dataframe.frame_seq_no,
+            payload=errored[:-FCS_SIZE],
+            error_checking_scheme=None
+        )
+        new_dataframe.error_checking_scheme = dataframe.error_checking_scheme
+        new_dataframe.fcs = errored[-FCS_SIZE:]
+        return new_dataframe
+
+    def introduce_errors(self, dataframe):
+        if self.rng.random() < self.error_prob:
+            return self.corrupt(dataframe, self.rng.choice(ERROR_TYPES))
+        return dataframe
@@ -0,0 +1,30 @@
+import abc
+
+
+class Clock(abc.ABC):
+    """
+    Time and timers for the event-driven senders of async_arq: an asyncio event loop for real
+    transfers, or the virtual clock of simulation.py. Timer callbacks run on the clock's own loop,
+    one at a time, so senders need no locks.
+    """
+
+    @abc.abstractmethod
+    def time(self):
+        """Current time in seconds; only differences between two readings are meaningful."""
+
+    @abc.abstractmethod
+    def call_later(self, delay, callback, *args):
+        """Runs callback(*args) after delay seconds; returns a handle whose cancel() stops it."""
+
+
+class AsyncioClock(Clock):
+    """The clock of a running asyncio event loop."""
+
+    def __init__(self, loop):
+        self.loop = loop
+
+    def time(self):
+        return self.loop.time()
+
+    def call_later(self, delay, callback, *args):
+        return self.loop.call_later(delay, callback, *args)
@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import deque
+
+INITIAL_WINDOW = 1
+MIN_WINDOW = 1
+MAX_WINDOW = 64
+DECREASE_FACTOR = 1 / 2
+
+
+class WindowController:
+    """
+    Sender window sized from ACKs and losses instead of a fixed constant (slow start plus AIMD).
+
+    Below ssthresh every acknowledged frame grows the window by one, doubling it each round
+    trip; above it the window grows by one frame per window of ACKs. A NACK halves the window,
+    a timeout halves ssthresh and restarts from min_window. Losses of frames that were already
+    in flight at the last decrease belong to the same loss event and do not shrink it again.
+    """
+
+    def __init__(self, initial_window=INITIAL_WINDOW, min_window=MIN_WINDOW, max_window=MAX_WINDOW,
+                 ssthresh=None, history=1024, clock=time.monotonic):
+        self.min_window = min_window
+        self.max_window = max_window
+        self.cwnd = float(min(max_window, max(min_window, initial_window)))
+        self.ssthresh = ssthresh if ssthresh is not None else max_window
+        self.recover = 0  # frames numbered below this were in flight at the last decrease
+        self.window_size = int(self.cwnd)
+        self.changes = 0
+        self.history = deque(maxlen=history)  # (time, window_size) at every change
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.history.append((clock(), self.window_size))
+
+    def frames_acked(self, count=1):
+        """Grows the window for count newly acknowledged frames; returns the new window size."""
+        with self.lock:
+            for _ in range(count):
+                if self.cwnd < self.ssthresh:
+                    self.cwnd += 1
+                else:
+                    self.cwnd += 1 / self.cwnd
+            self.cwnd = min(self.cwnd, self.max_window)
+            return self.update()
+
+    def frame_lost(self, seq_no, next_seq_no):
+        """Multiplicative decrease on a NACK for seq_no, once per loss event."""
+        with self.lock:
+            if seq_no >= self.recover:
+                self.recover = next_seq_no
+                self.ssthresh = max(self.min_window, self.cwnd * DECREASE_FACTOR)
+                self.cwnd = self.ssthresh
+            return self.update()
+
+    def timeout(self, next_seq_no):
+        """Back to slow start after a retransmission timer expired."""
+        with self.lock:
+            self.recover = max(self.recover, next_seq_no)
+            self.ssthresh = max(self.min_window, self.cwnd * DECREASE_FACTOR)
+            self.cwnd = self.min_window
+            return self.update()
+
+    def update(self):
+        window_size = int(self.cwnd)
+        if window_size != self.window_size:
+            self.window_size = window_size
+            self.changes += 1
+            self.history.append((self.clock(), window_size))
+        return window_size
@@ -1,5 +1,27 @@
 import struct
 from error_checker import CRC, Checksum
+from seqnum import seq_wrap
+
+FRAME_VERSION = 2
+HEADER_V1 = struct.Struct('!6s6sHB')
+HEADER_V2 = struct.Struct('!B6s6sII')  # version, addresses, 32-bit length and sequence number
+HEADER = HEADER_V2
+FCS_SIZE = 4
+
+
+def bits_to_bytes(bits):
+    """Packs a '0'/'1' string (or its ASCII bytes) into bytes, zero padding the last byte."""
+    if not bits:
+        return b''
+    num_bytes = (len(bits) + 7) // 8
+    return (int(bits, 2) << (num_bytes * 8 - len(bits))).to_bytes(num_bytes, 'big')
+
+
+def bytes_to_bits(data):
+    if not data:
+        return ''
+    return format(int.from_bytes(data, 'big'), f'0{len(data) * 8}b')
+
 
 class DataFrame:
     def __init__(self, source_address, destination_address, length, frame_seq_no, payload, error_checking_scheme):
@@ -7,6 +29,8 @@ class DataFrame:
         self.destination_address = destination_address
         self.length = length
         self.frame_seq_no = frame_seq_no
+        if isinstance(payload, str):
+            payload = bits_to_bytes(payload)
         self.payload = payload
         self.error_checking_scheme = error_checking_scheme
         self.first_time = True
@@ -18,20 +42,36 @@ class DataFrame:
             checksum = Checksum()
             self.fcs = checksum.generate_fcs(payload)
 
-    def to_bytes(self):
-        header = struct.pack('!6s6sHB', self.source_address, self.destination_address, self.length, self.frame_seq_no)
-        payload_bytes = bytes(int(self.payload[i:i+8], 2) for i in range(0, len(self.payload), 8))
-        fcs_bytes = bytes(int(self.fcs[i:i+8], 2) for i in range(0, len(self.fcs), 8))
-        return header + payload_bytes + fcs_bytes
+    @property
+    def payload_bits(self):
+        return bytes_to_bits(self.payload)
+
+    @property
+    def fcs_bits(self):
+        return bytes_to_bits(self.fcs)
+
+    def to_bytes(self, version=FRAME_VERSION):
+        if version == 1:
+            header = HEADER_V1.pack(self.source_address, self.destination_address, self.length, self.frame_seq_no)
+        else:
+            header = HEADER_V2.pack(FRAME_VERSION, self.source_address, self.destination_address,
+                                    self.length, seq_wrap(self.frame_seq_no))
+        return b''.join((header, self.payload, self.fcs))
 
     @staticmethod
-    def from_bytes(data):
-        source_address = data[:6]
-        destination_address = data[6:12]
-        length = struct.unpack('!H', data[12:14])[0]
-        frame_seq_no = struct.unpack('B', data[14:15])[0]
-        payload = ''.join(format(byte, '08b') for byte in data[15:-4])
-        fcs = ''.join(format(byte, '08b') for byte in data[-4:])
+    def from_bytes(data, version=FRAME_VERSION):
+        """Decodes a frame; frame_seq_no is the header value, which wraps around in version 2."""
+        view = memoryview(data)
+        if version == 1:
+            source_address, destination_address, length, frame_seq_no = HEADER_V1.unpack_from(view)
+            header_size = HEADER_V1.size
+        else:
+            frame_version, source_address, destination_address, length, frame_seq_no = HEADER_V2.unpack_from(view)
+            if frame_version != FRAME_VERSION:
+                raise ValueError(f"Unsupported data frame version {frame_version}.")
+            header_size = HEADER_V2.size
+        payload = view[header_size:-FCS_SIZE]
+        fcs = bytes(view[-FCS_SIZE:])
         dataframe = DataFrame(source_address, destination_address, length, frame_seq_no, payload, None)
         dataframe.fcs = fcs
-        return dataframe
\ No newline at end of file
+        return dataframe
@@ -0,0 +1,72 @@
+import threading
+
+ACK_EVERY = 2
+ACK_DELAY = 0.02  # seconds an ACK may be held back
+
+
+def thread_call_later(delay, callback):
+    timer = threading.Timer(delay, callback)
+    timer.daemon = True
+    timer.start()
+    return timer
+
+
+class DelayedAck:
+    """
+    Coalesces a receiver's ACKs: the newest ACK is held back and sent once every frames have been
+    acknowledged, or delay seconds after the first held one, whichever comes first. Every held ACK
+    must supersede the ones before it, as a cumulative ACK or a SACK does.
+
+    call_later(delay, callback) arms the deadline and returns an object with cancel(); it defaults
+    to a timer thread, and an asyncio receiver passes loop.call_later.
+    """
+
+    def __init__(self, every=ACK_EVERY, delay=ACK_DELAY, call_later=thread_call_later):
+        self.every = every
+        self.delay = delay
+        self.call_later = call_later
+        self.lock = threading.Lock()
+        self.pending = None  # (ack_frame, send) of the newest held ACK
+        self.held = 0
+        self.timer = None
+        self.acks = 0  # ACKs the receiver asked for
+        self.sent = 0  # ACK frames that actually went out
+
+    @property
+    def saved(self):
+        return self.acks - self.sent
+
+    def hold(self, ack_frame, send):
+        """Queues ack_frame in place of any held ACK; send(ack_frame) transmits it when due."""
+        with self.lock:
+            self.acks += 1
+            self.pending = (ack_frame, send)
+            self.held += 1
+            if self.held < self.every:
+                if self.timer is None:
+                    self.timer = self.call_later(self.delay, self.flush)
+                return
+        self.flush()
+
+    def flush(self):
+        """Sends the held ACK, if any, right away."""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            pending, self.pending, self.held = self.pending, None, 0
+            if pending is not None:
+                ack_frame, send = pending
+                self.sent += 1
+                send(ack_frame)
+
+    def close(self):
+        """Drops the held ACK and its deadline once the connection is gone."""
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            self.pending, self.held = None, 0
+
+    def summary(self):
+        return f"ACKs: {self.acks} due, {self.sent} sent, {self.saved} saved by coalescing"
@@ -1,3 +1,7 @@
+import struct
+import sys
+from array import array
+
 CRC_POLYNOMIALS = {
     "CRC-32": "100000100110000010001110110110111"
 }
@@ -26,33 +30,141 @@ def mod2div(dividend, divisor):
     return tmp
 
 
+class CRCTable:
+    """Byte-wise CRC engine driven by precomputed slicing-by-N lookup tables."""
+
+    _WORD_FORMATS = {1: '!B', 2: '!H', 4: '!I', 8: '!Q'}
+
+    def __init__(self, polynomial):
+        self.width = len(polynomial) - 1
+        if self.width % 8 or self.width // 8 not in self._WORD_FORMATS:
+            raise ValueError("Table-driven CRC needs a polynomial width of 8, 16, 32 or 64 bits")
+        self.mask = (1 << self.width) - 1
+        self.poly = int(polynomial, 2) & self.mask
+        self.top_bit = 1 << (self.width - 1)
+        self.slices = self.width // 8
+        self.word_format = self._WORD_FORMATS[self.slices]
+
+        # tables[k][b] is the register after feeding byte b followed by k zero bytes
+        base = []
+        for byte in range(256):
+            crc = byte << (self.width - 8)
+            for _ in range(8):
+                crc = (crc << 1) ^ self.poly if crc & self.top_bit else crc << 1
+            base.append(crc & self.mask)
+        self.tables = [base]
+        shift = self.width - 8
+        for _ in range(1, self.slices):
+            previous = self.tables[-1]
+            self.tables.append([((crc << 8) & self.mask) ^ base[crc >> shift] for crc in previous])
+
+    def compute(self, data, crc=0):
+        data = memoryview(data).cast('B')
+        shift = self.width - 8
+        mask = self.mask
+        base = self.tables[0]
+        aligned = len(data) - len(data) % self.slices
+
+        if self.slices == 4:
+            t0, t1, t2, t3 = self.tables
+            for (word,) in struct.iter_unpack('!I', data[:aligned]):
+                crc ^= word
+                crc = t3[crc >> 24] ^ t2[(crc >> 16) & 0xFF] ^ t1[(crc >> 8) & 0xFF] ^ t0[crc & 0xFF]
+        else:
+            reversed_tables = self.tables[::-1]
+            for (word,) in struct.iter_unpack(self.word_format, data[:aligned]):
+                crc ^= word
+                result = 0
+                for k, table in enumerate(reversed_tables):
+                    result ^= table[(crc >> (shift - 8 * k)) & 0xFF]
+                crc = result
+
+        for byte in data[aligned:]:
+            crc = ((crc << 8) & mask) ^ base[(crc >> shift) ^ byte]
+        return crc
+
+    def compute_bits(self, bits, crc=0):
+        # Compatibility path for '0'/'1' strings: whole bytes go through the tables, the tail bit by bit
+        whole = len(bits) // 8 * 8
+        if whole:
+            crc = self.compute(int(bits[:whole], 2).to_bytes(whole // 8, 'big'), crc)
+        for bit in bits[whole:]:
+            if bit == '1':
+                crc ^= self.top_bit
+            crc = (crc << 1) ^ self.poly if crc & self.top_bit else crc << 1
+            crc &= self.mask
+        return crc
+
+
+CRC_TABLES = {crc_type: CRCTable(polynomial) for crc_type, polynomial in CRC_POLYNOMIALS.items()}
+
+
 class CRC:
     def __init__(self, crc_type="CRC-32"):
         self.crc_type = crc_type
         self.polynomial = CRC_POLYNOMIALS[crc_type]
+        self.table = CRC_TABLES[crc_type]
 
     def generate_fcs(self, dataword):
-        l_key = len(self.polynomial)
-        appended_data = dataword + '0' * (l_key - 1)
-        remainder = mod2div(appended_data, self.polynomial)
-        return remainder
+        if isinstance(dataword, str):
+            return format(self.table.compute_bits(dataword), f'0{self.table.width}b')
+        return self.table.compute(dataword).to_bytes(self.table.width // 8, 'big')
 
     def validate(self, dataword, fcs):
-        codeword = dataword + fcs
-        remainder = mod2div(codeword, self.polynomial)
-        return remainder.count('1') == 0
+        if isinstance(dataword, str):
+            return self.table.compute_bits(fcs, self.table.compute_bits(dataword)) == 0
+        return self.table.compute(fcs, self.table.compute(dataword)) == 0
+
+
+_WORD_TYPECODES = {
+    size: next(code for code in 'BHILQ' if array(code).itemsize == size) for size in (1, 2, 4, 8)
+}
+
+
+def ones_complement_fold(value, size):
+    """
+    End-around-carry sum of the size-bit words of the integer value. Every carry out of the top
+    adds back in at the bottom, so the sum is value mod 2**size - 1, except that it is all ones
+    rather than zero when value is a non-zero multiple.
+    """
+    mask = (1 << size) - 1
+    total = value % mask
+    return mask if total == 0 and value else total
+
+
+def ones_complement_sum(data, size=32):
+    """End-around-carry sum of big-endian size-bit words, zero padding the last word."""
+    word_bytes = size // 8
+    data = memoryview(data).cast('B')
+    if size % 8 or word_bytes not in _WORD_TYPECODES:
+        # No array type holds such words, so the whole buffer is folded as one integer
+        return ones_complement_fold(int.from_bytes(data, 'big') << (-len(data) * 8 % size), size)
+    aligned = len(data) - len(data) % word_bytes
+    words = array(_WORD_TYPECODES[word_bytes])
+    words.frombytes(data[:aligned])
+    if aligned < len(data):
+        words.frombytes(bytes(data[aligned:]).ljust(word_bytes, b'\0'))
+    if sys.byteorder == 'little' and word_bytes > 1:
+        words.byteswap()
+    total = sum(words)
+    mask = (1 << size) - 1
+    while total >> size:
+        total = (total & mask) + (total >> size)
+    return total
 
 
 class Checksum:
     def __init__(self, size=32):
+        if size < 1:
+            raise ValueError(f"Checksum word size must be at least 1 bit, got {size}.")
         self.size = size
 
     def generate_fcs(self, dataword):
-        padded_dataword = dataword.ljust(
-            (len(dataword) + self.size - 1) // self.size * self.size, '0')
-        chunks = [padded_dataword[i:i + self.size]
-                  for i in range(0, len(padded_dataword), self.size)]
-        return self.generate_checksum(chunks)
+        if not isinstance(dataword, str):
+            mask = (1 << self.size) - 1
+            return (~ones_complement_sum(dataword, self.size) & mask).to_bytes((self.size + 7) // 8, 'big')
+        total = self._sum_bits(dataword)
+        return format(~total & ((1 << self.size) - 1), f'0{self.size}b')
 
     def generate_checksum(self, chunks):
         res = 0
@@ -66,11 +178,14 @@ class Checksum:
         return ''.join('1' if x == '0' else '0' for x in res_bin)
 
     def validate(self, dataword, fcs):
-        padded_dataword = dataword.ljust(
-            (len(dataword) + self.size - 1) // self.size * self.size, '0')
-        chunks = [padded_dataword[i:i + self.size]
-                  for i in range(0, len(padded_dataword), self.size)]
-        return self.check_checksum(chunks, fcs)
+        if not isinstance(dataword, str):
+            total = ones_complement_sum(dataword, self.size) + int.from_bytes(fcs, 'big')
+        else:
+            total = self._sum_bits(dataword) + int(fcs, 2)
+        mask = (1 << self.size) - 1
+        while total >> self.size:
+            total = (total & mask) + (total >> self.size)
+        return total == mask
 
     def check_checksum(self, chunks, checksum):
         res = 0
@@ -82,4 +197,10 @@ class Checksum:
             carry = res_bin[:-self.size]
             res_bin = res_bin[-self.size:]
             res_bin = bin(int(res_bin, 2) + int(carry, 2))[2:].zfill(self.size)
-        return all(bit == '1' for bit in res_bin)
\ No newline at end of file
+        return all(bit == '1' for bit in res_bin)
+
+    def _sum_bits(self, dataword):
+        """ones_complement_sum of a bit string, whose length need not be a multiple of 8."""
+        if not dataword:
+            return 0
+        return ones_complement_fold(int(dataword, 2) << (-len(dataword) % self.size), self.size)
@@ -1,63 +1,81 @@
 import random
 
+ERROR_TYPES = ["SINGLE", "DOUBLE", "ODD", "BURST"]
+MAX_ODD_ERRORS = 32
+
+def codeword_length(codeword):
+    """Length in bits of a '0'/'1' string or bytes-like codeword."""
+    if isinstance(codeword, str):
+        return len(codeword)
+    return len(codeword) * 8
+
+def bit_mask(length, indices):
+    # Index 0 is the first (most significant) bit of the codeword
+    mask = 0
+    for index in indices:
+        mask |= 1 << (length - 1 - index)
+    return mask
+
+def burst_mask(length, start_index, burst_length):
+    return ((1 << burst_length) - 1) << (length - start_index - burst_length)
+
+def apply_error_mask(codeword, mask):
+    """Flips every bit set in mask with a single XOR, returning the same type as codeword."""
+    if isinstance(codeword, str):
+        if not codeword:
+            return codeword
+        return format(int(codeword, 2) ^ mask, f'0{len(codeword)}b')
+    return (int.from_bytes(codeword, 'big') ^ mask).to_bytes(len(codeword), 'big')
+
 def inject_single_bit_error(codeword, index):
-    if index < 0 or index >= 32:
+    length = codeword_length(codeword)
+    if index < 0 or index >= length:
         raise ValueError("Index out of range")
-    infected_codeword = codeword[:index] + \
-        ('0' if codeword[index] == '1' else '1') + codeword[index + 1:]
-    return infected_codeword
+    return apply_error_mask(codeword, bit_mask(length, [index]))
 
 def inject_two_isolated_single_bit_errors(codeword, index1, index2):
-    if index1 < 0 or index1 >= 32 or index2 < 0 or index2 >= 32:
+    length = codeword_length(codeword)
+    if index1 < 0 or index1 >= length or index2 < 0 or index2 >= length:
         raise ValueError("Indices out of range")
     if index1 == index2:
         raise ValueError("Indices must be different")
-    infected_codeword = list(codeword)
-    infected_codeword[index1] = '0' if codeword[index1] == '1' else '1'
-    infected_codeword[index2] = '0' if codeword[index2] == '1' else '1'
-    return ''.join(infected_codeword)
+    return apply_error_mask(codeword, bit_mask(length, [index1, index2]))
 
 def inject_odd_number_of_errors(codeword, indices):
-    if any(index < 0 or index >= 32 for index in indices):
+    length = codeword_length(codeword)
+    if any(index < 0 or index >= length for index in indices):
         raise ValueError("Indices out of range")
-    infected_codeword = list(codeword)
-    for index in indices:
-        infected_codeword[index] = '0' if codeword[index] == '1' else '1'
-    return ''.join(infected_codeword)
+    return apply_error_mask(codeword, bit_mask(length, indices))
 
 def inject_burst_error(codeword, start_index, burst_length):
-    if start_index < 0 or start_index + burst_length > len(codeword):
+    length = codeword_length(codeword)
+    if start_index < 0 or start_index + burst_length > length:
         raise ValueError("Burst error out of range")
-    infected_codeword = list(codeword)
-    for i in range(start_index, start_index + burst_length):
-        infected_codeword[i] = '0' if codeword[i] == '1' else '1'
-    return ''.join(infected_codeword)
+    return apply_error_mask(codeword, burst_mask(length, start_index, burst_length))
 
-def inject_error_random(codeword, error_type, burst_length=None):
+def random_error_mask(length, error_type, burst_length=None, rng=random):
+    """Draws an error pattern over the whole codeword of length bits as an integer mask."""
     if error_type == "SINGLE":
-        index = random.randint(0, 32 - 1)
-        return inject_single_bit_error(codeword, index)
+        return bit_mask(length, [rng.randint(0, length - 1)])
     elif error_type == "DOUBLE":
-        index1 = random.randint(0, 32 - 1)
-        index2 = random.randint(0, 32 - 1)
-        while index1 == index2:
-            index2 = random.randint(0, 32 - 1)
-        return inject_two_isolated_single_bit_errors(codeword, index1, index2)
+        return bit_mask(length, rng.sample(range(length), 2))
     elif error_type == "ODD":
-        num_errors = random.randint(1, 32)
+        max_errors = min(MAX_ODD_ERRORS, length)
+        num_errors = rng.randint(1, max_errors)
         while num_errors % 2 == 0:
-            num_errors = random.randint(1, 32)
-        indices = random.sample(range(32), num_errors)
-        return inject_odd_number_of_errors(codeword, indices)
+            num_errors = rng.randint(1, max_errors)
+        return bit_mask(length, rng.sample(range(length), num_errors))
     elif error_type == "BURST":
         if burst_length is None:
             raise ValueError("Burst length must be provided for burst errors.")
-        max_start_index = max(0, len(codeword) - burst_length)
-        start_index = random.randint(0, max_start_index)
-        return inject_burst_error(codeword, start_index, burst_length)
+        start_index = rng.randint(0, max(0, length - burst_length))
+        return burst_mask(length, start_index, burst_length)
     else:
         raise ValueError("Invalid error type specified.")
 
+def inject_error_random(codeword, error_type, burst_length=None, rng=random):
+    return apply_error_mask(codeword, random_error_mask(codeword_length(codeword), error_type, burst_length, rng))
+
 def inject_error_manual(codeword, error_type, indices=None, start_index=None, burst_length=None):
     if error_type == "SINGLE":
         if indices is None or len(indices) != 1:
@@ -0,0 +1,188 @@
+import os
+import struct
+import sys
+import threading
+import time
+from options import PROTOCOL_NAMES
+
+SENT = 0
+RESENT = 1
+ACK = 2
+NACK = 3
+LOST = 4
+TIMEOUT = 5
+
+EVENT_NAMES = {
+    SENT: 'sent',
+    RESENT: 'resent',
+    ACK: 'ack',
+    NACK: 'nack',
+    LOST: 'lost',
+    TIMEOUT: 'timeout'
+}
+EVENT_CODES = {name: code for code, name in EVENT_NAMES.items()}
+
+BINARY_MAGIC = b'ARQEVT1\n'
+RECORD = struct.Struct('<dqB')  # seconds since the log was opened, sequence number, event code
+
+CAPACITY = 65536  # events held in memory before the writer flushes them itself
+FLUSH_INTERVAL = 0.5
+
+
+class EventLog:
+    """
+    Sender event log: record() only appends to an in-memory ring buffer, and a background thread
+    writes the buffered events to one open file every flush_interval seconds.
+
+    Every event becomes one record of (time, sequence number, event type), written either as a
+    text line "0.012345 17 sent" or, with binary=True, as a fixed-size RECORD after BINARY_MAGIC.
+    A buffer that fills up before the flusher gets to it is written out by the recording thread,
+    so events are never dropped. See write_legacy_log() for the old per-protocol log.txt text.
+    """
+
+    def __init__(self, path, binary=False, capacity=CAPACITY, flush_interval=FLUSH_INTERVAL, clock=time.monotonic):
+        self.path = path
+        self.binary = binary
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.start = clock()
+        self.file = open(path, 'wb' if binary else 'w')
+        if binary:
+            self.file.write(BINARY_MAGIC)
+
+        # Ring buffer of event slots; head is the next free slot, count the number of unwritten events
+        self.times = [0.0] * capacity
+        self.seq_nos = [0] * capacity
+        self.events = [0] * capacity
+        self.head = 0
+        self.count = 0
+        self.lock = threading.Lock()
+        self.closed = threading.Event()
+        self.flusher = threading.Thread(target=self.flush_periodically, daemon=True)
+        self.flusher.start()
+
+    def record(self, event, seq_no):
+        self.record_many(((event, seq_no),))
+
+    def record_transmission(self, seq_no, retransmission=False, lost=False):
+        """One transmission: sent/resent, immediately followed by lost if the channel dropped it."""
+        if lost:
+            self.record_many(((RESENT if retransmission else SENT, seq_no), (LOST, seq_no)))
+        else:
+            self.record(RESENT if retransmission else SENT, seq_no)
+
+    def record_many(self, events):
+        """Records the events next to each other, even with other threads recording at the same time."""
+        now = self.clock() - self.start
+        with self.lock:
+            for event, seq_no in events:
+                if self.count == self.capacity:
+                    self.flush_locked()
+                slot = self.head
+                self.times[slot] = now
+                self.seq_nos[slot] = seq_no
+                self.events[slot] = event
+                self.head = (slot + 1) % self.capacity
+                self.count += 1
+
+    def flush(self):
+        with self.lock:
+            self.flush_locked()
+
+    def flush_locked(self):
+        # Caller holds self.lock, which also keeps concurrent flushes in order
+        if not self.count:
+            return
+        start = (self.head - self.count) % self.capacity
+        slots = [(start + offset) % self.capacity for offset in range(self.count)]
+        times, seq_nos, events = self.times, self.seq_nos, self.events
+        if self.binary:
+            data = b''.join(RECORD.pack(times[slot], seq_nos[slot], events[slot]) for slot in slots)
+        else:
+            data = ''.join(f"{times[slot]:.6f} {seq_nos[slot]} {EVENT_NAMES[events[slot]]}\n" for slot in slots)
+        self.count = 0
+        self.file.write(data)
+
+    def flush_periodically(self):
+        while not self.closed.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        if self.closed.is_set():
+            return
+        self.closed.set()
+        self.flusher.join()
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_events(path):
+    """Yields (time, seq_no, event) from a text or binary event log."""
+    with open(path, 'rb') as log:
+        if log.read(len(BINARY_MAGIC)) == BINARY_MAGIC:
+            while True:
+                data = log.read(RECORD.size)
+                if len(data) < RECORD.size:
+                    return
+                yield RECORD.unpack(data)
+        log.seek(0)
+        for line in log:
+            timestamp, seq_no, name = line.split()
+            yield float(timestamp), int(seq_no), EVENT_CODES[name.decode()]
+
+
+def legacy_lines(events, protocol):
+    """
+    The log.txt lines each sender wrote before event logs existed:
+    Stop-and-Wait "<i> sent"/"<i> re-sent" per attempt, Go-Back-N "<i>. Sent" per transmission
+    that was not lost, Selective Repeat "<i>. Sent"/"<i>. Resent" per transmission.
+    """
+    pending = None  # Go-Back-N transmission waiting to see whether the next record says it was lost
+    for _, seq_no, event in events:
+        if protocol == 'GoBackN':
+            if pending is not None and not (event == LOST and seq_no == pending):
+                yield f"{pending}. Sent"
+            pending = seq_no if event in (SENT, RESENT) else None
+        elif event in (SENT, RESENT):
+            if protocol == 'StopAndWait':
+                yield f"{seq_no} {'sent' if event == SENT else 're-sent'}"
+            else:
+                yield f"{seq_no}. {'Sent' if event == SENT else 'Resent'}"
+    if pending is not None:
+        yield f"{pending}. Sent"
+
+
+def write_legacy_log(event_log_path, protocol, log_file):
+    with open(log_file, 'w') as log:
+        for line in legacy_lines(read_events(event_log_path), protocol):
+            log.write(f"{line}\n")
+
+
+def event_log_path(log_file):
+    """log.txt -> log.events, where a sender keeps the event log behind its log file."""
+    return os.path.splitext(log_file)[0] + '.events'
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        print("Usage: python eventlog.py <event_log> <protocol> [log_file]")
+        print("Protocol: 'StopAndWait' or '1', 'GoBackN' or '2', or 'SelectiveRepeat' or '3'")
+        sys.exit(1)
+    protocol = PROTOCOL_NAMES.get(sys.argv[2])
+    if not protocol:
+        print("Error: Invalid protocol. Choose 'StopAndWait', 'GoBackN', 'SelectiveRepeat', '1', '2', or '3'.")
+        sys.exit(1)
+    log_file = sys.argv[3] if len(sys.argv) == 4 else "log.txt"
+    write_legacy_log(sys.argv[1], protocol, log_file)
+    print(f"Wrote {log_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import mmap
+import os
+from dataframe import bits_to_bytes
+
+
+class FrameSource:
+    """
+    Hands out packed payloads of a bit-string input file from a single memory map.
+
+    With first_frame/num_frames only that contiguous range of frames is served, renumbered so
+    that read(0) returns frame first_frame of the file.
+    """
+
+    def __init__(self, input_file, payload_size, first_frame=0, num_frames=None):
+        self.input_file = input_file
+        self.payload_size = payload_size
+        self.frame_chars = payload_size * 8
+        self.file = open(input_file, 'rb')
+        if os.fstat(self.file.fileno()).st_size:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.map = b''
+
+        # Trailing whitespace (usually a final newline) is not part of the bitstream
+        end = len(self.map)
+        while end and self.map[end - 1] in b' \t\r\n':
+            end -= 1
+        self.offset = min(first_frame * self.frame_chars, end)
+        if num_frames is not None:
+            end = min(end, self.offset + num_frames * self.frame_chars)
+        self.length = end
+
+    def __len__(self):
+        return (self.length - self.offset + self.frame_chars - 1) // self.frame_chars
+
+    def read(self, index):
+        start = self.offset + index * self.frame_chars
+        if index < 0 or start >= self.length:
+            return None
+        return bits_to_bytes(self.map[start:min(start + self.frame_chars, self.length)])
+
+    def close(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,80 @@
+import socket
+import struct
+import threading
+from collections import deque
+from transport import Transport
+
+LENGTH_PREFIX = struct.Struct('!I')
+RECV_SIZE = 65536
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+
+def encode_frame(data):
+    return LENGTH_PREFIX.pack(len(data)) + data
+
+
+class FrameDecoder:
+    """Reassembles length-prefixed frames from arbitrary chunks of a byte stream."""
+
+    def __init__(self, max_frame_size=MAX_FRAME_SIZE):
+        self.max_frame_size = max_frame_size
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        buffer = self.buffer
+        buffer += data
+        frames = []
+        offset = 0
+        while len(buffer) - offset >= LENGTH_PREFIX.size:
+            (length,) = LENGTH_PREFIX.unpack_from(buffer, offset)
+            if length > self.max_frame_size:
+                raise ValueError(f"Frame of {length} bytes exceeds the {self.max_frame_size} byte limit.")
+            end = offset + LENGTH_PREFIX.size + length
+            if end > len(buffer):
+                break
+            frames.append(bytes(buffer[offset + LENGTH_PREFIX.size:end]))
+            offset = end
+        if offset:
+            del buffer[:offset]
+        return frames
+
+
+class FrameStream(Transport):
+    """Sends and receives whole DataFrame/ACK byte frames over a stream socket."""
+
+    def __init__(self, connection, recv_size=RECV_SIZE, max_frame_size=MAX_FRAME_SIZE):
+        self.connection = connection
+        self.recv_size = recv_size
+        self.decoder = FrameDecoder(max_frame_size)
+        self.pending = deque()
+        self.send_lock = threading.Lock()
+        self.recv_lock = threading.Lock()
+
+    def send_frame(self, data):
+        with self.send_lock:
+            self.connection.sendall(encode_frame(data))
+
+    def recv_frame(self):
+        """Returns the next complete frame, or None once the peer has closed the stream."""
+        with self.recv_lock:
+            while not self.pending:
+                data = self.connection.recv(self.recv_size)
+                if not data:
+                    return None
+                self.pending.extend(self.decoder.feed(data))
+            return self.pending.popleft()
+
+    def close(self):
+        # shutdown() also wakes a thread still blocked in recv_frame on this socket
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.connection.close()
+
+
+def frame_stream(connection):
+    # Transports, including any object with send_frame/recv_frame/close, are used as they are
+    if isinstance(connection, Transport):
+        return connection
+    return FrameStream(connection)
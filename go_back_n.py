@@ -6,14 +6,25 @@ import socket
 from channel import Channel
 from dataframe import DataFrame
 from ackframe import ACK
+from framing import frame_stream
+from frame_source import FrameSource
+from output_sink import BINARY, open_sink
+from validator import validate
+import eventlog
+import metrics
+from eventlog import EventLog, event_log_path, write_legacy_log
 from error_checker import CRC, Checksum
+from rtt import RTTEstimator
+from seqnum import seq_unwrap
 import traceback
 import time
 
 class Sender:
-    def __init__(self, connection, input_file, source, destination, checker, bytes, log_file="log.txt", window_size=WINDOW_SIZE, timeout=TIMEOUT):
-        self.connection = connection  
+    def __init__(self, connection, input_file, source, destination, checker, bytes, log_file="log.txt", window_size=WINDOW_SIZE, timeout=TIMEOUT, rtt_estimator=None, window_controller=None, frame_source=None, event_log=None, channel=None):
+        self.connection = connection
+        self.stream = frame_stream(connection)
         self.input_file = input_file
+        self.frame_source = frame_source if frame_source is not None else FrameSource(input_file, bytes)
         self.source_address = source
         self.destination_address = destination
         self.error_checker = checker
@@ -21,33 +32,35 @@ class Sender:
         self.log_file = log_file
         self.window_size = window_size
         self.timeout = timeout
-        self.channel = Channel()
+        self.rtt = rtt_estimator if rtt_estimator is not None else RTTEstimator(initial_rto=timeout)
+        self.window_controller = window_controller
+        if window_controller is not None:
+            self.window_size = window_controller.window_size
+        self.event_log = event_log
+        self.channel = channel if channel is not None else Channel()
         self.sent_frames = {}  
         self.base = 0  
         self.next_seq_num = 0  
         self.timer = None  
 
     def makeDataFrame(self, index):
-        start_char_index = index * self.payload_size * 8
-        num_chars_to_read = self.payload_size * 8
-
-        with open(self.input_file, 'r') as input_file:
-            input_file.seek(start_char_index)
-            data = input_file.read(num_chars_to_read)
-
-            if not data:
-                return None  
+        data = self.frame_source.read(index)
+        if data is None:
+            return None
 
         dataframe = DataFrame(self.source_address, self.destination_address, self.payload_size, index, data, self.error_checker)
         return dataframe
 
     def send_data(self):
-        with open(self.log_file, 'w'):
-            pass
+        if self.event_log is None:
+            self.event_log = EventLog(event_log_path(self.log_file))
         start_time=time.time()
+        metrics.WINDOW_SIZE.set(self.window_size)
         while True:
             eof_reached = False  
-            
+            window_start = self.next_seq_num
+            new_frames = []
+
             while self.next_seq_num < self.base + self.window_size:
                 dataframe = self.makeDataFrame(self.next_seq_num)
                 if dataframe is None:
@@ -55,34 +68,58 @@ class Sender:
                     break  
                
                 self.sent_frames[self.next_seq_num] = dataframe
-                self.send_frame(dataframe)
-
-                if self.base == self.next_seq_num:
-                    self.start_timer()  
-
+                new_frames.append(dataframe)
                 self.next_seq_num += 1
 
+            if new_frames:
+                self.send_frames(new_frames)
+                metrics.WINDOW_OCCUPANCY.set(self.next_seq_num - self.base)
+                if self.base == window_start:
+                    self.start_timer()
+
            
             if eof_reached and self.base == self.next_seq_num:
                 print("All frames sent and acknowledged. Transmission complete.")
                 end_time = time.time()
                 total_time = end_time - start_time
                 print(f"Total transmission time: {total_time:.2f} seconds")
+                print(f"Final RTO: {self.rtt.rto:.4f} seconds from {len(self.rtt.samples)} RTT samples")
+                if self.window_controller is not None:
+                    print(f"Final window size: {self.window_size} after {self.window_controller.changes} changes")
+                self.frame_source.close()
+                self.event_log.close()
+                write_legacy_log(self.event_log.path, 'GoBackN', self.log_file)
                 break
                    
             self.receive_ack()
 
     def send_frame(self, dataframe):
-        transmitted_frame = self.channel.transmit(dataframe)
-        if transmitted_frame:
-            log_action = f"{dataframe.frame_seq_no}. Sent\n"
-            with open(self.log_file, 'a') as log:
-                log.write(log_action)
-            self.connection.send(transmitted_frame.to_bytes())
-            print(f"Frame {dataframe.frame_seq_no} sent to channel.")
+        self.send_frames([dataframe])
+
+    def send_frames(self, dataframes):
+        # The whole window goes through the channel in one batch
+        for dataframe, transmitted_frame in zip(dataframes, self.channel.transmit_batch(dataframes)):
+            self.rtt.frame_sent(dataframe.frame_seq_no, retransmission=not dataframe.first_time)
+            self.event_log.record_transmission(dataframe.frame_seq_no, retransmission=not dataframe.first_time,
+                                               lost=transmitted_frame is None)
+            data = transmitted_frame.to_bytes() if transmitted_frame else None
+            metrics.frame_transmitted(dataframe, data)
+            dataframe.first_time = False
+            if transmitted_frame:
+                self.stream.send_frame(data)
+                print(f"Frame {dataframe.frame_seq_no} sent to channel.")
+
+    def set_window_size(self, window_size):
+        if window_size != self.window_size:
+            print(f"Window size: {self.window_size} -> {window_size}")
+            self.window_size = window_size
+            metrics.WINDOW_SIZE.set(window_size)
 
     def start_timer(self):
-        self.timer = threading.Timer(self.timeout, self.timeout_handler)
+        # Only one timer runs per window; a restarted timer replaces the previous one
+        self.stop_timer()
+        self.timer = threading.Timer(self.rtt.rto, self.timeout_handler)
+        self.timer.daemon = True
         self.timer.start()
 
     def stop_timer(self):
@@ -90,23 +127,39 @@ class Sender:
             self.timer.cancel()
 
     def timeout_handler(self):
+        if self.base == self.next_seq_num:
+            return  # The last ACK arrived while this timer was firing
         print(f"Timeout occurred. Resending frames from {self.base}.")
+        self.event_log.record(eventlog.TIMEOUT, self.base)
+        metrics.TIMEOUTS.inc()
+        self.rtt.backoff()
+        if self.window_controller is not None:
+            self.set_window_size(self.window_controller.timeout(self.next_seq_num))
         
-        for seq_no in range(self.base, self.next_seq_num):
-            self.send_frame(self.sent_frames[seq_no])
+        self.send_frames([self.sent_frames[seq_no] for seq_no in range(self.base, self.next_seq_num)])
 
      
         self.start_timer()
 
     def receive_ack(self):
         try:
-            ack_frame = self.connection.recv(1024) 
+            ack_frame = self.stream.recv_frame()
             ack = ACK.from_bytes(ack_frame)
+            # ACK numbers wrap around in the header; recover the one nearest the window base
+            ack_seq_no = seq_unwrap(ack.frame_seq_no, self.base)
+            metrics.ACKS_RECEIVED.inc()
 
-            if ack.frame_seq_no >= self.base:
-                print(f"ACK {ack.frame_seq_no} received.")
+            if ack_seq_no >= self.base:
+                print(f"ACK {ack_seq_no} received.")
+                self.event_log.record(eventlog.ACK, ack_seq_no)
+                self.rtt.frame_acked(ack_seq_no, cumulative=True)
+                if self.window_controller is not None:
+                    self.set_window_size(self.window_controller.frames_acked(ack_seq_no + 1 - self.base))
                
-                self.base = ack.frame_seq_no + 1
+                for seq_no in range(self.base, ack_seq_no + 1):
+                    metrics.frame_delivered(self.sent_frames[seq_no])
+                self.base = ack_seq_no + 1
+                metrics.WINDOW_OCCUPANCY.set(self.next_seq_num - self.base)
 
                 if self.base == self.next_seq_num:
                     self.stop_timer()  
@@ -114,7 +167,7 @@ class Sender:
                     self.start_timer() 
 
            
-            if ack.frame_seq_no == self.next_seq_num - 1:
+            if ack_seq_no == self.next_seq_num - 1:
                 print("All frames acknowledged. Stopping the timer.")
                 self.stop_timer()
 
@@ -122,83 +175,89 @@ class Sender:
             print(f"Socket error while receiving ACK: {e}")
 
 class Receiver:
-    def __init__(self, connection, checker, address, input_file='input.txt', output_file="output.txt"):
+    def __init__(self, connection, checker, address, input_file='input.txt', output_file="output.bin", delayed_ack=None, first_frame=0, output_format=BINARY):
         self.connection = connection
+        self.stream = frame_stream(connection)
         self.input_file = input_file
         self.output_file = output_file
+        self.output_format = output_format  # BINARY payload bytes, or the TEXT debug format
+        self.first_frame = first_frame  # Index of the first frame in the input file, for a striped transfer
         if checker == 'CRC':
             self.error_checker = CRC()
         elif checker == 'Checksum':
             self.error_checker = Checksum()
         self.expected_seq_num = 0 
         self.address = address
+        self.delayed_ack = delayed_ack  # Coalesces cumulative ACKs when set
+
+    @property
+    def frames_delivered(self):
+        """Frames written to the output so far, all of them in order."""
+        return self.expected_seq_num
 
     def receive_data(self):
-        with open(self.output_file, 'w') as output:
+        with open_sink(self.output_file, self.output_format) as output:
             while True:
                 try:
-                    data = self.connection.recv(1024)
+                    data = self.stream.recv_frame()
                     if not data:
                         print("Connection closed by sender.")
                         self.connection.close()
                         break
 
-                    data_frame = DataFrame.from_bytes(data)
-                    if data_frame.destination_address != self.address:
-                        print(f"Frame {data_frame.frame_seq_no} Destination address mismatch.")
-                        continue
-
-                    payload = data_frame.payload
-                    received_fcs = data_frame.fcs
-                    frame_seq_no = data_frame.frame_seq_no
-                    self.payload_size = len(payload) * 8
-                    
-                    if self.error_checker.validate(payload, received_fcs):
-                        if frame_seq_no == self.expected_seq_num:
-                            print(f"Frame {frame_seq_no} accepted")
-                            output.write(f"{frame_seq_no}. {payload}\n")
-                            self.expected_seq_num += 1
-                            ack_frame = ACK(
-                                source_address=self.address,
-                                destination_address=data_frame.source_address,
-                                frame_seq_no=frame_seq_no
-                            )
-                            self.connection.sendall(ack_frame.to_bytes())
-                        else:
-                            print(f"Frame {frame_seq_no} discarded (out of order)")
-
-                    else:
-                        print(f"Frame {frame_seq_no} rejected (FCS error)")
+                    self.handle_frame(DataFrame.from_bytes(data), output)
 
                 except Exception as e:
                     self.connection.close()
                     break
-        self.validate_output()        
-                
-    def validate_output(self):
-            """Validates the received data against the original input file."""
-            print("Validation begins...")
-            with open(self.input_file, 'r') as input_file, open(self.output_file, 'r+') as output_file:
-                input_data = input_file.read().strip()
-                output_lines = output_file.readlines()
-                
-                output_file.seek(0)
-
-                for index, line in enumerate(output_lines):
-                    start = index * self.payload_size // 8
-                    end = (index + 1) * self.payload_size // 8
-                    if end > len(input_data):
-                        break
+        if self.delayed_ack is not None:
+            self.delayed_ack.close()
+            print(self.delayed_ack.summary())
+        validate(self.input_file, self.output_file, output.frame_size, self.first_frame, self.output_format)
 
-                    expected_payload = input_data[start:end]
-                   
-                    line_payload = line.strip().split('. ')[1]
-                    
-                    if line_payload != expected_payload:                     
-                        output_file.write(f"{line.strip()} (incorrect)\n")
-                    else:
-                        output_file.write(line)
-               
-                output_file.truncate()
+    def handle_frame(self, data_frame, output):
+        """
+        Processes one received frame. Always returns True, since a Go-Back-N receiver never drops the
+        connection; it matches the Stop-and-Wait Receiver, which returns False to drop it.
+        """
+        if data_frame.destination_address != self.address:
+            print(f"Frame {data_frame.frame_seq_no} Destination address mismatch.")
+            return True
+
+        payload = data_frame.payload
+        received_fcs = data_frame.fcs
+        frame_seq_no = seq_unwrap(data_frame.frame_seq_no, self.expected_seq_num)
+
+        if self.error_checker.validate(payload, received_fcs):
+            metrics.FRAMES_ACCEPTED.inc()
+            if frame_seq_no == self.expected_seq_num:
+                print(f"Frame {frame_seq_no} accepted")
+                metrics.DELIVERED_BYTES.inc(len(payload))
+                output.write(frame_seq_no, payload)
+                self.expected_seq_num += 1
+                ack_frame = ACK(
+                    source_address=self.address,
+                    destination_address=data_frame.source_address,
+                    frame_seq_no=frame_seq_no
+                )
+                if self.delayed_ack is None:
+                    self.send_ack_frame(ack_frame)
+                else:
+                    # A later cumulative ACK covers this one, so only the newest is sent
+                    self.delayed_ack.hold(ack_frame, self.send_ack_frame)
+            else:
+                print(f"Frame {frame_seq_no} discarded (out of order)")
+                if self.delayed_ack is not None:
+                    # The sender is ahead of us; let it know how far we got without waiting
+                    self.delayed_ack.flush()
+
+        else:
+            print(f"Frame {frame_seq_no} rejected (FCS error)")
+            metrics.FRAMES_REJECTED.inc()
+        return True
 
-            print("Validation complete.")
+    def send_ack_frame(self, ack_frame):
+        data = ack_frame.to_bytes()
+        self.stream.send_frame(data)
+        metrics.ACKS_SENT.inc()
+        metrics.ACK_WIRE_BYTES.inc(len(data))
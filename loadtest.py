@@ -0,0 +1,136 @@
+import contextlib
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import metrics
+import go_back_n
+import selective_repeat
+from stop_and_wait import Sender as StopAndWaitSender
+from go_back_n import Sender as GoBackNSender
+from selective_repeat import Sender as SelectiveRepeatSender
+from congestion import WindowController
+from options import HOST, PORT, PROTOCOL_NAMES, TECHNIQUE_NAMES, parse_options
+
+SENDERS = {
+    'StopAndWait': StopAndWaitSender,
+    'GoBackN': GoBackNSender,
+    'SelectiveRepeat': SelectiveRepeatSender
+}
+
+WINDOW_SIZES = {
+    'GoBackN': go_back_n.WINDOW_SIZE,
+    'SelectiveRepeat': selective_repeat.WINDOW_SIZE
+}
+
+NUM_SENDERS = 30
+
+source_address = b'\x01\x02\x03\x04\x05\x06'
+destination_address = b'\x06\x05\x04\x03\x02\x01'
+
+
+def send_one(protocol, server_address, input_file, payload_size, checker, index, window_size=None, aimd=False,
+             verbose=False):
+    """
+    Runs one sender in its own process, logging to log_sender_<index>.txt. Returns the sender index,
+    the transfer time in seconds (None if it failed), the error if any, and this sender's metrics.
+    """
+    metrics.REGISTRY.reset()  # A worker process may already have run another sender
+    sender_options = {}
+    if window_size is not None:
+        sender_options['window_size'] = window_size
+        if aimd:
+            sender_options['window_controller'] = WindowController(max_window=window_size)
+
+    start_time = time.time()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(sys.stdout if verbose else devnull):
+        try:
+            with socket.create_connection(server_address) as connection:
+                sender = SENDERS[protocol](
+                    connection=connection,
+                    input_file=input_file,
+                    source=source_address,
+                    destination=destination_address,
+                    checker=checker,
+                    bytes=payload_size,
+                    log_file=f"log_sender_{index}.txt",
+                    **sender_options
+                )
+                sender.send_data()
+        except (OSError, ConnectionError) as e:
+            return index, None, str(e), metrics.REGISTRY.snapshot()
+    return index, time.time() - start_time, None, metrics.REGISTRY.snapshot()
+
+
+def run_load(protocol, server_address, input_file, payload_size, checker, num_senders=NUM_SENDERS, window_size=None,
+             aimd=False, verbose=False):
+    """
+    Starts num_senders senders at once against one receiver, one process each, and waits for all of
+    them. Returns [(index, seconds or None, error or None)] in sender order; the senders' metrics
+    are added to this process's registry.
+    """
+    with ProcessPoolExecutor(max_workers=num_senders) as pool:
+        futures = [
+            pool.submit(send_one, protocol, server_address, input_file, payload_size, checker, index, window_size,
+                        aimd, verbose)
+            for index in range(num_senders)
+        ]
+        results = []
+        for future in futures:
+            index, elapsed, error, sender_metrics = future.result()
+            metrics.REGISTRY.merge(sender_metrics)
+            results.append((index, elapsed, error))
+    return results
+
+
+def main():
+    args, options = parse_options(sys.argv[1:])
+    if len(args) != 4:
+        print("Usage: python loadtest.py <protocol> <file_path> <packet_size> <technique> [--senders=N] [--window=N] "
+              "[--aimd] [--host=HOST] [--port=PORT] [--verbose]")
+        print("Protocol: 'StopAndWait' or '1', 'GoBackN' or '2', or 'SelectiveRepeat' or '3'")
+        print("Technique: 'CRC' or '1', 'Checksum' or '2'")
+        sys.exit(1)
+
+    protocol = PROTOCOL_NAMES.get(args[0])
+    if not protocol:
+        print("Error: Invalid protocol. Choose 'StopAndWait', 'GoBackN', 'SelectiveRepeat', '1', '2', or '3'.")
+        sys.exit(1)
+
+    technique = TECHNIQUE_NAMES.get(args[3])
+    if not technique:
+        print("Error: Technique must be either 'CRC', 'Checksum', '1', or '2'.")
+        sys.exit(1)
+
+    num_senders = int(options.get('senders', NUM_SENDERS))
+    if num_senders < 1:
+        print("Error: --senders must be at least 1.")
+        sys.exit(1)
+
+    window_size = None
+    if protocol in WINDOW_SIZES:
+        window_size = int(options['window']) if 'window' in options else WINDOW_SIZES[protocol]
+
+    server_address = (options.get('host', HOST), int(options.get('port', PORT)))
+    print(f"Starting {num_senders} {protocol} senders against {server_address}...")
+
+    start_time = time.time()
+    results = run_load(protocol, server_address, args[1], int(args[2]), technique, num_senders, window_size,
+                       bool(options.get('aimd')), bool(options.get('verbose')))
+    total_time = time.time() - start_time
+
+    times = sorted(elapsed for _, elapsed, _ in results if elapsed is not None)
+    for index, _, error in results:
+        if error is not None:
+            print(f"Sender {index} failed: {error}")
+    print(f"{len(times)} of {num_senders} senders completed in {total_time:.2f} seconds")
+    if times:
+        print(f"Transfer time: min {times[0]:.2f} s, median {times[len(times) // 2]:.2f} s, max {times[-1]:.2f} s")
+    print(f"Frames sent: {metrics.FRAMES_SENT.value}, resent: {metrics.FRAMES_RESENT.value}, "
+          f"timeouts: {metrics.TIMEOUTS.value}, goodput: {metrics.GOODPUT_BYTES.value} bytes")
+    sys.exit(0 if len(times) == num_senders else 2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+import json
+import math
+import os
+import threading
+import time
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+EXPORT_FORMATS = ('json', 'prometheus')
+METRICS_FILES = {'json': 'metrics.json', 'prometheus': 'metrics.prom'}
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def snapshot(self):
+        return self.value
+
+    def merge(self, snapshot):
+        self.inc(snapshot)
+
+    def reset(self):
+        with self.lock:
+            self.value = 0
+
+
+class Gauge:
+    kind = 'gauge'
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def set(self, value):
+        with self.lock:
+            self.value = value
+
+    def snapshot(self):
+        return self.value
+
+    def merge(self, snapshot):
+        self.set(snapshot)
+
+    def reset(self):
+        self.set(0)
+
+
+class Histogram:
+    """Counts observations into cumulative upper-bound buckets, the way Prometheus exposes them."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # The last slot is the +Inf bucket
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for bucket_index, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = bucket_index
+                break
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self):
+        with self.lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative = []
+        running = 0
+        for bucket_count in counts:
+            running += bucket_count
+            cumulative.append(running)
+        bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+        return {'buckets': dict(zip(bounds, cumulative)), 'sum': total, 'count': count}
+
+    def merge(self, snapshot):
+        cumulative = list(snapshot['buckets'].values())
+        with self.lock:
+            for index, running in enumerate(cumulative):
+                self.counts[index] += running - (cumulative[index - 1] if index else 0)
+            self.sum += snapshot['sum']
+            self.count += snapshot['count']
+
+    def reset(self):
+        with self.lock:
+            self.counts = [0] * (len(self.buckets) + 1)
+            self.sum = 0.0
+            self.count = 0
+
+
+class Registry:
+    """
+    Named counters, gauges and histograms of one process, exported together as JSON or in the
+    Prometheus text format. labels are attached to every exported sample, e.g. the protocol.
+    """
+
+    def __init__(self, labels=None):
+        self.labels = dict(labels or {})
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            existing = self.metrics.setdefault(metric.name, metric)
+        if type(existing) is not type(metric):
+            raise ValueError(f"Metric {metric.name} is already registered as a {existing.kind}.")
+        return existing
+
+    def counter(self, name, help_text):
+        return self.register(Counter(name, help_text))
+
+    def gauge(self, name, help_text):
+        return self.register(Gauge(name, help_text))
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help_text, buckets))
+
+    def snapshot(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def merge(self, snapshot):
+        """Adds a snapshot taken in another process, e.g. a stripe worker; gauges take its value."""
+        for name, value in snapshot.items():
+            metric = self.metrics.get(name)
+            if metric is not None:
+                metric.merge(value)
+
+    def reset(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def to_json(self):
+        return json.dumps({'time': time.time(), 'labels': self.labels, 'metrics': self.snapshot()}, indent=2)
+
+    def to_prometheus(self):
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            if metric.kind == 'histogram':
+                snapshot = metric.snapshot()
+                for bound, count in snapshot['buckets'].items():
+                    lines.append(f"{metric.name}_bucket{format_labels(self.labels, le=bound)} {count}")
+                lines.append(f"{metric.name}_sum{format_labels(self.labels)} {format_value(snapshot['sum'])}")
+                lines.append(f"{metric.name}_count{format_labels(self.labels)} {snapshot['count']}")
+            else:
+                lines.append(f"{metric.name}{format_labels(self.labels)} {format_value(metric.snapshot())}")
+        return '\n'.join(lines) + '\n'
+
+    def export(self, export_format):
+        if export_format == 'json':
+            return self.to_json()
+        if export_format == 'prometheus':
+            return self.to_prometheus()
+        raise ValueError(f"Unknown metrics format {export_format!r}; choose one of {', '.join(EXPORT_FORMATS)}.")
+
+    def write(self, path, export_format='json'):
+        """Writes the export next to path first and renames it, so readers never see half a file."""
+        data = self.export(export_format)
+        partial = f"{path}.tmp"
+        with open(partial, 'w') as export_file:
+            export_file.write(data)
+        os.replace(partial, path)
+
+
+def format_labels(labels, **extra):
+    labels = dict(labels, **extra)
+    if not labels:
+        return ''
+    pairs = ','.join(f'{name}="{str(value)}"' for name, value in labels.items())
+    return f"{{{pairs}}}"
+
+
+def format_value(value):
+    if isinstance(value, float) and math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return str(value)
+
+
+class MetricsExporter:
+    """Writes the registry to path on close(), and every interval seconds while running if interval is set."""
+
+    def __init__(self, registry, path=None, export_format='json', interval=None):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown metrics format {export_format!r}; choose one of {', '.join(EXPORT_FORMATS)}.")
+        self.registry = registry
+        self.path = path if path is not None else METRICS_FILES[export_format]
+        self.export_format = export_format
+        self.interval = interval
+        self.lock = threading.Lock()  # Session ends and the periodic thread may export at the same time
+        self.closed = threading.Event()
+        self.thread = None
+        if interval:
+            self.thread = threading.Thread(target=self.export_periodically, daemon=True)
+            self.thread.start()
+
+    def export(self):
+        with self.lock:
+            self.registry.write(self.path, self.export_format)
+
+    def export_periodically(self):
+        while not self.closed.wait(self.interval):
+            self.export()
+
+    def close(self):
+        if self.closed.is_set():
+            return
+        self.closed.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.export()
+        print(f"Metrics written to {self.path}")
+
+
+# Every sender, receiver and channel in the process updates these
+REGISTRY = Registry()
+
+FRAMES_SENT = REGISTRY.counter('arq_frames_sent_total', "Data frames transmitted for the first time.")
+FRAMES_RESENT = REGISTRY.counter('arq_frames_resent_total', "Data frames retransmitted.")
+FRAMES_LOST = REGISTRY.counter('arq_frames_lost_total', "Data frames dropped by the channel.")
+FRAMES_CORRUPTED = REGISTRY.counter('arq_frames_corrupted_total', "Data frames with bit errors injected by the channel.")
+FRAMES_ACCEPTED = REGISTRY.counter('arq_frames_accepted_total', "Received data frames that passed the error check.")
+FRAMES_REJECTED = REGISTRY.counter('arq_frames_rejected_total', "Received data frames that failed the error check.")
+ACKS_SENT = REGISTRY.counter('arq_acks_sent_total', "ACK and SACK frames sent by receivers.")
+NACKS_SENT = REGISTRY.counter('arq_nacks_sent_total', "NACK frames sent by receivers.")
+ACKS_RECEIVED = REGISTRY.counter('arq_acks_received_total', "ACK and SACK frames received by senders.")
+NACKS_RECEIVED = REGISTRY.counter('arq_nacks_received_total', "NACK frames received by senders.")
+TIMEOUTS = REGISTRY.counter('arq_timeouts_total', "Retransmission timeouts.")
+WIRE_BYTES = REGISTRY.counter('arq_wire_bytes_total', "Bytes of data frames written to connections, retransmissions included.")
+GOODPUT_BYTES = REGISTRY.counter('arq_goodput_bytes_total', "Payload bytes of data frames acknowledged.")
+ACK_WIRE_BYTES = REGISTRY.counter('arq_ack_wire_bytes_total', "Bytes of ACK, SACK and NACK frames written to connections.")
+DELIVERED_BYTES = REGISTRY.counter('arq_delivered_bytes_total', "Payload bytes delivered in order by receivers.")
+RTT = REGISTRY.histogram('arq_rtt_seconds', "RTT samples of frames acknowledged on their first transmission.")
+DELIVERY_LATENCY = REGISTRY.histogram(
+    'arq_delivery_latency_seconds', "Time from a frame's first transmission to its acknowledgement.")
+WINDOW_SIZE = REGISTRY.gauge('arq_window_size_frames', "Current sender window size.")
+WINDOW_OCCUPANCY = REGISTRY.gauge('arq_window_outstanding_frames', "Frames sent but not yet acknowledged.")
+
+
+def frame_transmitted(dataframe, data=None):
+    """
+    Counts one transmission of dataframe, before its first_time flag is cleared. data is what was
+    written to the connection, or None when the channel lost the frame.
+    """
+    if dataframe.first_time:
+        FRAMES_SENT.inc()
+        dataframe.sent_at = time.monotonic()
+    else:
+        FRAMES_RESENT.inc()
+    if data is not None:
+        WIRE_BYTES.inc(len(data))
+
+
+def frame_delivered(dataframe):
+    """Counts the acknowledgement of dataframe: its payload as goodput and its delivery latency."""
+    GOODPUT_BYTES.inc(len(dataframe.payload))
+    sent_at = getattr(dataframe, 'sent_at', None)
+    if sent_at is not None:
+        DELIVERY_LATENCY.observe(time.monotonic() - sent_at)
+
+
+def exporter_from_options(options, protocol):
+    """MetricsExporter for --metrics[=json|prometheus], --metrics-file and --metrics-interval, or None."""
+    if not options.get('metrics'):
+        return None
+    export_format = 'json' if options['metrics'] is True else options['metrics']
+    REGISTRY.labels['protocol'] = protocol
+    interval = float(options['metrics_interval']) if 'metrics_interval' in options else None
+    return MetricsExporter(REGISTRY, options.get('metrics_file'), export_format, interval)
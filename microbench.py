@@ -0,0 +1,310 @@
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from options import parse_options
+
+SIZES = (46, 256, 1024, 4096, 16384, 65536)  # Payload bytes, from the minimum frame payload to 64 KiB
+SEED = 1
+MIN_TIME = 0.2  # Seconds each timing repeat runs for at least
+REPEATS = 5
+TOLERANCE = 0.1  # Changes in ns/byte smaller than this fraction are reported as unchanged
+RESULTS_FILE = 'microbench_results.json'
+
+SOURCE_ADDRESS = b'\x01\x02\x03\x04\x05\x06'
+DESTINATION_ADDRESS = b'\x06\x05\x04\x03\x02\x01'
+
+BYTES = 'bytes'
+BITS = 'bits'  # The payload as a '0'/'1' string, for revisions whose primitives do not take bytes
+
+
+def to_bits(data):
+    """Defined here rather than imported, since older revisions have no dataframe.bytes_to_bits."""
+    return ''.join(format(byte, '08b') for byte in data)
+
+
+def bit_length(data):
+    return len(data) if isinstance(data, str) else len(data) * 8
+
+
+def seed_module_random(rng):
+    """Seeds the module-level generator from rng, for primitives of revisions that cannot take one."""
+    random.seed(rng.getrandbits(32))
+
+
+def crc_benchmarks(data, rng):
+    from error_checker import CRC
+    crc = CRC()
+    fcs = crc.generate_fcs(data)
+    return {
+        'CRC.generate_fcs': lambda: crc.generate_fcs(data),
+        'CRC.validate': lambda: crc.validate(data, fcs)
+    }
+
+
+def checksum_benchmarks(data, rng):
+    from error_checker import Checksum
+    checksum = Checksum()
+    fcs = checksum.generate_fcs(data)
+    return {
+        'Checksum.generate_fcs': lambda: checksum.generate_fcs(data),
+        'Checksum.validate': lambda: checksum.validate(data, fcs)
+    }
+
+
+def dataframe_benchmarks(data, rng):
+    from dataframe import DataFrame
+    dataframe = DataFrame(SOURCE_ADDRESS, DESTINATION_ADDRESS, bit_length(data) // 8, 0, data, "CRC")
+    wire = dataframe.to_bytes()
+    return {
+        'DataFrame.to_bytes': dataframe.to_bytes,
+        'DataFrame.from_bytes': lambda: DataFrame.from_bytes(wire)
+    }
+
+
+def channel_benchmarks(data, rng):
+    from channel import Channel
+    from dataframe import DataFrame
+    dataframe = DataFrame(SOURCE_ADDRESS, DESTINATION_ADDRESS, bit_length(data) // 8, 0, data, "CRC")
+    # Every call corrupts the frame, so this times the error path that runs per errored transmission
+    try:
+        channel = Channel(0.0, 1.0, rng=rng, verbose=False)
+    except TypeError:
+        # Older revisions draw from the module-level generator and announce their probabilities
+        seed_module_random(rng)
+        with contextlib.redirect_stdout(io.StringIO()):
+            channel = Channel(0.0, 1.0)
+    return {'Channel.introduce_errors': lambda: channel.introduce_errors(dataframe)}
+
+
+def error_injector_benchmarks(data, rng):
+    import error_injector
+    length = bit_length(data)
+    # The original injectors only flip bits among the first 32, so the error positions stay there
+    positions = range(min(length, 32))
+    single = rng.choice(positions)
+    double = rng.sample(positions, 2)
+    odd = rng.sample(positions, 3)
+    burst_length = min(32, length)
+    burst_start = rng.randrange(length - burst_length + 1)
+    random_error = lambda: error_injector.inject_error_random(data, "BURST", burst_length, rng)
+    try:
+        random_error()
+    except TypeError:
+        # Older revisions take no rng and draw from the module-level generator
+        seed_module_random(rng)
+        random_error = lambda: error_injector.inject_error_random(data, "BURST", burst_length)
+    return {
+        'inject_single_bit_error': lambda: error_injector.inject_single_bit_error(data, single),
+        'inject_two_isolated_single_bit_errors':
+            lambda: error_injector.inject_two_isolated_single_bit_errors(data, *double),
+        'inject_odd_number_of_errors': lambda: error_injector.inject_odd_number_of_errors(data, odd),
+        'inject_burst_error': lambda: error_injector.inject_burst_error(data, burst_start, burst_length),
+        'inject_error_random': random_error,
+        'inject_error_manual':
+            lambda: error_injector.inject_error_manual(data, "BURST", start_index=burst_start, burst_length=burst_length)
+    }
+
+
+BENCHMARK_GROUPS = (crc_benchmarks, checksum_benchmarks, dataframe_benchmarks, channel_benchmarks,
+                    error_injector_benchmarks)
+
+
+def time_call(function, min_time=MIN_TIME, repeats=REPEATS):
+    """Best seconds per call over repeats runs, each of enough calls to last min_time."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10:
+            break
+        loops *= 10
+    loops = max(1, int(loops * min_time / max(elapsed, 1e-9)))
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+def measure_memory(function):
+    """
+    Peak bytes allocated during one call, and blocks still allocated after it (the result included).
+    CPython does not count allocations per call, so these two stand in for an allocation count.
+    """
+    function()  # Warm caches and lazily built tables first
+    tracemalloc.start()
+    try:
+        before_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        result = function()
+        _, peak = tracemalloc.get_traced_memory()
+        after_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+        del result
+    finally:
+        tracemalloc.stop()
+    return peak - baseline, after_blocks - before_blocks
+
+
+def working_benchmarks(group, data, seed, names=None):
+    """
+    The benchmarks of group that run on this revision, as {name: (function, input kind)}, and the
+    errors of those that do not, as {name: error}; a group that cannot be set up at all is keyed by
+    its own name. The payload goes in as bytes, and as the same payload in bits when a revision
+    rejects bytes.
+    """
+    working = {}
+    errors = {}
+    setup_error = None
+    built = False
+    for kind, payload in ((BYTES, data), (BITS, to_bits(data))):
+        try:
+            benchmarks = group(payload, random.Random(seed))
+        except Exception as e:
+            setup_error = e  # The error with the last input tried, bits, says why the revision rejects both
+            continue
+        built = True
+        for name, function in benchmarks.items():
+            if name in working or (names and name not in names):
+                continue
+            try:
+                function()
+            except Exception as e:
+                errors[name] = e
+                continue
+            working[name] = (function, kind)
+            errors.pop(name, None)
+    if not built:
+        errors[group.__name__] = setup_error
+    return working, errors
+
+
+def run_benchmarks(sizes=SIZES, seed=SEED, min_time=MIN_TIME, names=None):
+    results = []
+    skipped = []
+    for size in sizes:
+        data = random.Random(seed + size).randbytes(size)
+        for group in BENCHMARK_GROUPS:
+            benchmarks, errors = working_benchmarks(group, data, seed, names)
+            for name, error in errors.items():
+                # An older revision may not have this primitive, or not with this signature
+                print(f"{name} skipped at {size} B: {error!r}")
+                skipped.append({'name': name, 'size': size, 'error': repr(error)})
+            for name, (function, kind) in benchmarks.items():
+                seconds = time_call(function, min_time)
+                peak_bytes, retained_blocks = measure_memory(function)
+                result = {
+                    'name': name,
+                    'size': size,
+                    'input': kind,
+                    'ns_per_call': seconds * 1e9,
+                    'ns_per_byte': seconds * 1e9 / size,  # Per payload byte, whichever form it was passed in
+                    'peak_bytes': peak_bytes,
+                    'retained_blocks': retained_blocks
+                }
+                results.append(result)
+                print(f"{name:<38} {size:>6} B {result['ns_per_call']:14.0f} ns {result['ns_per_byte']:10.2f} ns/B "
+                      f"{peak_bytes:>9} B peak {retained_blocks:>4} blocks ({kind})")
+    return {'seed': seed, 'python': sys.version.split()[0], 'results': results, 'skipped': skipped}
+
+
+def run_at_revision(revision, output_file, arguments):
+    """Runs this benchmark script against the modules of revision, checked out in a temporary worktree."""
+    repository = os.path.dirname(os.path.abspath(__file__))
+    worktree = tempfile.mkdtemp(prefix='microbench-')
+    try:
+        subprocess.run(['git', 'worktree', 'add', '--detach', worktree, revision], cwd=repository, check=True,
+                       stdout=subprocess.DEVNULL)
+        script = os.path.join(worktree, '_microbench.py')
+        shutil.copy(os.path.abspath(__file__), script)
+        if not os.path.exists(os.path.join(worktree, 'options.py')):
+            shutil.copy(os.path.join(repository, 'options.py'), worktree)
+        print(f"Benchmarking {revision}...")
+        subprocess.run([sys.executable, script, f"--output={os.path.abspath(output_file)}"] + arguments,
+                       cwd=worktree, check=True)
+    finally:
+        subprocess.run(['git', 'worktree', 'remove', '--force', worktree], cwd=repository, check=False)
+        shutil.rmtree(worktree, ignore_errors=True)
+    with open(output_file) as results:
+        return json.load(results)
+
+
+def compare(before, after, tolerance=TOLERANCE):
+    """
+    Lines of ns/byte and peak memory changes from before to after, per benchmark and size, then a
+    line for every benchmark that was skipped, or only measured, on one side.
+    """
+    previous = {(result['name'], result['size']): result for result in before['results']}
+    current = {(result['name'], result['size']): result for result in after['results']}
+    lines = []
+    for key, result in current.items():
+        old = previous.get(key)
+        if old is None:
+            continue
+        ratio = result['ns_per_byte'] / old['ns_per_byte']
+        verdict = 'faster' if ratio < 1 - tolerance else 'slower' if ratio > 1 + tolerance else 'same'
+        inputs = f" [{old.get('input', BYTES)} -> {result.get('input', BYTES)}]" \
+            if old.get('input', BYTES) != result.get('input', BYTES) else ''
+        lines.append(f"{result['name']:<38} {result['size']:>6} B {old['ns_per_byte']:10.2f} -> "
+                     f"{result['ns_per_byte']:10.2f} ns/B ({ratio:5.2f}x, {verdict}) "
+                     f"peak {old['peak_bytes']} -> {result['peak_bytes']} B{inputs}")
+
+    skipped = set()
+    for side, report in (('before', before), ('after', after)):
+        for skip in report.get('skipped', []):
+            skipped.add((skip['name'], skip['size']))
+            lines.append(f"{skip['name']:<38} {skip['size']:>6} B skipped {side}: {skip['error']}")
+    # Benchmarks added or removed between the revisions, rather than failing on one side
+    for name, size in sorted(previous.keys() ^ current.keys() - skipped):
+        side = 'before' if (name, size) in previous else 'after'
+        lines.append(f"{name:<38} {size:>6} B only measured {side}")
+    return lines
+
+
+def main():
+    args, options = parse_options(sys.argv[1:])
+    if args or (options.get('compare') and len(str(options['compare']).split('..')) != 2):
+        print("Usage: python microbench.py [--sizes=N,...] [--names=NAME,...] [--seed=N] [--min-time=S] "
+              "[--output=FILE] [--compare=REV_A..REV_B]")
+        sys.exit(1)
+
+    sizes = tuple(int(size) for size in options['sizes'].split(',')) if 'sizes' in options else SIZES
+    names = set(options['names'].split(',')) if 'names' in options else None
+    seed = int(options.get('seed', SEED))
+    min_time = float(options.get('min_time', MIN_TIME))
+
+    if options.get('compare'):
+        # Both revisions run the same benchmark code and inputs; only the measured modules differ
+        arguments = [f"--sizes={','.join(map(str, sizes))}", f"--seed={seed}", f"--min-time={min_time}"]
+        if names:
+            arguments.append(f"--names={','.join(sorted(names))}")
+        before_revision, after_revision = options['compare'].split('..')
+        with tempfile.TemporaryDirectory() as results_dir:
+            before = run_at_revision(before_revision, os.path.join(results_dir, 'before.json'), arguments)
+            after = run_at_revision(after_revision, os.path.join(results_dir, 'after.json'), arguments)
+        print(f"{before_revision} -> {after_revision}:")
+        for line in compare(before, after):
+            print(line)
+        return
+
+    report = run_benchmarks(sizes, seed, min_time, names)
+    output_file = options.get('output', RESULTS_FILE)
+    with open(output_file, 'w') as output:
+        json.dump(report, output, indent=2)
+    print(f"{len(report['results'])} benchmarks written to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+HOST = 'localhost'  # Default receiver address, shared by the sender and receiver command lines
+PORT = 12345
+
+PROTOCOL_NAMES = {
+    '1': 'StopAndWait',
+    '2': 'GoBackN',
+    '3': 'SelectiveRepeat',
+    'StopAndWait': 'StopAndWait',
+    'GoBackN': 'GoBackN',
+    'SelectiveRepeat': 'SelectiveRepeat'
+}
+
+TECHNIQUE_NAMES = {
+    '1': 'CRC',
+    '2': 'Checksum',
+    'CRC': 'CRC',
+    'Checksum': 'Checksum'
+}
+
+
+def parse_options(argv):
+    """Splits command-line arguments into positional values and --name[=value] options."""
+    positional = []
+    options = {}
+    for arg in argv:
+        if arg.startswith('--'):
+            name, _, value = arg[2:].partition('=')
+            options[name.replace('-', '_')] = value if value else True
+        else:
+            positional.append(arg)
+    return positional, options
@@ -0,0 +1,99 @@
+import abc
+from dataframe import bytes_to_bits
+
+BINARY = 'binary'
+TEXT = 'text'
+OUTPUT_FILES = {BINARY: 'output.bin', TEXT: 'output.txt'}
+BUFFER_SIZE = 1024 * 1024  # Bytes collected in memory before each write to disk
+
+
+class OutputSink(abc.ABC):
+    """Where a Receiver writes the payloads it delivers: write(seq_no, payload) once per frame, in order."""
+
+    def __init__(self, output_file, mode, buffer_size=BUFFER_SIZE):
+        self.output_file = output_file
+        self.file = open(output_file, mode, buffering=buffer_size)
+        self.frame_size = None  # Payload bytes of the first frame written
+
+    @abc.abstractmethod
+    def write(self, seq_no, payload):
+        """Writes the payload of frame seq_no, the next frame in order."""
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class BinarySink(OutputSink):
+    """
+    Writes delivered payloads as raw bytes, appended through a large buffer. Receivers deliver
+    frames in order, so frame seq_no ends up at offset seq_no * frame size, the frame size being
+    that of the first frame written.
+    """
+
+    def __init__(self, output_file, buffer_size=BUFFER_SIZE):
+        super().__init__(output_file, 'wb', buffer_size)
+
+    def write(self, seq_no, payload):
+        if self.frame_size is None:
+            self.frame_size = len(payload)
+        self.file.write(payload)
+
+
+class TextSink(OutputSink):
+    """The annotated debug format: one "<seq_no>. <payload bits>" line per delivered frame."""
+
+    def __init__(self, output_file, buffer_size=BUFFER_SIZE):
+        super().__init__(output_file, 'w', buffer_size)
+
+    def write(self, seq_no, payload):
+        if self.frame_size is None:
+            self.frame_size = len(payload)
+        self.file.write(f"{seq_no}. {bytes_to_bits(payload)}\n")
+
+
+SINKS = {
+    BINARY: BinarySink,
+    TEXT: TextSink
+}
+
+
+def open_sink(output_file, output_format=BINARY):
+    return SINKS[output_format](output_file)
+
+
+class ReorderWindow:
+    """
+    Frames held back until the frames before them arrive, in a fixed ring of slots: window[i] is
+    the frame i places after the next one to deliver, and popleft() moves the window on by one
+    frame in constant time instead of shifting every slot.
+    """
+
+    def __init__(self, size):
+        self.slots = [None] * size
+        self.start = 0
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __getitem__(self, index):
+        return self.slots[(self.start + index) % len(self.slots)]
+
+    def __setitem__(self, index, frame):
+        self.slots[(self.start + index) % len(self.slots)] = frame
+
+    def __iter__(self):
+        size = len(self.slots)
+        for index in range(size):
+            yield self.slots[(self.start + index) % size]
+
+    def popleft(self):
+        frame = self.slots[self.start]
+        self.slots[self.start] = None
+        self.start = (self.start + 1) % len(self.slots)
+        return frame
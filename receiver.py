@@ -1,45 +1,44 @@
 import sys
 import socket
+import asyncio
+import async_arq
+import metrics
+from delayed_ack import DelayedAck, ACK_EVERY, ACK_DELAY
+from server import ReceiverServer, MAX_CONNECTIONS
+from striping import StripedReceiverServer, STRIPE_TIMEOUT
 from stop_and_wait import Receiver as StopAndWaitReceiver
 from go_back_n import Receiver as GoBackNReceiver
 from selective_repeat import Receiver as SelectiveRepeatReceiver
+from output_sink import BINARY, TEXT, OUTPUT_FILES
+from options import HOST, PORT, PROTOCOL_NAMES, TECHNIQUE_NAMES, parse_options
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python receiver.py <protocol> <technique>")
+    args, options = parse_options(sys.argv[1:])
+    if len(args) != 2:
+        print("Usage: python receiver.py <protocol> <technique> [--async] [--window=N] [--delayed-ack[=N]] [--ack-delay=S] "
+              "[--host=HOST] [--port=PORT] [--max-connections=N] [--striped] [--stripe-timeout=S] [--text-output] "
+              "[--metrics[=json|prometheus]] [--metrics-file=PATH] [--metrics-interval=S]")
         print("Protocol: 'StopAndWait' or '1', 'GoBackN' or '2', or 'SelectiveRepeat' or '3'")
         print("Technique: 'CRC' or '1', 'Checksum' or '2'")
         sys.exit(1)
 
-    protocol_input = sys.argv[1]
-    technique_input = sys.argv[2]
+    protocol_input = args[0]
+    technique_input = args[1]
 
-    protocol_map = {
-        '1': 'StopAndWait',
-        '2': 'GoBackN',
-        '3': 'SelectiveRepeat',
-        'StopAndWait': 'StopAndWait',
-        'GoBackN': 'GoBackN',
-        'SelectiveRepeat': 'SelectiveRepeat'
-    }
-
-    technique_map = {
-        '1': 'CRC',
-        '2': 'Checksum',
-        'CRC': 'CRC',
-        'Checksum': 'Checksum'
-    }
-
-    protocol = protocol_map.get(protocol_input)
+    protocol = PROTOCOL_NAMES.get(protocol_input)
     if not protocol:
         print("Error: Invalid protocol. Choose 'StopAndWait', 'GoBackN', 'SelectiveRepeat', '1', '2', or '3'.")
         sys.exit(1)
 
-    technique = technique_map.get(technique_input)
+    technique = TECHNIQUE_NAMES.get(technique_input)
     if not technique:
         print("Error: Technique must be either 'CRC', 'Checksum', '1', or '2'.")
         sys.exit(1)
 
+    if options.get('async') and options.get('striped'):
+        print("Error: --striped is not supported with --async; striped transfers use the threaded server.")
+        sys.exit(1)
+
     receiver_address = b'\x06\x05\x04\x03\x02\x01'
 
     protocols = {
@@ -50,7 +49,71 @@ def main():
 
     ReceiverClass = protocols[protocol]
 
-    server_address = ('localhost', 12345)
+    # Only Selective Repeat buffers out-of-order frames; its window must cover the sender's
+    receiver_options = {}
+    if protocol == 'SelectiveRepeat' and 'window' in options:
+        receiver_options['window_size'] = int(options['window'])
+
+    # Payloads are written as raw bytes to output.bin; --text-output writes the annotated
+    # "<seq_no>. <payload bits>" lines to output.txt instead, for debugging
+    output_format = TEXT if options.get('text_output') else BINARY
+    receiver_options['output_format'] = output_format
+    output_file = OUTPUT_FILES[output_format]
+
+    # Pipelined receivers can acknowledge every N frames or after --ack-delay seconds instead of each frame
+    ack_every = 1
+    if options.get('delayed_ack') and protocol != 'StopAndWait':
+        ack_every = ACK_EVERY if options['delayed_ack'] is True else int(options['delayed_ack'])
+    ack_delay = float(options.get('ack_delay', ACK_DELAY))
+
+    server_address = (options.get('host', HOST), int(options.get('port', PORT)))
+    # More than one connection serves senders in parallel, each session writing its own output file
+    # Striped transfers arrive as several connections at once, so they always use the concurrent server
+    max_connections = int(options.get('max_connections', MAX_CONNECTIONS if options.get('striped') else 1))
+
+    # --metrics exports after every session, on --metrics-interval, and when the receiver stops
+    exporter = metrics.exporter_from_options(options, protocol)
+    session_done = exporter.export if exporter is not None else None
+    try:
+        serve(protocol, technique, receiver_address, server_address, ReceiverClass, receiver_options,
+              output_file, ack_every, ack_delay, max_connections, options, session_done)
+    finally:
+        if exporter is not None:
+            exporter.close()
+
+def serve(protocol, technique, receiver_address, server_address, ReceiverClass, receiver_options,
+          output_file, ack_every, ack_delay, max_connections, options, session_done):
+    if options.get('async'):
+        asyncio.run(async_arq.serve(protocol, technique, receiver_address, server_address,
+                                    ack_every=ack_every, ack_delay=ack_delay, max_connections=max_connections,
+                                    output_file=output_file, session_done=session_done, **receiver_options))
+        return
+
+    def make_receiver(connection, output_file=output_file, **overrides):
+        session_options = dict(receiver_options, **overrides)
+        if ack_every > 1:
+            session_options['delayed_ack'] = DelayedAck(ack_every, ack_delay)
+        return ReceiverClass(
+            connection=connection,
+            checker=technique,
+            address=receiver_address,
+            output_file=output_file,
+            **session_options
+        )
+
+    if options.get('striped'):
+        print(f"Using protocol '{protocol}' with technique '{technique}' for striped transfers.")
+        StripedReceiverServer(make_receiver, server_address, max_connections, output_file=output_file,
+                              stripe_timeout=float(options.get('stripe_timeout', STRIPE_TIMEOUT)),
+                              session_done=session_done).serve_forever()
+        return
+
+    if max_connections > 1:
+        print(f"Using protocol '{protocol}' with technique '{technique}'.")
+        ReceiverServer(make_receiver, server_address, max_connections, output_file=output_file,
+                       session_done=session_done).serve_forever()
+        return
+
     connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
 
     connection.bind(server_address)
@@ -61,16 +124,14 @@ def main():
         client_socket, client_address = connection.accept()
         print(f"Connection established with {client_address}")
 
-        receiver = ReceiverClass(
-            connection=client_socket,
-            checker=technique,
-            address=receiver_address
-        )
+        receiver = make_receiver(client_socket)
 
         receiver.receive_data()
 
         client_socket.close()
         print(f"Connection closed with {client_address}")
+        if session_done is not None:
+            session_done()
 
     connection.close()
 
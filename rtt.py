@@ -0,0 +1,75 @@
+import itertools
+import threading
+import time
+from collections import deque
+from metrics import RTT
+
+ALPHA = 1 / 8
+BETA = 1 / 4
+K = 4
+MIN_RTO = 0.05
+MAX_RTO = 60.0
+MAX_BACKOFFS = 1  # The channel drops frames at random, not from congestion, so waiting longer rarely helps
+
+
+class RTTEstimator:
+    """
+    Retransmission timeout from smoothed RTT and RTT variance (RFC 6298), with exponential
+    backoff on timeouts. Karn's rule applies: frames that were retransmitted are never sampled,
+    since their ACK cannot be matched to one transmission, and the backed-off RTO is kept until
+    the next sample. Go-Back-N retransmits whole windows and so can go many timeouts without a
+    sample; at most max_backoffs doublings apply, so the RTO cannot ratchet up meanwhile.
+    """
+
+    def __init__(self, initial_rto, min_rto=MIN_RTO, max_rto=MAX_RTO, max_backoffs=MAX_BACKOFFS, history=1024,
+                 clock=time.monotonic):
+        self.rto = initial_rto
+        self.base_rto = initial_rto  # The RTO before any backoff
+        self.backoffs = 0
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.max_backoffs = max_backoffs
+        self.srtt = None
+        self.rttvar = None
+        self.samples = deque(maxlen=history)
+        self.clock = clock
+        self.sent_at = {}  # first-transmission time of unacknowledged frames, in sequence order
+        self.lock = threading.Lock()
+
+    def sample(self, rtt):
+        with self.lock:
+            if self.srtt is None:
+                self.srtt = rtt
+                self.rttvar = rtt / 2
+            else:
+                self.rttvar = (1 - BETA) * self.rttvar + BETA * abs(self.srtt - rtt)
+                self.srtt = (1 - ALPHA) * self.srtt + ALPHA * rtt
+            self.base_rto = min(self.max_rto, max(self.min_rto, self.srtt + K * self.rttvar))
+            self.rto = self.base_rto
+            self.backoffs = 0
+            self.samples.append(rtt)
+        RTT.observe(rtt)
+
+    def backoff(self):
+        with self.lock:
+            if self.backoffs < self.max_backoffs:
+                self.backoffs += 1
+                self.rto = min(self.max_rto, self.base_rto * 2 ** self.backoffs)
+
+    def frame_sent(self, seq_no, retransmission=False):
+        with self.lock:
+            if retransmission:
+                self.sent_at.pop(seq_no, None)
+            else:
+                self.sent_at[seq_no] = self.clock()
+
+    def frame_acked(self, seq_no, cumulative=False):
+        """Takes an RTT sample from the ACK of seq_no; a cumulative ACK also settles earlier frames."""
+        now = self.clock()
+        with self.lock:
+            sent_at = self.sent_at.pop(seq_no, None)
+            if cumulative:
+                for earlier in list(itertools.takewhile(lambda s: s < seq_no, self.sent_at)):
+                    del self.sent_at[earlier]
+        if sent_at is not None:
+            self.sample(now - sent_at)
@@ -0,0 +1,70 @@
+import heapq
+import itertools
+import threading
+import time
+
+
+class RetransmissionScheduler:
+    """
+    Fires per-frame retransmission deadlines from one thread using a min-heap.
+
+    Rescheduling or cancelling a key only updates its entry in deadlines; superseded heap
+    entries are skipped when they reach the top, so every operation is O(log n).
+    """
+
+    def __init__(self, callback, clock=time.monotonic):
+        self.callback = callback
+        self.clock = clock
+        self.heap = []  # (deadline, token, key)
+        self.deadlines = {}  # key -> token of its live heap entry
+        self.tokens = itertools.count()
+        self.condition = threading.Condition()
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def schedule(self, key, delay):
+        """Arms (or re-arms) the deadline for key, replacing any earlier one."""
+        with self.condition:
+            token = next(self.tokens)
+            self.deadlines[key] = token
+            heapq.heappush(self.heap, (self.clock() + delay, token, key))
+            if len(self.heap) > 2 * len(self.deadlines) + 64:
+                self.heap = [entry for entry in self.heap if self.deadlines.get(entry[2]) == entry[1]]
+                heapq.heapify(self.heap)
+            self.condition.notify()
+
+    def cancel(self, key):
+        with self.condition:
+            self.deadlines.pop(key, None)
+
+    def pending(self):
+        with self.condition:
+            return len(self.deadlines)
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running:
+                    heap = self.heap
+                    while heap and self.deadlines.get(heap[0][2]) != heap[0][1]:
+                        heapq.heappop(heap)
+                    if not heap:
+                        self.condition.wait()
+                        continue
+                    delay = heap[0][0] - self.clock()
+                    if delay <= 0:
+                        break
+                    self.condition.wait(delay)
+                if not self.running:
+                    return
+                _, _, key = heapq.heappop(self.heap)
+                del self.deadlines[key]
+            self.callback(key)
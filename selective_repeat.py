@@ -1,18 +1,31 @@
 import traceback
+import itertools
 import threading
 import time
 from channel import Channel
 from dataframe import DataFrame
-from ackframe import ACK
+from ackframe import ACK, SACK
+from framing import frame_stream
+from frame_source import FrameSource
+from output_sink import BINARY, ReorderWindow, open_sink
+from validator import validate
+import eventlog
+import metrics
+from eventlog import EventLog, event_log_path, write_legacy_log
+from scheduler import RetransmissionScheduler
+from rtt import RTTEstimator
+from seqnum import seq_unwrap
 from error_checker import CRC, Checksum
 
 WINDOW_SIZE=4
 TIMEOUT=4
 
 class Sender:
-    def __init__(self, connection, input_file, source, destination, checker, bytes, log_file="log.txt", window_size=WINDOW_SIZE, timeout=TIMEOUT):
+    def __init__(self, connection, input_file, source, destination, checker, bytes, log_file="log.txt", window_size=WINDOW_SIZE, timeout=TIMEOUT, rtt_estimator=None, window_controller=None, frame_source=None, event_log=None, channel=None):
         self.connection = connection
+        self.stream = frame_stream(connection)
         self.input_file = input_file
+        self.frame_source = frame_source if frame_source is not None else FrameSource(input_file, bytes)
         self.source_address = source
         self.destination_address = destination
         self.error_checker = checker
@@ -20,138 +33,233 @@ class Sender:
         self.log_file = log_file
         self.window_size = window_size
         self.timeout = timeout
-        self.channel = Channel()
-        self.buffer = {}  # Stores frame sequence number as key, and (thread, dataframe) as value
+        self.rtt = rtt_estimator if rtt_estimator is not None else RTTEstimator(initial_rto=timeout)
+        self.window_controller = window_controller
+        if window_controller is not None:
+            self.window_size = window_controller.window_size
+        self.event_log = event_log
+        self.channel = channel if channel is not None else Channel()
+        self.buffer = {}  # Stores frame sequence number as key, and the unacknowledged dataframe as value
         self.lock = threading.Lock()  # For synchronizing access to the buffer
         self.ack_received = threading.Event()  # Event signaling the receipt of ACK/NACK
+        self.scheduler = None
+        self.next_seq_no = 0  # Sequence number of the next new frame
+        self.send_counter = itertools.count()
+        self.sent_order = {}  # Order of each buffered frame's latest transmission
+        self.delivered_order = -1  # Latest transmission order known to have reached the receiver
 
     def makeDataFrame(self, index):
-        start_char_index = index * self.payload_size * 8
-        num_chars_to_read = self.payload_size * 8
-
-        with open(self.input_file, 'r') as input_file:
-            input_file.seek(start_char_index)
-            data = input_file.read(num_chars_to_read)
-
-            if not data:
-                return None
+        data = self.frame_source.read(index)
+        if data is None:
+            return None
 
         dataframe = DataFrame(self.source_address, self.destination_address, self.payload_size, index, data, self.error_checker)
         return dataframe
 
     def send_data(self):
-        with open(self.log_file, 'w'):
-            pass
+        if self.event_log is None:
+            self.event_log = EventLog(event_log_path(self.log_file))
         start_time=time.time()
-        frame_seq_no = 0
+        eof_reached = False
+        metrics.WINDOW_SIZE.set(self.window_size)
+
+        # One scheduler thread owns every retransmission deadline
+        self.scheduler = RetransmissionScheduler(self.retransmit)
 
         # Start the listener thread for ACKs and NACKs
-        listener_thread = threading.Thread(target=self.listen_for_acks)
+        listener_thread = threading.Thread(target=self.listen_for_acks, daemon=True)
         listener_thread.start()
 
         while True:
+            # Cleared before looking at the buffer so an ACK processed meanwhile is not missed
+            self.ack_received.clear()
+
             # Fill the buffer until the window size is reached or end of file
-            while len(self.buffer) < self.window_size:
-                dataframe = self.makeDataFrame(frame_seq_no)
-                if dataframe is None:
-                    break  # End of file reached
-
-                # Create and store a new thread for the frame
-                frame_thread = threading.Thread(target=self.send_frame, args=(dataframe,))
-                self.buffer[frame_seq_no] = (frame_thread, dataframe)
-                frame_thread.start()
-                frame_seq_no += 1
-
-            # Wait for the ACK/NACK processing
-            self.ack_received.wait()
+            with self.lock:
+                while not eof_reached and len(self.buffer) < self.window_size:
+                    dataframe = self.makeDataFrame(self.next_seq_no)
+                    if dataframe is None:
+                        eof_reached = True  # End of file reached
+                        break
 
-            # ACKs/NACKs are handled by another thread (ACK listener)
-            self.ack_received.clear()
+                    self.buffer[self.next_seq_no] = dataframe
+                    self.send_frame(dataframe)
+                    self.next_seq_no += 1
+                metrics.WINDOW_OCCUPANCY.set(len(self.buffer))
 
-            # If buffer is empty and no more frames to send, transmission is done
-            if len(self.buffer) == 0 and dataframe is None:
+                # If buffer is empty and no more frames to send, transmission is done
+                done = eof_reached and len(self.buffer) == 0
+
+            if done:
                 end_time = time.time()
                 total_time = end_time - start_time
                 print(f"Total transmission time: {total_time:.2f} seconds")
+                print(f"Final RTO: {self.rtt.rto:.4f} seconds from {len(self.rtt.samples)} RTT samples")
+                if self.window_controller is not None:
+                    print(f"Final window size: {self.window_size} after {self.window_controller.changes} changes")
                 print("Transmission completed.")
+                self.frame_source.close()
                 break
 
-        # Wait for the listener thread to finish before exiting
-        listener_thread.join()
+            # Wait for the ACK/NACK processing done by the listener thread
+            self.ack_received.wait()
+
+        self.scheduler.stop()
+        self.event_log.close()
+        write_legacy_log(self.event_log.path, 'SelectiveRepeat', self.log_file)
+        self.stream.close()
 
     def send_frame(self, dataframe):
+        """Transmits the frame once and (re)arms its retransmission deadline."""
         frame_seq_no = dataframe.frame_seq_no
-        while True:
-            # Pass the frame through the channel (introducing possible errors/loss)
-            transmitted_frame = self.channel.transmit(dataframe)
-            with open(self.log_file, 'a') as log_file:
-                if dataframe.first_time:
-                    log_file.write(f"{dataframe.frame_seq_no}. Sent\n")
-                else:
-                    log_file.write(f"{dataframe.frame_seq_no}. Resent\n")
-            dataframe.first_time=False
-            if transmitted_frame is not None:
-                # Send the frame over the connection
-                self.connection.send(transmitted_frame.to_bytes())
-                print(f"Sent frame: {frame_seq_no}")
-
-            # Start timer for timeout
-            start_time = time.time()
-            while time.time() - start_time < self.timeout:
-                # Wait for an ACK or NACK
-                with self.lock:
-                    if frame_seq_no not in self.buffer:
-                        return  # Frame successfully acknowledged, stop retransmission
-
-            # Timeout occurred, retransmit the frame
+        # Pass the frame through the channel (introducing possible errors/loss)
+        transmitted_frame = self.channel.transmit(dataframe)
+        self.rtt.frame_sent(frame_seq_no, retransmission=not dataframe.first_time)
+        self.event_log.record_transmission(frame_seq_no, retransmission=not dataframe.first_time,
+                                           lost=transmitted_frame is None)
+        data = transmitted_frame.to_bytes() if transmitted_frame is not None else None
+        metrics.frame_transmitted(dataframe, data)
+        dataframe.first_time=False
+        self.sent_order[frame_seq_no] = next(self.send_counter)
+        if transmitted_frame is not None:
+            # Send the frame over the connection
+            self.stream.send_frame(data)
+            print(f"Sent frame: {frame_seq_no}")
+
+        self.scheduler.schedule(frame_seq_no, self.rtt.rto)
+
+    def retransmit(self, frame_seq_no):
+        """Called by the scheduler when a frame's deadline passes without an ACK."""
+        with self.lock:
+            dataframe = self.buffer.get(frame_seq_no)
+            if dataframe is None:
+                return  # Acknowledged just before the deadline fired
             print(f"Timeout, retransmitting frame: {frame_seq_no}")
+            self.event_log.record(eventlog.TIMEOUT, frame_seq_no)
+            metrics.TIMEOUTS.inc()
+            # Back off once per stalled window, i.e. only when the oldest outstanding frame times out
+            if frame_seq_no == next(iter(self.buffer)):
+                self.rtt.backoff()
+                if self.window_controller is not None:
+                    self.set_window_size(self.window_controller.timeout(self.next_seq_no))
+            self.send_frame(dataframe)
+
+    def set_window_size(self, window_size):
+        if window_size != self.window_size:
+            print(f"Window size: {self.window_size} -> {window_size}")
+            self.window_size = window_size
+            metrics.WINDOW_SIZE.set(window_size)
+
+    def unwrap_seq_no(self, wire_seq_no):
+        """Maps a wrapped header sequence number back onto the frames sent so far."""
+        return seq_unwrap(wire_seq_no, next(iter(self.buffer), self.next_seq_no))
 
     def handle_ack(self, ack_frame):
         with self.lock:
-            ack_seq_no = ack_frame.frame_seq_no
-            # Remove all frames with sequence numbers <= ACKed frame from buffer
+            ack_seq_no = self.unwrap_seq_no(ack_frame.frame_seq_no)
+            metrics.ACKS_RECEIVED.inc()
+            self.rtt.frame_acked(ack_seq_no, cumulative=True)
+            # Remove all frames with sequence numbers <= ACKed frame from buffer and cancel their deadlines
+            acked = 0
             for seq_no in list(self.buffer.keys()):
                 if seq_no <= ack_seq_no:
-                    frame_thread, dataframe = self.buffer.pop(seq_no)
+                    metrics.frame_delivered(self.buffer.pop(seq_no))
+                    self.scheduler.cancel(seq_no)
+                    self.delivered_order = max(self.delivered_order, self.sent_order.pop(seq_no))
+                    acked += 1
+                    self.event_log.record(eventlog.ACK, seq_no)
                     print(f"ACK received for frame: {seq_no}, removing from buffer.")
-                    # Terminate the thread (it should finish on its own after this)
+            if acked and self.window_controller is not None:
+                self.set_window_size(self.window_controller.frames_acked(acked))
 
             # Signal that ACK has been processed
             self.ack_received.set()
 
+    def handle_sack(self, sack_frame):
+        """
+        Clears every frame the SACK covers in one pass over the buffer, then resends the frames it
+        shows missing. A gap only counts as a loss once a frame transmitted after it has arrived,
+        so a frame that is merely still in flight, or was just resent, is not sent again.
+        """
+        with self.lock:
+            cumulative_seq_no = self.unwrap_seq_no(sack_frame.frame_seq_no)
+            selected = {cumulative_seq_no + offset for offset in sack_frame.selected()}
+            highest_seq_no = max(selected, default=cumulative_seq_no)
+            metrics.ACKS_RECEIVED.inc()
+            self.rtt.frame_acked(cumulative_seq_no, cumulative=True)
+
+            acked = 0
+            gaps = []
+            for seq_no in list(self.buffer.keys()):
+                if seq_no > highest_seq_no:
+                    break
+                if seq_no <= cumulative_seq_no or seq_no in selected:
+                    metrics.frame_delivered(self.buffer.pop(seq_no))
+                    self.scheduler.cancel(seq_no)
+                    if seq_no in selected:
+                        self.rtt.frame_acked(seq_no)
+                    self.delivered_order = max(self.delivered_order, self.sent_order.pop(seq_no))
+                    acked += 1
+                    self.event_log.record(eventlog.ACK, seq_no)
+                    print(f"ACK received for frame: {seq_no}, removing from buffer.")
+                else:
+                    gaps.append(seq_no)
+            if acked and self.window_controller is not None:
+                self.set_window_size(self.window_controller.frames_acked(acked))
+
+            for seq_no in gaps:
+                if self.sent_order[seq_no] < self.delivered_order:
+                    print(f"SACK shows frame {seq_no} missing, resending.")
+                    self.event_log.record(eventlog.NACK, seq_no)
+                    if self.window_controller is not None:
+                        self.set_window_size(self.window_controller.frame_lost(seq_no, self.next_seq_no))
+                    self.send_frame(self.buffer[seq_no])
+
+            self.ack_received.set()
+
     def handle_nack(self, nack_frame):
         with self.lock:
-            nack_seq_no = -nack_frame.frame_seq_no-1
-            # Resend the specific frame indicated by the NACK
+            nack_seq_no = self.unwrap_seq_no(nack_frame.frame_seq_no)
+            metrics.NACKS_RECEIVED.inc()
+            # Resend the specific frame indicated by the NACK right away
             if nack_seq_no in self.buffer:
-                frame_thread, dataframe = self.buffer[nack_seq_no]
                 print(f"NACK received for frame: {nack_seq_no}, resending.")
-                # The thread will automatically retransmit on its next cycle (timeout)
-                # Optionally restart the thread or set a flag to trigger immediate retransmission
-                frame_thread = threading.Thread(target=self.send_frame, args=(dataframe,))
-                self.buffer[nack_seq_no] = (frame_thread, dataframe)
-                frame_thread.start()
+                self.event_log.record(eventlog.NACK, nack_seq_no)
+                if self.window_controller is not None:
+                    self.set_window_size(self.window_controller.frame_lost(nack_seq_no, self.next_seq_no))
+                self.send_frame(self.buffer[nack_seq_no])
 
     def listen_for_acks(self):
-        """Listen for ACK and NAK frames continuously."""
+        """Listen for ACK, SACK and NAK frames until the connection closes."""
         while True:
-            ack_nack_data = self.connection.recv(1024)  # Assuming a fixed size for ACK/NACK frames
+            try:
+                ack_nack_data = self.stream.recv_frame()
+            except OSError:
+                break
+            if not ack_nack_data:
+                break
             ack_nack_frame = ACK.from_bytes(ack_nack_data)  # Deserialize frame
 
-            if ack_nack_frame.frame_seq_no >= 0:
-                self.handle_ack(ack_nack_frame)
-            else:
+            if isinstance(ack_nack_frame, SACK):
+                self.handle_sack(ack_nack_frame)
+            elif ack_nack_frame.nack:
                 self.handle_nack(ack_nack_frame)
+            else:
+                self.handle_ack(ack_nack_frame)
 
 class Receiver:
-    def __init__(self, connection, checker, address, window_size=WINDOW_SIZE, input_file='input.txt', output_file="output.txt"):
+    def __init__(self, connection, checker, address, window_size=WINDOW_SIZE, input_file='input.txt', output_file="output.bin", delayed_ack=None, first_frame=0, output_format=BINARY):
         self.connection = connection
+        self.stream = frame_stream(connection)
         self.input_file = input_file
         self.output_file = output_file
+        self.output_format = output_format  # BINARY payload bytes, or the TEXT debug format
+        self.first_frame = first_frame  # Index of the first frame in the input file, for a striped transfer
         self.window_size = window_size
         self.expected_seq_no = 0  # First sequence number expected
         self.address = address
-        self.buffer = [None] * window_size  # Buffer of window size to hold out-of-order frames
+        self.buffer = ReorderWindow(window_size)  # Ring buffer of window size to hold out-of-order frames
+        self.delayed_ack = delayed_ack  # Coalesces SACKs for in-order frames when set
 
         # Initialize error checker (CRC or Checksum)
         if checker == 'CRC':
@@ -159,121 +267,133 @@ class Receiver:
         elif checker == 'Checksum':
             self.error_checker = Checksum()
 
+    @property
+    def frames_delivered(self):
+        """Frames written to the output so far, all of them in order."""
+        return self.expected_seq_no
+
     def receive_data(self):
-        with open(self.output_file, 'w') as output:
+        with open_sink(self.output_file, self.output_format) as output:
             while True:
                 try:
                     # Receive data from sender
-                    data = self.connection.recv(1024)
+                    data = self.stream.recv_frame()
                     if not data:
                         print("Connection closed by sender.")
                         self.connection.close()
                         break
 
-                    # Convert received data to DataFrame object
-                    data_frame = DataFrame.from_bytes(data)
-
-                    # Address verification
-                    if data_frame.destination_address != self.address:
-                        print(f"Frame {data_frame.frame_seq_no} Destination address mismatch.")
-                        continue
-
-                    frame_seq_no = data_frame.frame_seq_no
-                    payload = data_frame.payload
-                    received_fcs = data_frame.fcs
-                    self.payload_size = len(payload) * 8  # Size of the payload in bits
-
-                    # Case 1: Frame with expected sequence number
-                    if frame_seq_no == self.expected_seq_no:
-                        print(f"Frame {frame_seq_no} received (in order).")
-                        if self.error_checker.validate(payload, received_fcs):  # No errors
-                            #output.write(f"{frame_seq_no}. {payload}\n")
-                            self.send_ack(frame_seq_no)
-                            self.buffer[0] = data_frame  # Store in buffer
-
-                            # Check and flush buffer for consecutive frames
-                            self.flush_buffer(output)
-
-                        else:  # Frame has errors
-                            print(f"Frame {frame_seq_no} rejected (FCS error).")
-                            self.send_nack(frame_seq_no)
-
-                    # Case 2: Frame with sequence number greater than expected
-                    elif frame_seq_no > self.expected_seq_no:
-                        print(f"Frame {frame_seq_no} received (out of order).")
-
-                        # Send NACKs for missing frames up to current frame
-                        for seq in range(self.expected_seq_no, frame_seq_no):
-                            self.send_nack(seq)
-
-                        # Check if frame is already in buffer
-                        buffer_index = (frame_seq_no - self.expected_seq_no) % self.window_size
-                        if self.buffer[buffer_index] is None:
-                            if self.error_checker.validate(payload, received_fcs):  # No errors
-                                print(f"Frame {frame_seq_no} stored in buffer.")
-                                self.buffer[buffer_index] = data_frame
-                            else:  # Frame has errors
-                                print(f"Frame {frame_seq_no} rejected (FCS error).")
-                                self.send_nack(frame_seq_no)
-
-                    # Case 3: Frame with sequence number less than expected
-                    else:
-                        print(f"Duplicate frame {frame_seq_no} received.")
-                        # ACK for previous frame since this frame has already been acknowledged
-                        self.send_ack(self.expected_seq_no - 1)
+                    # Convert received data to DataFrame object and process it
+                    self.handle_frame(DataFrame.from_bytes(data), output)
 
                 except Exception as e:
                     self.connection.close()
                     break
 
+        if self.delayed_ack is not None:
+            self.delayed_ack.close()
+            print(self.delayed_ack.summary())
+
         # After connection closes, validate the output
-        self.validate_output()
+        validate(self.input_file, self.output_file, output.frame_size, self.first_frame, self.output_format)
+
+    def handle_frame(self, data_frame, output):
+        """
+        Processes one received frame. Always returns True, since a Selective Repeat receiver never drops the
+        connection; it matches the Stop-and-Wait Receiver, which returns False to drop it.
+        """
+        # Address verification
+        if data_frame.destination_address != self.address:
+            print(f"Frame {data_frame.frame_seq_no} Destination address mismatch.")
+            return True
+
+        frame_seq_no = seq_unwrap(data_frame.frame_seq_no, self.expected_seq_no)
+        payload = data_frame.payload
+        received_fcs = data_frame.fcs
+
+        # A frame that fails the FCS check is NAKed right away; every other frame is answered
+        # with one SACK reporting the cumulative ACK and the out-of-order frames held in the buffer
+        # Case 1: Frame with expected sequence number
+        if frame_seq_no == self.expected_seq_no:
+            print(f"Frame {frame_seq_no} received (in order).")
+            if self.error_checker.validate(payload, received_fcs):  # No errors
+                metrics.FRAMES_ACCEPTED.inc()
+                self.buffer[0] = data_frame  # Store in buffer
+
+                # Check and flush buffer for consecutive frames
+                self.flush_buffer(output)
+
+            else:  # Frame has errors
+                print(f"Frame {frame_seq_no} rejected (FCS error).")
+                metrics.FRAMES_REJECTED.inc()
+                self.send_nack(frame_seq_no)
+                return True
+
+        # Case 2: Frame with sequence number greater than expected
+        elif frame_seq_no > self.expected_seq_no:
+            print(f"Frame {frame_seq_no} received (out of order).")
+
+            # Check if frame is already in buffer; frames beyond the receive window are dropped
+            buffer_index = frame_seq_no - self.expected_seq_no
+            if buffer_index >= self.window_size:
+                print(f"Frame {frame_seq_no} discarded (outside receive window).")
+            elif self.buffer[buffer_index] is None:
+                if self.error_checker.validate(payload, received_fcs):  # No errors
+                    metrics.FRAMES_ACCEPTED.inc()
+                    print(f"Frame {frame_seq_no} stored in buffer.")
+                    self.buffer[buffer_index] = data_frame
+                else:  # Frame has errors
+                    print(f"Frame {frame_seq_no} rejected (FCS error).")
+                    metrics.FRAMES_REJECTED.inc()
+                    self.send_nack(frame_seq_no)
+                    return True
+
+        # Case 3: Frame with sequence number less than expected
+        else:
+            print(f"Duplicate frame {frame_seq_no} received.")
+            # The sender is retransmitting, so it has not seen our latest SACK
+            self.send_sack(immediate=True)
+            return True
+
+        # A gap in the buffer is reported at once so the sender can resend the missing frames
+        self.send_sack(immediate=any(frame is not None for frame in self.buffer))
+        return True
 
     def flush_buffer(self, output):
         """Writes the in-sequence frames from the buffer to the output file."""
         while self.buffer[0] is not None:  # Start from the beginning of the buffer
-            frame = self.buffer.pop(0)  # Remove the first frame in the buffer
-            self.buffer.append(None)  # Append an empty slot at the end
-            payload = frame.payload
-            output.write(f"{self.expected_seq_no}. {payload}\n")
+            frame = self.buffer.popleft()  # Remove the first frame and open a slot at the end
+            output.write(self.expected_seq_no, frame.payload)
+            metrics.DELIVERED_BYTES.inc(len(frame.payload))
             print(f"Flushed frame {self.expected_seq_no} to output.")
             self.expected_seq_no += 1  # Increment expected sequence number
 
-    def send_ack(self, seq_no):
-        """Sends an ACK for the given sequence number."""
-        ack_frame = ACK(source_address=self.address, destination_address=self.address, frame_seq_no=seq_no)
-        self.connection.sendall(ack_frame.to_bytes())
-        print(f"ACK for frame {seq_no} sent.")
+    def send_sack(self, immediate=True):
+        """
+        Sends a SACK: cumulative ACK for expected_seq_no - 1, bit i set if buffer[i] holds a frame.
+        With delayed ACKs, a SACK that is not immediate may be held back and replaced by a later one.
+        """
+        received = (self.expected_seq_no + index for index, frame in enumerate(self.buffer) if frame is not None)
+        sack_frame = SACK.from_received(self.address, self.address, self.expected_seq_no - 1, received,
+                                        self.window_size)
+        if self.delayed_ack is None:
+            self.send_ack_frame(sack_frame)
+            print(f"SACK for frame {self.expected_seq_no - 1} sent.")
+            return
+        self.delayed_ack.hold(sack_frame, self.send_ack_frame)
+        if immediate:
+            self.delayed_ack.flush()
+
+    def send_ack_frame(self, ack_frame):
+        data = ack_frame.to_bytes()
+        self.stream.send_frame(data)
+        (metrics.NACKS_SENT if ack_frame.nack else metrics.ACKS_SENT).inc()
+        metrics.ACK_WIRE_BYTES.inc(len(data))
 
     def send_nack(self, seq_no):
         """Sends a NACK for the given sequence number."""
-        nack_frame = ACK(source_address=self.address, destination_address=self.address, frame_seq_no=-seq_no-1)
-        self.connection.sendall(nack_frame.to_bytes())
+        nack_frame = ACK(source_address=self.address, destination_address=self.address, frame_seq_no=seq_no, nack=True)
+        if self.delayed_ack is not None:
+            self.delayed_ack.flush()  # Keep the held SACK ahead of the NAK
+        self.send_ack_frame(nack_frame)
         print(f"NACK for frame {seq_no} sent.")
-
-    def validate_output(self):
-        """Validates the received data against the original input file."""
-        print("Validation begins...")
-        with open(self.input_file, 'r') as input_file, open(self.output_file, 'r+') as output_file:
-            input_data = input_file.read().strip()
-            output_lines = output_file.readlines()
-
-            output_file.seek(0)
-
-            for index, line in enumerate(output_lines):
-                start = index * self.payload_size // 8
-                end = (index + 1) * self.payload_size // 8
-                if end > len(input_data):
-                    break
-
-                expected_payload = input_data[start:end]
-                line_payload = line.strip().split('. ')[1]
-
-                if line_payload != expected_payload:
-                    output_file.write(f"{line.strip()} (incorrect)\n")
-                else:
-                    output_file.write(line)
-
-            output_file.truncate()
-
-        print("Validation complete.")
@@ -1,47 +1,55 @@
 import sys
 import socket
+import asyncio
+import async_arq
+import striping
+import metrics
+import stop_and_wait
+import go_back_n
+import selective_repeat
 from stop_and_wait import Sender as StopAndWaitSender
 from go_back_n import Sender as GoBackNSender
 from selective_repeat import Sender as SelectiveRepeatSender
+from congestion import WindowController
+from eventlog import EventLog, event_log_path
+from options import HOST, PORT, PROTOCOL_NAMES, TECHNIQUE_NAMES, parse_options
+from transport import run_loopback
+
+RECEIVERS = {
+    'StopAndWait': stop_and_wait.Receiver,
+    'GoBackN': go_back_n.Receiver,
+    'SelectiveRepeat': selective_repeat.Receiver
+}
 
 def main():
-    if len(sys.argv) != 5:
-        print("Usage: python sender.py <protocol> <file_path> <packet_size> <technique>")
+    args, options = parse_options(sys.argv[1:])
+    if len(args) != 4:
+        print("Usage: python sender.py <protocol> <file_path> <packet_size> <technique> [--async] [--window=N] [--aimd] "
+              "[--binary-log] [--host=HOST] [--port=PORT] [--stripes=N] "
+              "[--metrics[=json|prometheus]] [--metrics-file=PATH] [--metrics-interval=S] [--loopback]")
         print("Protocol: 'StopAndWait' or '1', 'GoBackN' or '2', or 'SelectiveRepeat' or '3'")
         print("Technique: 'CRC' or '1', 'Checksum' or '2'")
         sys.exit(1)
 
-    protocol_input = sys.argv[1]
-    file_path = sys.argv[2]
-    packet_size = int(sys.argv[3])
-    technique_input = sys.argv[4]
-
-    protocol_map = {
-        '1': 'StopAndWait',
-        '2': 'GoBackN',
-        '3': 'SelectiveRepeat',
-        'StopAndWait': 'StopAndWait',
-        'GoBackN': 'GoBackN',
-        'SelectiveRepeat': 'SelectiveRepeat'
-    }
-
-    technique_map = {
-        '1': 'CRC',
-        '2': 'Checksum',
-        'CRC': 'CRC',
-        'Checksum': 'Checksum'
-    }
+    protocol_input = args[0]
+    file_path = args[1]
+    packet_size = int(args[2])
+    technique_input = args[3]
 
-    protocol = protocol_map.get(protocol_input)
+    protocol = PROTOCOL_NAMES.get(protocol_input)
     if not protocol:
         print("Error: Invalid protocol. Choose 'StopAndWait', 'GoBackN', 'SelectiveRepeat', '1', '2', or '3'.")
         sys.exit(1)
 
-    technique = technique_map.get(technique_input)
+    technique = TECHNIQUE_NAMES.get(technique_input)
     if not technique:
         print("Error: Technique must be either 'CRC', 'Checksum', '1', or '2'.")
         sys.exit(1)
 
+    if options.get('async') and 'stripes' in options:
+        print("Error: --stripes is not supported with --async; every stripe runs a threaded sender in its own process.")
+        sys.exit(1)
+
     source_address = b'\x01\x02\x03\x04\x05\x06'
     destination_address = b'\x06\x05\x04\x03\x02\x01'
 
@@ -53,20 +61,74 @@ def main():
 
     SenderClass = protocols[protocol]
 
-    server_address = ('localhost', 12345)
+    # Pipelined senders can grow and shrink their window (up to --window) with --aimd
+    window_sizes = {
+        'GoBackN': go_back_n.WINDOW_SIZE,
+        'SelectiveRepeat': selective_repeat.WINDOW_SIZE
+    }
+    window_options = {}
+    if protocol in window_sizes:
+        window_size = int(options['window']) if 'window' in options else window_sizes[protocol]
+        window_options['window_size'] = window_size
+        if options.get('aimd'):
+            window_options['window_controller'] = WindowController(max_window=window_size)
+
+    server_address = (options.get('host', HOST), int(options.get('port', PORT)))
+
+    # --metrics exports the frame, byte, latency and window metrics when the transfer ends
+    exporter = metrics.exporter_from_options(options, protocol)
+    try:
+        send(protocol, file_path, packet_size, technique, source_address, destination_address, server_address,
+             SenderClass, window_options, options)
+    finally:
+        if exporter is not None:
+            exporter.close()
+
+def send(protocol, file_path, packet_size, technique, source_address, destination_address, server_address,
+         SenderClass, window_options, options):
+    # Striped mode sends contiguous ranges of the file over several connections at once
+    if 'stripes' in options:
+        striping.send_striped(protocol, server_address, file_path, packet_size, technique,
+                              source_address, destination_address, int(options['stripes']),
+                              window_size=window_options.get('window_size'), aimd=bool(options.get('aimd')),
+                              binary_log=bool(options.get('binary_log')))
+        return
+
+    # Events go to log.events as text by default; --binary-log writes fixed-size records instead
+    if options.get('binary_log'):
+        window_options['event_log'] = EventLog(event_log_path("log.txt"), binary=True)
+
+    if options.get('async'):
+        asyncio.run(async_arq.send(protocol, file_path, packet_size, technique,
+                                   source_address, destination_address, server_address, **window_options))
+        return
+
+    def make_sender(connection):
+        return SenderClass(
+            connection=connection,
+            input_file=file_path,
+            source=source_address,
+            destination=destination_address,
+            checker=technique,
+            bytes=packet_size,
+            **window_options
+        )
+
+    # --loopback runs the receiver in this process too, passing frames through memory instead of TCP
+    if options.get('loopback'):
+        receiver_options = {}
+        if protocol == 'SelectiveRepeat':
+            receiver_options['window_size'] = window_options['window_size']
+        run_loopback(make_sender, lambda connection: RECEIVERS[protocol](
+            connection, technique, destination_address, input_file=file_path, **receiver_options))
+        return
+
     connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
 
     connection.connect(server_address)
     print(f"Connected to receiver at {server_address}")
 
-    sender = SenderClass(
-        connection=connection,
-        input_file=file_path,
-        source=source_address,
-        destination=destination_address,
-        checker=technique,
-        bytes=packet_size
-    )
+    sender = make_sender(connection)
 
     sender.send_data()
 
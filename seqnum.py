@@ -0,0 +1,18 @@
+SEQ_BITS = 32
+SEQ_MODULUS = 1 << SEQ_BITS
+HALF_SEQ_SPACE = SEQ_MODULUS // 2
+
+
+def seq_wrap(seq_no):
+    """Sequence number as carried in a frame header."""
+    return seq_no % SEQ_MODULUS
+
+
+def seq_diff(a, b):
+    """Signed distance a - b in the circular sequence space, in [-2**31, 2**31)."""
+    return (a - b + HALF_SEQ_SPACE) % SEQ_MODULUS - HALF_SEQ_SPACE
+
+
+def seq_unwrap(wire_seq_no, reference):
+    """Absolute sequence number closest to reference whose header value is wire_seq_no."""
+    return reference + seq_diff(wire_seq_no, reference)
@@ -0,0 +1,78 @@
+import itertools
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from options import HOST, PORT
+
+MAX_CONNECTIONS = 64
+
+
+def session_output_file(output_file, session_id):
+    """output.bin -> output_<session_id>.bin, so concurrent sessions never share a file."""
+    root, extension = os.path.splitext(output_file)
+    return f"{root}_{session_id}{extension}"
+
+
+class ReceiverServer:
+    """
+    Serves many senders at once: every accepted connection becomes a session with its own
+    Receiver (protocol state) and output file, run on a worker pool. No more than max_connections
+    sessions run at a time; further senders wait in the listen backlog until a session ends.
+
+    make_receiver(connection, output_file, **options) builds the Receiver for one session, and
+    session_done(), if given, is called after every session.
+    """
+
+    def __init__(self, make_receiver, server_address=(HOST, PORT), max_connections=MAX_CONNECTIONS,
+                 output_file="output.bin", session_done=None):
+        self.make_receiver = make_receiver
+        self.session_done = session_done
+        self.server_address = server_address
+        self.max_connections = max_connections
+        self.output_file = output_file
+        self.slots = threading.BoundedSemaphore(max_connections)
+        self.session_ids = itertools.count(1)
+        self.listener = None
+        self.sessions = 0
+        self.lock = threading.Lock()
+
+    def serve_forever(self):
+        self.listener = socket.create_server(self.server_address, backlog=max(self.max_connections, 128))
+        print(f"Receiver listening on {self.server_address} for up to {self.max_connections} concurrent senders.")
+        with ThreadPoolExecutor(max_workers=self.max_connections, thread_name_prefix='session') as pool:
+            while True:
+                self.slots.acquire()
+                try:
+                    connection, client_address = self.listener.accept()
+                except OSError:
+                    self.slots.release()
+                    break  # Listener closed by stop()
+                pool.submit(self.run_session, connection, client_address, next(self.session_ids))
+
+    def run_session(self, connection, client_address, session_id):
+        output_file = session_output_file(self.output_file, session_id)
+        with self.lock:
+            self.sessions += 1
+            active = self.sessions
+        print(f"Session {session_id}: connection established with {client_address} ({active} active), output in {output_file}")
+        try:
+            self.handle(connection, output_file)
+        except Exception as e:
+            print(f"Session {session_id}: error: {e}")
+        finally:
+            connection.close()
+            with self.lock:
+                self.sessions -= 1
+            self.slots.release()
+            print(f"Session {session_id}: connection closed with {client_address}")
+            if self.session_done is not None:
+                self.session_done()
+
+    def handle(self, connection, output_file):
+        self.make_receiver(connection, output_file).receive_data()
+
+    def stop(self):
+        """Stops accepting; sessions already running are finished before serve_forever returns."""
+        if self.listener is not None:
+            self.listener.close()
@@ -0,0 +1,338 @@
+import contextlib
+import heapq
+import itertools
+import os
+import random
+import sys
+import time
+import stop_and_wait
+import go_back_n
+import selective_repeat
+import metrics
+from async_arq import AsyncStopAndWaitSender, AsyncGoBackNSender, AsyncSelectiveRepeatSender
+from channel import Channel, FRAME_LOSS_PROBABILITY, ERROR_PROBABILITY
+from clock import Clock
+from dataframe import DataFrame, HEADER, FCS_SIZE
+from eventlog import EventLog
+from frame_source import FrameSource
+from output_sink import BinarySink
+from transport import Transport
+from congestion import WindowController
+from options import PROTOCOL_NAMES, TECHNIQUE_NAMES, parse_options
+
+PROPAGATION_DELAY = 0.01  # one-way delay in seconds
+BANDWIDTH = 10_000_000  # link rate in bits per second
+
+SOURCE_ADDRESS = b'\x01\x02\x03\x04\x05\x06'
+DESTINATION_ADDRESS = b'\x06\x05\x04\x03\x02\x01'
+
+
+class Timer:
+    """Handle of a scheduled callback, like asyncio's TimerHandle."""
+
+    def __init__(self, callback, args):
+        self.callback = callback
+        self.args = args
+
+    def cancel(self):
+        self.callback = None
+
+
+class EventLoop(Clock):
+    """Virtual clock and a heap of pending events ordered by time, then by scheduling order."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.events = []
+        self.counter = itertools.count()
+        self.stopped = False
+
+    def time(self):
+        return self.now
+
+    def call_at(self, when, callback, *args):
+        timer = Timer(callback, args)
+        heapq.heappush(self.events, (when, next(self.counter), timer))
+        return timer
+
+    def call_later(self, delay, callback, *args):
+        return self.call_at(self.now + delay, callback, *args)
+
+    def stop(self):
+        self.stopped = True
+
+    def run(self):
+        events = self.events
+        while events and not self.stopped:
+            when, _, timer = heapq.heappop(events)
+            if timer.callback is None:
+                continue
+            self.now = when
+            timer.callback(*timer.args)
+
+
+class VirtualLink(Transport):
+    """
+    One direction of a point-to-point link: frames are serialized one after another at bandwidth,
+    and deliver(data) is called propagation_delay after the last bit has left.
+    """
+
+    def __init__(self, loop, bandwidth, propagation_delay, deliver):
+        self.loop = loop
+        self.bandwidth = bandwidth
+        self.propagation_delay = propagation_delay
+        self.deliver = deliver
+        self.free_at = 0.0
+
+    def send_frame(self, data):
+        self.free_at = max(self.loop.time(), self.free_at) + len(data) * 8 / self.bandwidth
+        self.loop.call_at(self.free_at + self.propagation_delay, self.deliver, data)
+
+    def recv_frame(self):
+        raise RuntimeError("Frames are delivered by the event loop.")
+
+    def close(self):
+        pass
+
+
+class BlankFrameSource:
+    """Stands in for an input file of num_frames frames whose payloads are all zero bytes."""
+
+    def __init__(self, num_frames, payload_size):
+        self.num_frames = num_frames
+        self.payload = bytes(payload_size)
+
+    def __len__(self):
+        return self.num_frames
+
+    def read(self, index):
+        return self.payload if 0 <= index < self.num_frames else None
+
+    def close(self):
+        pass
+
+
+class ARQSimulation:
+    """
+    Runs one ARQ protocol in virtual time over a link with a fixed rate and propagation delay.
+
+    The protocol rules are those of the real senders and receivers: the event-driven sender of
+    async_arq, with its timers on an EventLoop, and the protocol module's Receiver, connected by a
+    VirtualLink in each direction. Frames are lost or corrupted by the Channel on their way to the
+    receiver, after they have taken their time on the link. With input_file the frames carry the
+    file's payloads; with num_frames they carry zero bytes.
+    """
+
+    protocol = None
+    sender_class = None
+    receiver_class = None
+    default_window_size = 1
+
+    def __init__(self, num_frames=None, input_file=None, payload_size=46, checker='CRC', window_size=None,
+                 timeout=None, propagation_delay=PROPAGATION_DELAY, bandwidth=BANDWIDTH,
+                 frame_loss_prob=FRAME_LOSS_PROBABILITY, error_prob=ERROR_PROBABILITY, seed=None,
+                 aimd=False):
+        if (num_frames is None) == (input_file is None):
+            raise ValueError("Exactly one of num_frames and input_file must be given.")
+
+        self.loop = EventLoop()
+        rng = random.Random(seed)
+        self.channel = Channel(frame_loss_prob, error_prob, rng=rng, verbose=False)
+        if input_file is not None:
+            frame_source = FrameSource(input_file, payload_size)
+        else:
+            frame_source = BlankFrameSource(num_frames, payload_size)
+        self.num_frames = len(frame_source)
+        self.payload_size = payload_size
+        self.window_size = window_size or self.default_window_size
+        self.window_controller = None
+        if aimd:
+            # The configured window becomes the ceiling the controller may grow to
+            self.window_controller = WindowController(max_window=self.window_size, clock=self.loop.time)
+        self.frame_time = (HEADER.size + payload_size + FCS_SIZE) * 8 / bandwidth
+        self.completed_at = None
+
+        self.receiver = self.make_receiver(VirtualLink(self.loop, bandwidth, propagation_delay, self.ack_arrived),
+                                           checker)
+        sender_options = {'window_controller': self.window_controller}
+        if timeout is not None:
+            sender_options['timeout'] = timeout
+        self.sender = self.make_sender(
+            VirtualLink(self.loop, bandwidth, propagation_delay, self.frame_arrived),
+            frame_source=frame_source,
+            source=SOURCE_ADDRESS,
+            destination=DESTINATION_ADDRESS,
+            checker=checker,
+            bytes=payload_size,
+            event_log=EventLog(os.devnull, clock=self.loop.time),
+            # Loss and errors are drawn on the link, so the sender's own channel is a perfect one
+            channel=Channel(0.0, 0.0, rng=rng, verbose=False),
+            **sender_options
+        )
+        self.output = None
+
+        self.lost = 0
+        self.corrupted = 0
+        self.undetected = 0
+        self.counts = {}
+
+    def make_sender(self, link, **options):
+        return self.sender_class(link, None, window_size=self.window_size, **options)
+
+    def make_receiver(self, link, checker):
+        return self.receiver_class(connection=link, checker=checker, address=DESTINATION_ADDRESS)
+
+    def run(self):
+        counters = {
+            'sent': metrics.FRAMES_SENT,
+            'resent': metrics.FRAMES_RESENT,
+            'timeouts': metrics.TIMEOUTS,
+            'acks': metrics.ACKS_RECEIVED,
+            'nacks': metrics.NACKS_RECEIVED
+        }
+        start = {name: counter.value for name, counter in counters.items()}
+        # The sender and receiver narrate every frame, as they do on a real connection
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), \
+                BinarySink(os.devnull) as self.output:
+            try:
+                self.sender.start(self.loop, self.complete)
+                self.loop.run()
+            finally:
+                self.sender.close()
+        self.counts = {name: counter.value - start[name] for name, counter in counters.items()}
+        return self.results()
+
+    def results(self):
+        elapsed = self.completed_at if self.completed_at is not None else self.loop.now
+        delivered = self.receiver.frames_delivered
+        results = {
+            'protocol': self.protocol,
+            'frames': self.num_frames,
+            'window_size': self.sender.window_size,
+            'simulated_time': elapsed,
+            'transmissions': self.counts['sent'] + self.counts['resent'],
+            'retransmissions': self.counts['resent'],
+            'lost': self.lost,
+            'corrupted': self.corrupted,
+            'undetected_errors': self.undetected,
+            'delivered': delivered,
+            'acks': self.counts['acks'],
+            'nacks': self.counts['nacks'],
+            'timeouts': self.counts['timeouts'],
+            'utilization': self.num_frames * self.frame_time / elapsed if elapsed else 0.0,
+            'goodput': delivered * self.payload_size * 8 / elapsed if elapsed else 0.0,
+        }
+        if self.window_controller is not None:
+            results['window_changes'] = self.window_controller.changes
+            results['average_window'] = self.average_window(elapsed)
+        return results
+
+    def average_window(self, elapsed):
+        """Time-weighted mean of the controller's window size over the run."""
+        history = list(self.window_controller.history)
+        if not elapsed:
+            return float(history[-1][1])
+        total = 0.0
+        for (when, window_size), (next_when, _) in zip(history, history[1:] + [(elapsed, None)]):
+            total += window_size * (min(next_when, elapsed) - when)
+        return total / (elapsed - history[0][0])
+
+    def frame_arrived(self, data):
+        """A data frame reaches the far end of the link, unless the channel drops it on the way."""
+        dataframe = DataFrame.from_bytes(data)
+        transmitted = self.channel.transmit(dataframe)
+        if transmitted is None:
+            self.lost += 1
+            return
+        if transmitted is not dataframe:
+            self.corrupted += 1
+            if self.receiver.error_checker.validate(transmitted.payload, transmitted.fcs):
+                self.undetected += 1
+        self.receiver.handle_frame(transmitted, self.output)
+
+    def ack_arrived(self, data):
+        self.sender.ack_received(data)
+
+    def complete(self):
+        self.completed_at = self.loop.now
+        self.loop.stop()
+
+
+class StopAndWaitSimulation(ARQSimulation):
+    protocol = 'StopAndWait'
+    sender_class = AsyncStopAndWaitSender
+    receiver_class = stop_and_wait.Receiver
+
+    def make_sender(self, link, **options):
+        return self.sender_class(link, None, **options)
+
+
+class GoBackNSimulation(ARQSimulation):
+    protocol = 'GoBackN'
+    sender_class = AsyncGoBackNSender
+    receiver_class = go_back_n.Receiver
+    default_window_size = go_back_n.WINDOW_SIZE
+
+
+class SelectiveRepeatSimulation(ARQSimulation):
+    protocol = 'SelectiveRepeat'
+    sender_class = AsyncSelectiveRepeatSender
+    receiver_class = selective_repeat.Receiver
+    default_window_size = selective_repeat.WINDOW_SIZE
+
+    def make_receiver(self, link, checker):
+        # The receive window stays the configured one while AIMD moves the send window below it
+        return self.receiver_class(connection=link, checker=checker, address=DESTINATION_ADDRESS,
+                                   window_size=self.window_size)
+
+
+SIMULATIONS = {
+    'StopAndWait': StopAndWaitSimulation,
+    'GoBackN': GoBackNSimulation,
+    'SelectiveRepeat': SelectiveRepeatSimulation
+}
+
+
+def main():
+    args, options = parse_options(sys.argv[1:])
+    if len(args) != 4:
+        print("Usage: python simulation.py <protocol> <frames|file_path> <packet_size> <technique> "
+              "[--window=N] [--timeout=S] [--loss=P] [--error=P] [--propagation=S] [--bandwidth=BPS] [--seed=N] [--aimd]")
+        print("Protocol: 'StopAndWait' or '1', 'GoBackN' or '2', or 'SelectiveRepeat' or '3'")
+        print("Technique: 'CRC' or '1', 'Checksum' or '2'")
+        sys.exit(1)
+
+    protocol = PROTOCOL_NAMES.get(args[0])
+    if not protocol:
+        print("Error: Invalid protocol. Choose 'StopAndWait', 'GoBackN', 'SelectiveRepeat', '1', '2', or '3'.")
+        sys.exit(1)
+
+    technique = TECHNIQUE_NAMES.get(args[3])
+    if not technique:
+        print("Error: Technique must be either 'CRC', 'Checksum', '1', or '2'.")
+        sys.exit(1)
+
+    source = {'num_frames': int(args[1])} if args[1].isdigit() else {'input_file': args[1]}
+    simulation = SIMULATIONS[protocol](
+        payload_size=int(args[2]),
+        checker=technique,
+        window_size=int(options['window']) if 'window' in options else None,
+        timeout=float(options['timeout']) if 'timeout' in options else None,
+        propagation_delay=float(options.get('propagation', PROPAGATION_DELAY)),
+        bandwidth=float(options.get('bandwidth', BANDWIDTH)),
+        frame_loss_prob=float(options.get('loss', FRAME_LOSS_PROBABILITY)),
+        error_prob=float(options.get('error', ERROR_PROBABILITY)),
+        seed=int(options['seed']) if 'seed' in options else None,
+        aimd=bool(options.get('aimd')),
+        **source
+    )
+
+    start_time = time.time()
+    results = simulation.run()
+    for name, value in results.items():
+        print(f"{name}: {value:.6g}" if isinstance(value, float) else f"{name}: {value}")
+    print(f"Wall-clock time: {time.time() - start_time:.2f} seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,44 +4,51 @@ import socket
 from channel import Channel
 from dataframe import DataFrame
 from ackframe import ACK
+from framing import frame_stream
+from frame_source import FrameSource
+from output_sink import BINARY, open_sink
+from validator import validate
+import eventlog
+import metrics
+from eventlog import EventLog, event_log_path, write_legacy_log
 from error_checker import CRC, Checksum
+from rtt import RTTEstimator
 
 TIMEOUT=4
 
 class Sender:
-    def __init__(self, connection, input_file, source, destination, checker, bytes, log_file="log.txt", timeout=TIMEOUT):
+    def __init__(self, connection, input_file, source, destination, checker, bytes, log_file="log.txt", timeout=TIMEOUT, rtt_estimator=None, frame_source=None, event_log=None, channel=None):
         self.connection = connection
+        self.stream = frame_stream(connection)
         self.input_file = input_file
+        self.frame_source = frame_source if frame_source is not None else FrameSource(input_file, bytes)
         self.source_address = source
         self.destination_address = destination
         self.error_checker = checker
-        self.channel = Channel()
+        self.channel = channel if channel is not None else Channel()
         self.index = 0
         self.payload_size = bytes
         self.log_file = log_file
         self.timeout=timeout
-        self.lock = threading.Lock()
-        self.ack_received = False
+        self.rtt = rtt_estimator if rtt_estimator is not None else RTTEstimator(initial_rto=timeout)
+        self.event_log = event_log
+        self.ack_received = threading.Event()
+        self.ack_thread = None
         self.stop_sending = False
 
     def makeDataFrame(self):
-        start_char_index = self.index * self.payload_size * 8
-        num_chars_to_read = self.payload_size * 8
-
-        with open(self.input_file, 'r') as input:
-            input.seek(start_char_index)
-            data = input.read(num_chars_to_read)
-
-            if not data:
-                return None
+        data = self.frame_source.read(self.index)
+        if data is None:
+            return None
 
         dataframe = DataFrame(self.source_address, self.destination_address, self.payload_size, self.index, data, self.error_checker)
         return dataframe
 
     def send_data(self):
-        with open(self.log_file, 'w'):
-            pass
+        if self.event_log is None:
+            self.event_log = EventLog(event_log_path(self.log_file))
         start_time=time.time()
+        metrics.WINDOW_SIZE.set(1)
         while not self.stop_sending:
             dataframe = self.makeDataFrame()
 
@@ -53,50 +60,66 @@ class Sender:
             first_attempt = True
             while not self.stop_sending:
                 transmitted_df = self.channel.transmit(dataframe)
+                self.rtt.frame_sent(self.index, retransmission=not first_attempt)
 
+                dataframe.first_time = first_attempt
                 if transmitted_df is None:
-                    time.sleep(2)
-                    if first_attempt:
-                        self.log(f"{self.index} sent")
-                        first_attempt = False
-                    else:
-                        self.log(f"{self.index} re-sent")
+                    metrics.frame_transmitted(dataframe)
+                    metrics.TIMEOUTS.inc()
+                    time.sleep(self.rtt.rto)
+                    self.rtt.backoff()
+                    self.event_log.record_transmission(self.index, retransmission=not first_attempt, lost=True)
+                    self.event_log.record(eventlog.TIMEOUT, self.index)
+                    first_attempt = False
                     print(f"Frame {self.index} lost during transmission. Re-sending after timeout.")
                 else:
                     data_to_send = transmitted_df.to_bytes()
-                    self.connection.sendall(data_to_send)
+                    self.stream.send_frame(data_to_send)
+                    metrics.frame_transmitted(dataframe, data_to_send)
+                    metrics.WINDOW_OCCUPANCY.set(1)
 
-                    if first_attempt:
-                        self.log(f"{self.index} sent")
-                        first_attempt = False
-                    else:
-                        self.log(f"{self.index} re-sent")
+                    self.event_log.record_transmission(self.index, retransmission=not first_attempt)
+                    first_attempt = False
 
                     print(f"Frame {self.index} sent. Waiting for ACK...")
 
-                    ack_thread = threading.Thread(target=self.wait_for_ack)
-                    ack_thread.start()
+                    # A listener still blocked from a timed-out attempt picks up this ACK as well
+                    if self.ack_thread is None or not self.ack_thread.is_alive():
+                        self.ack_thread = threading.Thread(target=self.wait_for_ack, daemon=True)
+                        self.ack_thread.start()
 
-                    ack_thread.join(timeout=self.timeout)
+                    self.ack_received.wait(timeout=self.rtt.rto)
 
-                    if self.ack_received:
+                    if self.ack_received.is_set():
+                        self.rtt.frame_acked(self.index)
+                        self.event_log.record(eventlog.ACK, self.index)
+                        metrics.ACKS_RECEIVED.inc()
+                        metrics.frame_delivered(dataframe)
+                        metrics.WINDOW_OCCUPANCY.set(0)
                         print(f"ACK received for Frame {self.index}. Proceeding to next frame.")
-                        self.ack_received = False
+                        self.ack_received.clear()
                         self.index += 1
                         break
                     else:
+                        self.rtt.backoff()
+                        self.event_log.record(eventlog.TIMEOUT, self.index)
+                        metrics.TIMEOUTS.inc()
                         print(f"Timeout waiting for ACK for Frame {self.index}. Re-sending...")
         end_time=time.time()
         total_time = end_time - start_time
         print(f"Total transmission time: {total_time:.2f} seconds")
+        print(f"Final RTO: {self.rtt.rto:.4f} seconds from {len(self.rtt.samples)} RTT samples")
         print("Closing connection after all frames are sent.")
+        self.frame_source.close()
+        self.event_log.close()
+        write_legacy_log(self.event_log.path, 'StopAndWait', self.log_file)
         self.connection.close()
 
     def wait_for_ack(self):
         try:
-            ack_data = self.connection.recv(1024)
+            ack_data = self.stream.recv_frame()
             if ack_data:
-                self.ack_received = True
+                self.ack_received.set()
         except socket.timeout:
             print(f"Timeout waiting for ACK for Frame {self.index}")
         except ConnectionAbortedError:
@@ -104,17 +127,15 @@ class Sender:
         except OSError as e:
             print(f"Error receiving ACK: {e}")
 
-    def log(self, message):
-        with self.lock:
-            with open(self.log_file, 'a') as log:
-                log.write(f"{message}\n")
-
 
 class Receiver:
-    def __init__(self, connection, checker, address, input_file='input.txt', output_file="output.txt"):
+    def __init__(self, connection, checker, address, input_file='input.txt', output_file="output.bin", first_frame=0, output_format=BINARY):
         self.connection = connection
+        self.stream = frame_stream(connection)
         self.input_file = input_file
         self.output_file = output_file
+        self.output_format = output_format  # BINARY payload bytes, or the TEXT debug format
+        self.first_frame = first_frame  # Index of the first frame in the input file, for a striped transfer
         if checker == 'CRC':
             self.error_checker = CRC()
         elif checker == 'Checksum':
@@ -122,71 +143,60 @@ class Receiver:
         self.index = 0
         self.address = address
 
+    @property
+    def frames_delivered(self):
+        """Frames written to the output so far, all of them in order."""
+        return self.index
+
     def receive_data(self):
-        with open(self.output_file, 'w') as output:
+        with open_sink(self.output_file, self.output_format) as output:
             while True:
                 try:
-                    data = self.connection.recv(1024)
+                    data = self.stream.recv_frame()
 
                     if not data:
                         print("Connection closed by client.")
                         self.connection.close()
                         break
 
-                    data_frame = DataFrame.from_bytes(data)
-
-                    if data_frame.destination_address != self.address:
-                        print(f"{self.index}. Destination address mismatch.")
+                    if not self.handle_frame(DataFrame.from_bytes(data), output):
                         self.connection.close()
                         break
 
-                    payload = data_frame.payload
-                    received_fcs = data_frame.fcs
-                    self.payload_size = len(payload) * 8
-
-                    if self.error_checker.validate(payload, received_fcs):
-                        print(f"{self.index}. accepted")
-
-                        ack_frame = ACK(
-                            source_address=self.address,
-                            destination_address=data_frame.source_address,
-                            frame_seq_no=0
-                        )
-                        self.connection.sendall(ack_frame.to_bytes())
-
-                        output.write(f"{self.index}. {payload}\n")
-                        self.index += 1
-
-                    else:
-                        print(f"{self.index}. rejected")
-
                 except Exception as e:
                     self.connection.close()
                     break
 
-        self.validate_output()
-
-    def validate_output(self):
-        print("Validation begins...")
-        with open(self.input_file, 'r') as input_file, open(self.output_file, 'r+') as output_file:
-            input_data = input_file.read().strip()
-            output_lines = output_file.readlines()
-
-            output_file.seek(0)
-
-            for index, line in enumerate(output_lines):
-                start = index * self.payload_size // 8
-                end = (index + 1) * self.payload_size // 8
-                if end > len(input_data):
-                    break
-
-                expected_payload = input_data[start:end]
-
-                line_payload = line.strip().split('. ')[1]
-
-                if line_payload != expected_payload:
-                    output_file.write(f"{line.strip()} (incorrect)\n")
-                else:
-                    output_file.write(line)
-
-            output_file.truncate()
+        validate(self.input_file, self.output_file, output.frame_size, self.first_frame, self.output_format)
+
+    def handle_frame(self, data_frame, output):
+        """Processes one received frame; returns False when the connection should be dropped."""
+        if data_frame.destination_address != self.address:
+            print(f"{self.index}. Destination address mismatch.")
+            return False
+
+        payload = data_frame.payload
+        received_fcs = data_frame.fcs
+
+        if self.error_checker.validate(payload, received_fcs):
+            print(f"{self.index}. accepted")
+            metrics.FRAMES_ACCEPTED.inc()
+
+            ack_frame = ACK(
+                source_address=self.address,
+                destination_address=data_frame.source_address,
+                frame_seq_no=0
+            )
+            ack_data = ack_frame.to_bytes()
+            self.stream.send_frame(ack_data)
+            metrics.ACKS_SENT.inc()
+            metrics.ACK_WIRE_BYTES.inc(len(ack_data))
+            metrics.DELIVERED_BYTES.inc(len(payload))
+
+            output.write(self.index, payload)
+            self.index += 1
+
+        else:
+            print(f"{self.index}. rejected")
+            metrics.FRAMES_REJECTED.inc()
+        return True
@@ -0,0 +1,238 @@
+import os
+import random
+import shutil
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import stop_and_wait
+import go_back_n
+import selective_repeat
+import metrics
+from congestion import WindowController
+from eventlog import EventLog, event_log_path
+from framing import FrameStream
+from frame_source import FrameSource
+from output_sink import TEXT
+from server import ReceiverServer, session_output_file
+
+STRIPE_MAGIC = b'STRP'
+STRIPE_TIMEOUT = 600  # Seconds the other stripes of a transfer get to finish after the first one has
+STRIPE_HEADER = struct.Struct('!4sIHHQQ')  # magic, transfer id, stripe index, stripe count, first frame, frame count
+
+SENDERS = {
+    'StopAndWait': stop_and_wait.Sender,
+    'GoBackN': go_back_n.Sender,
+    'SelectiveRepeat': selective_repeat.Sender
+}
+
+
+class StripeHeader:
+    """First frame on every connection of a striped transfer: which range of the file follows."""
+
+    def __init__(self, transfer_id, stripe_index, stripe_count, first_frame, num_frames):
+        self.transfer_id = transfer_id
+        self.stripe_index = stripe_index
+        self.stripe_count = stripe_count
+        self.first_frame = first_frame
+        self.num_frames = num_frames
+
+    def to_bytes(self):
+        return STRIPE_HEADER.pack(STRIPE_MAGIC, self.transfer_id, self.stripe_index, self.stripe_count,
+                                  self.first_frame, self.num_frames)
+
+    @staticmethod
+    def from_bytes(data):
+        if data is None or len(data) != STRIPE_HEADER.size or data[:len(STRIPE_MAGIC)] != STRIPE_MAGIC:
+            raise ValueError("Connection did not start with a stripe header.")
+        _, transfer_id, stripe_index, stripe_count, first_frame, num_frames = STRIPE_HEADER.unpack(data)
+        return StripeHeader(transfer_id, stripe_index, stripe_count, first_frame, num_frames)
+
+
+def stripe_ranges(num_frames, stripes):
+    """Splits num_frames into at most stripes contiguous (first_frame, num_frames) ranges of near-equal size."""
+    stripes = max(1, min(stripes, num_frames))
+    size, extra = divmod(num_frames, stripes)
+    ranges = []
+    first_frame = 0
+    for index in range(stripes):
+        count = size + (index < extra)
+        ranges.append((first_frame, count))
+        first_frame += count
+    return ranges
+
+
+def send_stripe(protocol, server_address, input_file, payload_size, checker, source, destination, header,
+                window_size=None, aimd=False, binary_log=False):
+    """
+    Runs one stripe in its own process: connect, announce the range, then the usual ARQ transfer.
+    Returns the stripe index and the metrics of this stripe alone.
+    """
+    metrics.REGISTRY.reset()  # A worker process may already have run another stripe
+    connection = socket.create_connection(server_address)
+    stream = FrameStream(connection)
+    stream.send_frame(header.to_bytes())
+
+    sender_options = {}
+    if window_size is not None:
+        sender_options['window_size'] = window_size
+        if aimd:
+            sender_options['window_controller'] = WindowController(max_window=window_size)
+    log_file = f"log_{header.stripe_index}.txt"
+    if binary_log:
+        sender_options['event_log'] = EventLog(event_log_path(log_file), binary=True)
+    sender = SENDERS[protocol](
+        connection=stream,
+        input_file=input_file,
+        source=source,
+        destination=destination,
+        checker=checker,
+        bytes=payload_size,
+        log_file=log_file,
+        frame_source=FrameSource(input_file, payload_size, header.first_frame, header.num_frames),
+        **sender_options
+    )
+    sender.send_data()
+    stream.close()
+    return header.stripe_index, metrics.REGISTRY.snapshot()
+
+
+def send_striped(protocol, server_address, input_file, payload_size, checker, source, destination, stripes,
+                 window_size=None, aimd=False, binary_log=False):
+    """
+    Splits the input into contiguous frame ranges and sends them concurrently, one connection and
+    one worker process per range. Every stripe logs to its own log_<stripe>.txt, and its metrics
+    are added to this process's registry.
+    """
+    with FrameSource(input_file, payload_size) as frame_source:
+        num_frames = len(frame_source)
+    ranges = stripe_ranges(num_frames, stripes)
+    transfer_id = random.getrandbits(32)
+    print(f"Transfer {transfer_id}: {num_frames} frames in {len(ranges)} stripes to {server_address}")
+
+    start_time = time.time()
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        futures = [
+            pool.submit(send_stripe, protocol, server_address, input_file, payload_size, checker, source, destination,
+                        StripeHeader(transfer_id, index, len(ranges), first_frame, count), window_size, aimd,
+                        binary_log)
+            for index, (first_frame, count) in enumerate(ranges)
+        ]
+        for future in futures:
+            stripe_index, stripe_metrics = future.result()
+            metrics.REGISTRY.merge(stripe_metrics)
+            print(f"Stripe {stripe_index} complete.")
+    print(f"Total striped transmission time: {time.time() - start_time:.2f} seconds")
+
+
+class StripedTransfer:
+    """The stripes of one transfer that have finished so far, and the timer that gives up on the rest."""
+
+    def __init__(self, timer):
+        self.stripes = {}  # stripe index -> (header, stripe output file)
+        self.failed = False  # Set once a stripe arrives short; the transfer is then discarded
+        self.timer = timer
+
+
+class StripeAssembler:
+    """
+    Collects the per-stripe output files of each transfer and joins them once all have arrived.
+    A transfer with a short stripe is discarded, and so is one whose stripes have not all finished
+    within stripe_timeout seconds of the first.
+    """
+
+    def __init__(self, output_file="output.bin", stripe_timeout=STRIPE_TIMEOUT):
+        self.output_file = output_file
+        self.stripe_timeout = stripe_timeout
+        self.transfers = {}  # transfer id -> StripedTransfer
+        self.lock = threading.Lock()
+
+    def stripe_done(self, header, stripe_output_file, output_format, complete=True):
+        """
+        Records a finished stripe, complete when all header.num_frames frames were delivered.
+        Returns the reassembled output file once every stripe is in, otherwise None.
+        """
+        transfer_id = header.transfer_id
+        with self.lock:
+            transfer = self.transfers.get(transfer_id)
+            if transfer is None:
+                timer = threading.Timer(self.stripe_timeout, self.expire, (transfer_id,))
+                timer.daemon = True
+                transfer = self.transfers[transfer_id] = StripedTransfer(timer)
+                timer.start()
+            transfer.stripes[header.stripe_index] = (header, stripe_output_file)
+            if not complete:
+                transfer.failed = True
+            if len(transfer.stripes) < header.stripe_count:
+                return None
+            del self.transfers[transfer_id]
+        transfer.timer.cancel()
+        if transfer.failed:
+            self.discard(transfer_id, transfer, "a stripe was incomplete")
+            return None
+        return self.assemble(transfer_id, [transfer.stripes[index] for index in range(header.stripe_count)],
+                             output_format)
+
+    def expire(self, transfer_id):
+        """Drops a transfer whose remaining stripes never finished."""
+        with self.lock:
+            transfer = self.transfers.pop(transfer_id, None)
+        if transfer is not None:
+            self.discard(transfer_id, transfer, f"stripes still missing after {self.stripe_timeout} seconds")
+
+    def discard(self, transfer_id, transfer, reason):
+        for _, stripe_output_file in transfer.stripes.values():
+            if os.path.exists(stripe_output_file):
+                os.remove(stripe_output_file)
+        count = next(iter(transfer.stripes.values()))[0].stripe_count
+        print(f"Transfer {transfer_id}: failed, {reason} ({len(transfer.stripes)}/{count} stripes received); "
+              f"stripes discarded")
+
+    def assemble(self, transfer_id, stripes, output_format):
+        """
+        Writes the stripes in order. Binary stripes hold consecutive frames, so they are simply
+        concatenated; text lines are renumbered from stripe-local to file-wide frame numbers.
+        """
+        output_file = session_output_file(self.output_file, f"transfer_{transfer_id}")
+        if output_format != TEXT:
+            with open(output_file, 'wb') as output:
+                for header, stripe_output_file in stripes:
+                    with open(stripe_output_file, 'rb') as stripe_output:
+                        shutil.copyfileobj(stripe_output, output)
+                    os.remove(stripe_output_file)
+            print(f"Transfer {transfer_id}: {len(stripes)} stripes reassembled into {output_file}")
+            return output_file
+
+        with open(output_file, 'w') as output:
+            for header, stripe_output_file in stripes:
+                with open(stripe_output_file) as stripe_output:
+                    for line in stripe_output:
+                        seq_no, separator, rest = line.partition('. ')
+                        if not separator:
+                            continue
+                        output.write(f"{header.first_frame + int(seq_no)}. {rest}")
+                os.remove(stripe_output_file)
+        print(f"Transfer {transfer_id}: {len(stripes)} stripes reassembled into {output_file}")
+        return output_file
+
+
+class StripedReceiverServer(ReceiverServer):
+    """ReceiverServer whose sessions are stripes of striped transfers, reassembled as they complete."""
+
+    def __init__(self, *args, stripe_timeout=STRIPE_TIMEOUT, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.assembler = StripeAssembler(self.output_file, stripe_timeout)
+
+    def handle(self, connection, output_file):
+        stream = FrameStream(connection)
+        header = StripeHeader.from_bytes(stream.recv_frame())
+        print(f"Transfer {header.transfer_id}: stripe {header.stripe_index + 1}/{header.stripe_count}, "
+              f"frames {header.first_frame}-{header.first_frame + header.num_frames - 1}")
+        receiver = self.make_receiver(stream, output_file, first_frame=header.first_frame)
+        receiver.receive_data()
+        complete = receiver.frames_delivered == header.num_frames
+        if not complete:
+            print(f"Transfer {header.transfer_id}: stripe {header.stripe_index + 1}/{header.stripe_count} "
+                  f"delivered {receiver.frames_delivered} of {header.num_frames} frames")
+        self.assembler.stripe_done(header, output_file, receiver.output_format, complete)
@@ -0,0 +1,210 @@
+import csv
+import itertools
+import math
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from simulation import SIMULATIONS, PROPAGATION_DELAY, BANDWIDTH
+from dataframe import HEADER, FCS_SIZE
+from options import PROTOCOL_NAMES, parse_options
+
+PROTOCOLS = ('StopAndWait', 'GoBackN', 'SelectiveRepeat')
+LOSS_PROBABILITIES = (0.0, 0.01, 0.05, 0.1, 0.2, 0.3)
+ERROR_PROBABILITIES = (0.0, 0.01, 0.1)
+WINDOW_SIZES = (4, 16, 64)
+PACKET_SIZES = (46, 1024)
+RUNS = 10  # Seeded runs per point of the grid
+NUM_FRAMES = 2000
+SEED = 1
+TIMEOUT = 0.05  # A little over the default round trip, rather than the protocols' seconds-long default
+PERCENTILES = (5, 50, 95)
+RESULTS_FILE = 'sweep_results.csv'
+
+
+def sweep_points(protocols=PROTOCOLS, loss_probabilities=LOSS_PROBABILITIES, error_probabilities=ERROR_PROBABILITIES,
+                 window_sizes=WINDOW_SIZES, packet_sizes=PACKET_SIZES):
+    """Every combination of the axes; Stop-and-Wait has no window, so it appears once per remaining combination."""
+    for protocol, packet_size, loss, error in itertools.product(
+            protocols, packet_sizes, loss_probabilities, error_probabilities):
+        for window_size in ((1,) if protocol == 'StopAndWait' else window_sizes):
+            yield {
+                'protocol': protocol,
+                'packet_size': packet_size,
+                'window_size': window_size,
+                'loss': loss,
+                'error': error
+            }
+
+
+def efficiency_bound(protocol, window_size, loss, error, frame_time, propagation_delay):
+    """
+    Textbook link utilization of the protocol when every frame is independently lost or corrupted
+    with probability p and each failure is retransmitted as soon as it can be detected, with
+    a = propagation delay / frame time:
+
+        Stop-and-Wait     (1 - p) / (1 + 2a)
+        Go-Back-N         (1 - p) / (1 + 2ap)                    if W >= 1 + 2a
+                          W(1 - p) / ((1 + 2a)(1 - p + Wp))      otherwise
+        Selective Repeat  1 - p                                  if W >= 1 + 2a
+                          W(1 - p) / (1 + 2a)                    otherwise
+
+    ACK transmission time and timeouts are ignored, so the mean simulated utilization stays below
+    it: the simulated senders are the real ones, which find a lost frame only once a timer with the
+    backed-off RTO expires or, with Selective Repeat, from a SACK gap or NAK. The bound holds for
+    the expected number of failures; a single run that draws fewer can exceed it slightly.
+    """
+    p = 1 - (1 - loss) * (1 - error)
+    a = propagation_delay / frame_time
+    if protocol == 'StopAndWait':
+        return (1 - p) / (1 + 2 * a)
+    if protocol == 'GoBackN':
+        if window_size >= 1 + 2 * a:
+            return (1 - p) / (1 + 2 * a * p)
+        return window_size * (1 - p) / ((1 + 2 * a) * (1 - p + window_size * p))
+    if window_size >= 1 + 2 * a:
+        return 1 - p
+    return window_size * (1 - p) / (1 + 2 * a)
+
+
+def run_point(point, seed, num_frames=NUM_FRAMES, timeout=TIMEOUT, propagation_delay=PROPAGATION_DELAY,
+              bandwidth=BANDWIDTH):
+    """One seeded simulation of a grid point; runs in a worker process."""
+    simulation = SIMULATIONS[point['protocol']](
+        num_frames=num_frames,
+        payload_size=point['packet_size'],
+        window_size=point['window_size'],
+        timeout=timeout,
+        propagation_delay=propagation_delay,
+        bandwidth=bandwidth,
+        frame_loss_prob=point['loss'],
+        error_prob=point['error'],
+        seed=seed
+    )
+    return simulation.run()
+
+
+def percentile(values, percent):
+    """Linear-interpolated percentile of values, which must be sorted."""
+    position = (len(values) - 1) * percent / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def summarize(point, runs, propagation_delay=PROPAGATION_DELAY, bandwidth=BANDWIDTH):
+    """One output row: the point, mean and percentiles of its runs, and the analytical bound."""
+    row = dict(point, runs=len(runs))
+    for name in ('utilization', 'goodput'):
+        values = sorted(run[name] for run in runs)
+        row[f"{name}_mean"] = sum(values) / len(values)
+        for percent in PERCENTILES:
+            row[f"{name}_p{percent}"] = percentile(values, percent)
+    row['retransmission_ratio_mean'] = sum(run['retransmissions'] / run['transmissions'] for run in runs) / len(runs)
+    row['timeouts_mean'] = sum(run['timeouts'] for run in runs) / len(runs)
+    frame_time = (HEADER.size + point['packet_size'] + FCS_SIZE) * 8 / bandwidth
+    row['utilization_bound'] = efficiency_bound(point['protocol'], point['window_size'], point['loss'],
+                                                point['error'], frame_time, propagation_delay)
+    return row
+
+
+def run_sweep(points, runs=RUNS, seed=SEED, num_frames=NUM_FRAMES, timeout=TIMEOUT,
+              propagation_delay=PROPAGATION_DELAY, bandwidth=BANDWIDTH, workers=None):
+    """
+    Fans runs seeded simulations of every point out over a process pool. Every point uses the same
+    seeds, so the points see the same loss and error draws in the same order.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            (index, run): pool.submit(run_point, point, seed + run, num_frames, timeout, propagation_delay, bandwidth)
+            for index, point in enumerate(points)
+            for run in range(runs)
+        }
+        rows = []
+        for index, point in enumerate(points):
+            results = [futures[(index, run)].result() for run in range(runs)]
+            rows.append(summarize(point, results, propagation_delay, bandwidth))
+    return rows
+
+
+def parse_list(value, convert):
+    """Converts a comma-separated option value; empty items, as in "--loss=" or "--loss=0,", are dropped."""
+    if value is True:  # The option was given without a value
+        return ()
+    return tuple(convert(item) for item in str(value).split(',') if item.strip())
+
+
+def axis_error(name, values, valid, requirement):
+    """The error message for an empty axis or one with an out-of-range value, or None if it is usable."""
+    if not values:
+        return f"Error: --{name} needs at least one value."
+    invalid = [value for value in values if not valid(value)]
+    if invalid:
+        return f"Error: --{name} must be {requirement}, got {', '.join(map(str, invalid))}."
+    return None
+
+
+def main():
+    args, options = parse_options(sys.argv[1:])
+    if args:
+        print("Usage: python sweep.py [--protocols=P,...] [--loss=P,...] [--error=P,...] [--windows=N,...] "
+              "[--packet-sizes=N,...] [--runs=N] [--frames=N] [--seed=N] [--timeout=S] [--propagation=S] "
+              "[--bandwidth=BPS] [--workers=N] [--output=FILE]")
+        print("Protocol: 'StopAndWait' or '1', 'GoBackN' or '2', or 'SelectiveRepeat' or '3'")
+        sys.exit(1)
+
+    protocols = parse_list(options['protocols'], PROTOCOL_NAMES.get) if 'protocols' in options else PROTOCOLS
+    if None in protocols:
+        print("Error: Invalid protocol. Choose 'StopAndWait', 'GoBackN', 'SelectiveRepeat', '1', '2', or '3'.")
+        sys.exit(1)
+
+    loss_probabilities = parse_list(options['loss'], float) if 'loss' in options else LOSS_PROBABILITIES
+    error_probabilities = parse_list(options['error'], float) if 'error' in options else ERROR_PROBABILITIES
+    window_sizes = parse_list(options['windows'], int) if 'windows' in options else WINDOW_SIZES
+    packet_sizes = parse_list(options['packet_sizes'], int) if 'packet_sizes' in options else PACKET_SIZES
+    runs = int(options.get('runs', RUNS))
+    num_frames = int(options.get('frames', NUM_FRAMES))
+    # A loss or error probability of 1 never gets a frame through, so such a run would not end
+    errors = [
+        axis_error('protocols', protocols, lambda protocol: True, 'protocol names'),
+        axis_error('loss', loss_probabilities, lambda p: 0 <= p < 1, 'at least 0 and below 1'),
+        axis_error('error', error_probabilities, lambda p: 0 <= p < 1, 'at least 0 and below 1'),
+        axis_error('windows', window_sizes, lambda size: size >= 1, 'at least 1'),
+        axis_error('packet-sizes', packet_sizes, lambda size: size >= 1, 'at least 1'),
+        axis_error('runs', (runs,), lambda count: count >= 1, 'at least 1'),
+        axis_error('frames', (num_frames,), lambda count: count >= 1, 'at least 1')
+    ]
+    for error in errors:
+        if error is not None:
+            print(error)
+            sys.exit(1)
+
+    points = list(sweep_points(protocols, loss_probabilities, error_probabilities, window_sizes, packet_sizes))
+    print(f"Sweeping {len(points)} points x {runs} runs...")
+
+    start_time = time.time()
+    rows = run_sweep(
+        points,
+        runs=runs,
+        seed=int(options.get('seed', SEED)),
+        num_frames=num_frames,
+        timeout=float(options.get('timeout', TIMEOUT)),
+        propagation_delay=float(options.get('propagation', PROPAGATION_DELAY)),
+        bandwidth=float(options.get('bandwidth', BANDWIDTH)),
+        workers=int(options['workers']) if 'workers' in options else None
+    )
+
+    for row in rows:
+        print(f"{row['protocol']:<16} {row['packet_size']:>5} B w{row['window_size']:<3} loss {row['loss']:<5} "
+              f"error {row['error']:<5} utilization {row['utilization_mean']:.3f} "
+              f"[{row['utilization_p5']:.3f}, {row['utilization_p95']:.3f}] bound {row['utilization_bound']:.3f}")
+
+    output_file = options.get('output', RESULTS_FILE)
+    with open(output_file, 'w', newline='') as output:
+        writer = csv.DictWriter(output, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"{len(rows)} points written to {output_file} in {time.time() - start_time:.2f} seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import unittest
+import stop_and_wait
+import go_back_n
+import selective_repeat
+from simulation import SIMULATIONS
+from rtt import MAX_BACKOFFS
+
+NUM_FRAMES = 200
+ROUND_TRIP = 0.1  # Generously above the simulated link's round trip of about 0.02 s
+TIMEOUTS = {
+    'StopAndWait': stop_and_wait.TIMEOUT,
+    'GoBackN': go_back_n.TIMEOUT,
+    'SelectiveRepeat': selective_repeat.TIMEOUT
+}
+
+
+class AsyncSenderTest(unittest.TestCase):
+    """The asyncio senders, run on the virtual clock of simulation.py over the default lossy channel."""
+
+    def run_protocol(self, protocol, seed):
+        simulation = SIMULATIONS[protocol](num_frames=NUM_FRAMES, seed=seed)
+        return simulation, simulation.run()
+
+    def test_delivers_every_frame(self):
+        for protocol in SIMULATIONS:
+            for seed in range(3):
+                with self.subTest(protocol=protocol, seed=seed):
+                    _, results = self.run_protocol(protocol, seed)
+                    self.assertEqual(results['delivered'], NUM_FRAMES)
+
+    def test_timeouts_do_not_ratchet_the_rto(self):
+        for protocol, timeout in TIMEOUTS.items():
+            for seed in range(3):
+                with self.subTest(protocol=protocol, seed=seed):
+                    simulation, results = self.run_protocol(protocol, seed)
+                    # Progress clears the backoff, so the RTO ends near the link's round trip
+                    self.assertLess(simulation.sender.rtt.rto, timeout)
+                    # No timer ever waits longer than the initial timeout backed off MAX_BACKOFFS times
+                    self.assertLess(results['simulated_time'],
+                                    results['timeouts'] * timeout * 2 ** MAX_BACKOFFS + NUM_FRAMES * ROUND_TRIP)
+
+
+if __name__ == '__main__':
+    unittest.main()
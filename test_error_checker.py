@@ -0,0 +1,138 @@
+import random
+import unittest
+from error_checker import CRC, CRC_POLYNOMIALS, CRCTable, Checksum, mod2div
+from dataframe import bytes_to_bits
+
+BIT_LENGTHS = list(range(1, 70)) + [368, 1000, 4096]
+
+# Widths other than 32 exercise the generic slicing loop and the single-table path
+POLYNOMIALS = {
+    8: '100000111',
+    16: '11000000000000101',
+    32: CRC_POLYNOMIALS['CRC-32'],
+    64: '1' + format(0x42F0E1EBA9EA3693, '064b')
+}
+
+# Word sizes with an array type, and others that take the integer fold
+CHECKSUM_SIZES = (8, 16, 32, 64, 1, 12, 20, 24, 48)
+
+
+def long_division_fcs(bits, polynomial):
+    """The original engine: the remainder of bits followed by width zero bits, as a bit string."""
+    return mod2div(bits + '0' * (len(polynomial) - 1), polynomial)
+
+
+def flip_bit(data, index):
+    if isinstance(data, str):
+        return data[:index] + ('1' if data[index] == '0' else '0') + data[index + 1:]
+    flipped = bytearray(data)
+    flipped[index // 8] ^= 0x80 >> index % 8
+    return bytes(flipped)
+
+
+class CRCTableTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(1)
+
+    def random_bits(self, length):
+        return ''.join(self.rng.choice('01') for _ in range(length))
+
+    def test_bits_match_long_division(self):
+        for width, polynomial in POLYNOMIALS.items():
+            table = CRCTable(polynomial)
+            for length in BIT_LENGTHS:
+                bits = self.random_bits(length)
+                with self.subTest(width=width, length=length):
+                    self.assertEqual(format(table.compute_bits(bits), f'0{width}b'),
+                                     long_division_fcs(bits, polynomial))
+
+    def test_bytes_match_long_division(self):
+        for width, polynomial in POLYNOMIALS.items():
+            table = CRCTable(polynomial)
+            for length in BIT_LENGTHS:
+                data = self.rng.randbytes((length + 7) // 8)
+                with self.subTest(width=width, length=len(data)):
+                    self.assertEqual(format(table.compute(data), f'0{width}b'),
+                                     long_division_fcs(bytes_to_bits(data), polynomial))
+
+    def test_rejects_unsupported_width(self):
+        with self.assertRaises(ValueError):
+            CRCTable('1011')
+
+
+class CRCTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(2)
+        self.crc = CRC()
+        self.polynomial = CRC_POLYNOMIALS['CRC-32']
+
+    def test_str_fcs_matches_long_division(self):
+        for length in BIT_LENGTHS:
+            bits = ''.join(self.rng.choice('01') for _ in range(length))
+            with self.subTest(length=length):
+                self.assertEqual(self.crc.generate_fcs(bits), long_division_fcs(bits, self.polynomial))
+
+    def test_bytes_fcs_matches_str_fcs(self):
+        for length in BIT_LENGTHS:
+            data = self.rng.randbytes((length + 7) // 8)
+            with self.subTest(length=len(data)):
+                self.assertEqual(bytes_to_bits(self.crc.generate_fcs(data)),
+                                 self.crc.generate_fcs(bytes_to_bits(data)))
+
+    def test_validate_round_trip_and_flipped_bit(self):
+        for length in BIT_LENGTHS:
+            bits = ''.join(self.rng.choice('01') for _ in range(length))
+            data = self.rng.randbytes((length + 7) // 8)
+            for dataword in (bits, data):
+                fcs = self.crc.generate_fcs(dataword)
+                bit_length = len(dataword) if isinstance(dataword, str) else len(dataword) * 8
+                index = self.rng.randrange(bit_length)
+                with self.subTest(length=length, type=type(dataword).__name__):
+                    self.assertTrue(self.crc.validate(dataword, fcs))
+                    # CRC-32 detects every single-bit error, in the data or in the FCS
+                    self.assertFalse(self.crc.validate(flip_bit(dataword, index), fcs))
+                    self.assertFalse(self.crc.validate(dataword, flip_bit(fcs, index % 32)))
+
+
+class ChecksumTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(3)
+
+    def reference_checksum(self, checksum, bits):
+        """The original bit-string engine: generate_checksum over zero-padded size-bit chunks."""
+        padded = bits.ljust((len(bits) + checksum.size - 1) // checksum.size * checksum.size, '0')
+        return checksum.generate_checksum([padded[i:i + checksum.size] for i in range(0, len(padded), checksum.size)])
+
+    def test_bytes_fcs_matches_generate_checksum(self):
+        for size in CHECKSUM_SIZES:
+            checksum = Checksum(size)
+            for length in (0, 1, 2, 3, 5, 8, 46, 127, 1024):
+                data = self.rng.randbytes(length)
+                with self.subTest(size=size, length=length):
+                    fcs = int.from_bytes(checksum.generate_fcs(data), 'big')
+                    self.assertEqual(format(fcs, f'0{size}b'), self.reference_checksum(checksum, bytes_to_bits(data)))
+
+    def test_str_fcs_matches_generate_checksum(self):
+        for size in CHECKSUM_SIZES:
+            checksum = Checksum(size)
+            for length in BIT_LENGTHS:
+                bits = ''.join(self.rng.choice('01') for _ in range(length))
+                with self.subTest(size=size, length=length):
+                    self.assertEqual(checksum.generate_fcs(bits), self.reference_checksum(checksum, bits))
+
+    def test_validate_round_trip(self):
+        for size in CHECKSUM_SIZES:
+            checksum = Checksum(size)
+            bits = ''.join(self.rng.choice('01') for _ in range(100))
+            data = self.rng.randbytes(46)
+            for dataword in (bits, data):
+                with self.subTest(size=size, type=type(dataword).__name__):
+                    self.assertTrue(checksum.validate(dataword, checksum.generate_fcs(dataword)))
+
+    def test_rejects_empty_word_size(self):
+        with self.assertRaises(ValueError):
+            Checksum(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
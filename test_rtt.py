@@ -0,0 +1,74 @@
+import unittest
+from rtt import RTTEstimator, MAX_RTO, MAX_BACKOFFS
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RTTEstimatorTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.rtt = RTTEstimator(initial_rto=1.0, clock=self.clock)
+
+    def send_and_ack(self, seq_no, rtt, retransmission=False):
+        self.rtt.frame_sent(seq_no, retransmission)
+        self.clock.now += rtt
+        self.rtt.frame_acked(seq_no, cumulative=True)
+
+    def test_samples_set_rto(self):
+        for seq_no in range(20):
+            self.send_and_ack(seq_no, 0.1)
+        self.assertAlmostEqual(self.rtt.srtt, 0.1)
+        self.assertLess(self.rtt.rto, 0.2)
+
+    def test_timeouts_double_rto_a_limited_number_of_times(self):
+        for _ in range(20):
+            self.rtt.backoff()
+        self.assertEqual(self.rtt.rto, 1.0 * 2 ** MAX_BACKOFFS)
+
+    def test_backoff_stays_under_max_rto(self):
+        rtt = RTTEstimator(initial_rto=MAX_RTO / 2, clock=self.clock)
+        for _ in range(20):
+            rtt.backoff()
+        self.assertEqual(rtt.rto, MAX_RTO)
+
+    def test_sample_after_timeouts_clears_backoff(self):
+        for seq_no in range(10):
+            self.send_and_ack(seq_no, 0.1)
+        settled_rto = self.rtt.rto
+
+        # A burst of timeouts: Go-Back-N resends the whole window every time, so Karn's rule
+        # leaves none of these frames to be sampled
+        for seq_no in range(10, 18):
+            self.rtt.frame_sent(seq_no)
+        for _ in range(10):
+            self.rtt.backoff()
+            for seq_no in range(10, 18):
+                self.rtt.frame_sent(seq_no, retransmission=True)
+        self.assertEqual(self.rtt.rto, settled_rto * 2 ** MAX_BACKOFFS)
+
+        # The window gets through and the next frame is sent and acknowledged only once
+        self.clock.now += 0.1
+        self.rtt.frame_acked(17, cumulative=True)
+        self.send_and_ack(18, 0.1)
+        self.assertLessEqual(self.rtt.rto, settled_rto)
+        self.assertEqual(len(self.rtt.samples), 11)
+
+    def test_ack_of_retransmitted_frame_keeps_backoff(self):
+        self.send_and_ack(0, 0.1)
+        self.rtt.frame_sent(1)
+        self.rtt.backoff()
+        backed_off_rto = self.rtt.rto
+        self.rtt.frame_sent(1, retransmission=True)
+        self.clock.now += 0.1
+        self.rtt.frame_acked(1, cumulative=True)
+        self.assertEqual(self.rtt.rto, backed_off_rto)
+        self.assertEqual(len(self.rtt.samples), 1)
+
+if __name__ == '__main__':
+    unittest.main()
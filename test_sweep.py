@@ -0,0 +1,24 @@
+import unittest
+from sweep import run_point, summarize
+
+NUM_FRAMES = 1000
+
+
+class SweepTest(unittest.TestCase):
+    """Sanity checks of the simulated utilization against sweep.efficiency_bound."""
+
+    def test_loss_free_go_back_n_approaches_bound(self):
+        for packet_size in (46, 1024):
+            for window_size in (4, 16, 64):
+                with self.subTest(packet_size=packet_size, window_size=window_size):
+                    point = {'protocol': 'GoBackN', 'packet_size': packet_size, 'window_size': window_size,
+                             'loss': 0.0, 'error': 0.0}
+                    row = summarize(point, [run_point(point, seed=1, num_frames=NUM_FRAMES)])
+                    self.assertEqual(row['timeouts_mean'], 0)
+                    # Only the first window's ramp-up and the last frame's round trip are not overlapped
+                    self.assertGreater(row['utilization_mean'], 0.9 * row['utilization_bound'])
+                    self.assertLessEqual(row['utilization_mean'], row['utilization_bound'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import abc
+import errno
+import queue
+import threading
+
+END_OF_STREAM = None
+
+
+class Transport(abc.ABC):
+    """
+    What a Sender or Receiver needs from its connection: whole frames in, whole frames out.
+
+    send_frame(data) delivers one frame to the peer; recv_frame() blocks for the next frame and
+    returns None once the peer has closed; close() ends the connection and wakes a recv_frame()
+    blocked on this end. A plain socket is wrapped in a framing.FrameStream to provide this.
+    Any class with these three methods counts as a Transport, whether or not it subclasses it.
+    """
+
+    _METHODS = ('send_frame', 'recv_frame', 'close')
+
+    @classmethod
+    def __subclasshook__(cls, subclass):
+        if cls is Transport and all(callable(getattr(subclass, name, None)) for name in cls._METHODS):
+            return True
+        return NotImplemented
+
+    @abc.abstractmethod
+    def send_frame(self, data):
+        """Delivers one whole frame to the peer."""
+
+    @abc.abstractmethod
+    def recv_frame(self):
+        """Blocks for the next frame from the peer; returns None once the peer has closed."""
+
+    @abc.abstractmethod
+    def close(self):
+        """Ends the connection and wakes a recv_frame() blocked on this end."""
+
+
+class LoopbackTransport(Transport):
+    """One end of an in-process connection: each frame is a queue item, so no framing or syscalls are needed."""
+
+    def __init__(self, inbound, outbound):
+        self.inbound = inbound
+        self.outbound = outbound
+        self.closed = False
+
+    def send_frame(self, data):
+        if self.closed:
+            raise OSError(errno.EBADF, "Loopback transport is closed.")
+        self.outbound.put(bytes(data))
+
+    def recv_frame(self):
+        data = self.inbound.get()
+        if data is END_OF_STREAM:
+            self.inbound.put(END_OF_STREAM)  # Every later or concurrent reader sees the end as well
+        return data
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.outbound.put(END_OF_STREAM)
+        self.inbound.put(END_OF_STREAM)
+
+
+def loopback_pair():
+    """Two connected LoopbackTransport ends, like socket.socketpair() for frames."""
+    forward = queue.SimpleQueue()
+    backward = queue.SimpleQueue()
+    return LoopbackTransport(backward, forward), LoopbackTransport(forward, backward)
+
+
+def run_loopback(sender_factory, receiver_factory):
+    """
+    Runs one transfer with both ends in this process: receiver_factory(connection) and
+    sender_factory(connection) build the two sides of a loopback_pair(). Returns both once the
+    receiver has finished.
+    """
+    sender_end, receiver_end = loopback_pair()
+    receiver = receiver_factory(receiver_end)
+    receiver_thread = threading.Thread(target=receiver.receive_data, daemon=True)
+    receiver_thread.start()
+    sender = sender_factory(sender_end)
+    try:
+        sender.send_data()
+    finally:
+        sender_end.close()
+        receiver_thread.join()
+    return sender, receiver
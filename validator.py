@@ -0,0 +1,209 @@
+import mmap
+import os
+import sys
+from dataframe import bits_to_bytes
+from output_sink import BINARY, TEXT
+from options import parse_options
+
+CHUNK_SIZE = 256 * 1024  # Output bytes compared at a time; mismatched chunks are then checked frame by frame
+WHITESPACE = b' \t\r\n'
+
+INCORRECT = 'incorrect'
+MISSING = 'missing'
+EXTRA = 'extra'
+
+
+def report_path(output_file):
+    """output.bin -> output_report.txt, where the mismatched frames of a validation are listed."""
+    return os.path.splitext(output_file)[0] + '_report.txt'
+
+
+class ValidationReport:
+    """
+    Counts the frames a validation checked and writes each run of consecutive mismatched frames
+    to the report file as one line, "<first>-<last> <kind>", as soon as the run ends. Only the
+    current run is held in memory, however many frames differ.
+    """
+
+    def __init__(self, report_file, header):
+        self.report_file = report_file
+        self.file = open(report_file, 'w')
+        self.file.write(f"# {header}\n")
+        self.frames_checked = 0
+        self.frames = {INCORRECT: 0, MISSING: 0, EXTRA: 0}
+        self.ranges = 0
+        self.run = None  # [kind, first frame, last frame] of the run being collected
+
+    def mismatch(self, kind, first, last=None):
+        """Records frames first..last (file-wide numbers) as mismatched."""
+        last = first if last is None else last
+        self.frames[kind] += last - first + 1
+        if self.run is not None and self.run[0] == kind and self.run[2] + 1 == first:
+            self.run[2] = last
+            return
+        self.end_run()
+        self.run = [kind, first, last]
+
+    def end_run(self):
+        if self.run is not None:
+            kind, first, last = self.run
+            self.file.write(f"{first}-{last} {kind}\n")
+            self.ranges += 1
+            self.run = None
+
+    @property
+    def frames_incorrect(self):
+        return self.frames[INCORRECT]
+
+    @property
+    def ok(self):
+        return not any(self.frames.values())
+
+    def summary(self):
+        return (f"{self.frames_checked} frames checked, {self.frames[INCORRECT]} incorrect, "
+                f"{self.frames[MISSING]} missing, {self.frames[EXTRA]} extra, in {self.ranges} ranges")
+
+    def close(self):
+        self.end_run()
+        self.file.write(f"# {self.summary()}\n")
+        self.file.close()
+
+
+def map_file(file):
+    """A read-only memory map of file, or b'' for an empty file, which cannot be mapped."""
+    if not os.fstat(file.fileno()).st_size:
+        return b''
+    file_map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+        # Read ahead, and let the kernel drop pages behind the comparison first
+        file_map.madvise(mmap.MADV_SEQUENTIAL)
+    return file_map
+
+
+def bitstream_end(input_map):
+    """Length of the bit-string input without the trailing whitespace (usually a final newline)."""
+    end = len(input_map)
+    while end and input_map[end - 1] in WHITESPACE:
+        end -= 1
+    return end
+
+
+def validate_binary(input_map, input_end, output_map, frame_size, first_frame, num_frames, report):
+    """Compares a BinarySink output with the packed input, CHUNK_SIZE bytes at a time."""
+    frame_chars = frame_size * 8
+    input_start = first_frame * frame_chars
+    input_frames = max(0, (input_end - input_start + frame_chars - 1) // frame_chars)
+    if num_frames is not None:
+        input_frames = min(input_frames, num_frames)
+    output_frames = (len(output_map) + frame_size - 1) // frame_size
+    checked = min(input_frames, output_frames)
+    chunk_frames = max(1, CHUNK_SIZE // frame_size)
+
+    for first in range(0, checked, chunk_frames):
+        last = min(first + chunk_frames, checked)
+        start = input_start + first * frame_chars
+        expected = bits_to_bytes(input_map[start:min(input_start + last * frame_chars, input_end)])
+        received = output_map[first * frame_size:last * frame_size]
+        if received == expected:
+            continue
+        for index in range(last - first):
+            frame = slice(index * frame_size, (index + 1) * frame_size)
+            if received[frame] != expected[frame]:
+                report.mismatch(INCORRECT, first_frame + first + index)
+
+    report.frames_checked = checked
+    if output_frames > checked:
+        report.mismatch(EXTRA, first_frame + checked, first_frame + output_frames - 1)
+    elif num_frames is not None and input_frames > checked:
+        report.mismatch(MISSING, first_frame + checked, first_frame + input_frames - 1)
+
+
+def validate_text(input_map, input_end, output_map, frame_size, first_frame, num_frames, report):
+    """Compares the "<seq_no>. <payload bits>" lines of a TextSink output with the input, line by line."""
+    frame_chars = frame_size * 8
+    input_frames = max(0, (input_end - first_frame * frame_chars + frame_chars - 1) // frame_chars)
+    if num_frames is not None:
+        input_frames = min(input_frames, num_frames)
+    checked = 0
+    position = 0
+    while position < len(output_map):
+        newline = output_map.find(b'\n', position)
+        end = len(output_map) if newline < 0 else newline
+        seq_no, separator, bits = output_map[position:end].strip().partition(b'. ')
+        position = end + 1
+        if not separator:
+            continue
+        frame = first_frame + int(seq_no)
+        if int(seq_no) >= input_frames:
+            report.mismatch(EXTRA, frame)
+            continue
+        start = frame * frame_chars
+        checked += 1
+        # Both sides are packed, so a short last frame compares equal to its zero-padded bits
+        if bits_to_bytes(bits) != bits_to_bytes(input_map[start:min(start + frame_chars, input_end)]):
+            report.mismatch(INCORRECT, frame)
+
+    report.frames_checked = checked
+    if num_frames is not None and input_frames > checked:
+        report.mismatch(MISSING, first_frame + checked, first_frame + input_frames - 1)
+
+
+VALIDATORS = {
+    BINARY: validate_binary,
+    TEXT: validate_text
+}
+
+
+def validate(input_file, output_file, frame_size, first_frame=0, output_format=BINARY, num_frames=None,
+             report_file=None):
+    """
+    Checks output_file, as written by a Receiver's output sink, against frames first_frame onwards
+    of the bit-string input_file, with both files memory-mapped. Mismatched frame ranges go to
+    report_file (report_path(output_file) by default); the output file is left as it is.
+
+    Frames the receiver never delivered are only reported as missing when num_frames, the number
+    of frames that were sent, is given. Returns the closed ValidationReport.
+    """
+    print("Validation begins...")
+    report_file = report_file or report_path(output_file)
+    report = ValidationReport(report_file, f"{output_file} against {input_file}, {frame_size}-byte frames "
+                                           f"from frame {first_frame}")
+    try:
+        if frame_size:
+            with open(input_file, 'rb') as input_data, open(output_file, 'rb') as output_data:
+                input_map = map_file(input_data)
+                output_map = map_file(output_data)
+                try:
+                    VALIDATORS[output_format](input_map, bitstream_end(input_map), output_map, frame_size,
+                                              first_frame, num_frames, report)
+                finally:
+                    for file_map in (input_map, output_map):
+                        if isinstance(file_map, mmap.mmap):
+                            file_map.close()
+    finally:
+        report.close()
+    print(f"Validation complete: {report.summary()}, see {report_file}.")
+    return report
+
+
+def main():
+    args, options = parse_options(sys.argv[1:])
+    if len(args) != 3:
+        print("Usage: python validator.py <input_file> <output_file> <packet_size> [--text] [--first-frame=N] "
+              "[--frames=N] [--report=FILE]")
+        sys.exit(1)
+    input_file, output_file, packet_size = args
+    report = validate(
+        input_file,
+        output_file,
+        int(packet_size),
+        first_frame=int(options.get('first_frame', 0)),
+        output_format=TEXT if options.get('text') else BINARY,
+        num_frames=int(options['frames']) if 'frames' in options else None,
+        report_file=options.get('report')
+    )
+    sys.exit(0 if report.ok else 2)
+
+
+if __name__ == "__main__":
+    main()